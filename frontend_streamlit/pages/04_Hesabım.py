@@ -2,9 +2,9 @@
 import streamlit as st
 from utils.auth import initialize_session_state, is_logged_in, get_current_user, logout
 from utils.api_client import (
-    change_password_api, deactivate_my_account_api,
-    get_my_addresses_api, add_address_api, update_address_api, delete_address_api,
-    get_my_contacts_api, add_contact_api, update_contact_api, delete_contact_api
+    change_password_api, deactivate_my_account_api, get_my_profile_api,
+    add_address_api, update_address_api, delete_address_api,
+    add_contact_api, update_contact_api, delete_contact_api
 )
 from utils.ui_helpers import render_top_user_section 
 
@@ -27,6 +27,10 @@ if not user:
     logout() 
     st.stop()
 
+# Kullanıcı, adresler ve iletişim bilgileri tek istekte (ETag ile; değişmediyse 304)
+profile = get_my_profile_api() or {}
+user = profile.get("user") or user
+
 
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📜 Profil Bilgileri", "🏠 Adreslerim", "📞 İletişim Bilgilerim", "🔑 Şifre Değiştir", "⚙️ Hesap Ayarları"
@@ -55,7 +59,7 @@ with tab2:
     st.subheader("Adreslerim")
 
     def render_addresses():
-        addresses = get_my_addresses_api()
+        addresses = profile.get("addresses", [])
         if addresses:
             for address_item in addresses:
                 display_address_type = address_item.get('address_type', 'Belirtilmemiş')
@@ -161,7 +165,7 @@ with tab3:
     CONTACT_TYPE_API_VALUES = list(CONTACT_TYPE_MAP.keys()) 
 
     def render_contacts():
-        contacts = get_my_contacts_api()
+        contacts = profile.get("contacts", [])
         if contacts:
             for contact_item in contacts: 
                 display_contact_type = CONTACT_TYPE_MAP.get(contact_item.get('contact_type'), contact_item.get('contact_type', 'Bilinmeyen'))
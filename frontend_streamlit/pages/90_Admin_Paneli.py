@@ -40,9 +40,46 @@ with tab_user_management:
     st.header("Kullanıcı Yönetimi")
 
     st.subheader("Mevcut Kullanıcılar")
-    users_list: List[Dict[str, Any]] = get_all_users_api()
+    # Arama ve sayfalama sunucu tarafında yapılır (q= ve after_id= cursor'ı)
+    USERS_PAGE_SIZE = 50
+    if "admin_users_cursors" not in st.session_state:
+        st.session_state.admin_users_cursors = [None] # her sayfanın başlangıç cursor'ı
+    if "admin_users_search" not in st.session_state:
+        st.session_state.admin_users_search = ""
+
+    user_search = st.text_input(
+        "Kullanıcı ara (kullanıcı adı, e-posta, ad, soyad)",
+        value=st.session_state.admin_users_search,
+        placeholder="En az 3 karakter...",
+        key="admin_users_search_input"
+    ).strip()
+    if user_search != st.session_state.admin_users_search:
+        st.session_state.admin_users_search = user_search
+        st.session_state.admin_users_cursors = [None]
+    if 0 < len(user_search) < 3:
+        st.caption("Arama için en az 3 karakter girin; tüm kullanıcılar listeleniyor.")
+        user_search = ""
+
+    users_list: List[Dict[str, Any]]
+    users_list, next_users_cursor = get_all_users_api(
+        limit=USERS_PAGE_SIZE,
+        after_id=st.session_state.admin_users_cursors[-1],
+        q=user_search or None
+    )
     user_objects_map = {}
 
+    col_prev_page, col_page_info, col_next_page = st.columns([1, 2, 1])
+    with col_prev_page:
+        if st.button("⬅️ Önceki", disabled=len(st.session_state.admin_users_cursors) <= 1, key="admin_users_prev"):
+            st.session_state.admin_users_cursors.pop()
+            st.rerun()
+    with col_page_info:
+        st.caption(f"Sayfa {len(st.session_state.admin_users_cursors)}")
+    with col_next_page:
+        if st.button("Sonraki ➡️", disabled=next_users_cursor is None, key="admin_users_next"):
+            st.session_state.admin_users_cursors.append(next_users_cursor)
+            st.rerun()
+
     if users_list:
         user_data_for_display = []
         for u_obj in users_list:
@@ -69,7 +106,7 @@ with tab_user_management:
         df_users_display = pd.DataFrame(user_data_for_display)
         st.dataframe(df_users_display, use_container_width=True, hide_index=True)
     else:
-        st.info("Sistemde kayıtlı kullanıcı bulunmamaktadır.")
+        st.info("Aramayla eşleşen kullanıcı bulunamadı." if user_search else "Sistemde kayıtlı kullanıcı bulunmamaktadır.")
 
     st.divider()
 
@@ -1,6 +1,6 @@
 # frontend_streamlit/pages/XX_Sipariş_Oluştur.py
 import streamlit as st
-from utils.api_client import create_order_api, get_my_addresses_api, get_my_contacts_api
+from utils.api_client import create_order_api, get_my_profile_api
 from utils.auth import initialize_session_state, is_logged_in, get_current_user
 from typing import List, Dict, Any, Optional # Tip ipuçları için
 
@@ -15,8 +15,9 @@ if not is_logged_in():
         st.switch_page("Home.py")
     st.stop()
 
-addresses: List[Dict[str, Any]] = get_my_addresses_api()
-contacts: List[Dict[str, Any]] = get_my_contacts_api()
+profile: Dict[str, Any] = get_my_profile_api() or {}
+addresses: List[Dict[str, Any]] = profile.get("addresses", [])
+contacts: List[Dict[str, Any]] = profile.get("contacts", [])
 
 if not addresses:
     st.error("Sipariş verebilmek için kayıtlı bir teslimat adresiniz bulunmalıdır.")
@@ -1,14 +1,46 @@
 # frontend_streamlit/utils/api_client.py
+import base64
+import json
 import requests
 import streamlit as st
 import os
+import time
 from typing import Optional, List
 
 USER_SERVICE_BASE_URL = os.getenv("USER_SERVICE_BASE_URL", "http://localhost:8000")
 PRODUCT_SERVICE_BASE_URL = os.getenv("PRODUCT_SERVICE_BASE_URL", "http://localhost:8001")
 
+def _token_expires_at(token: str) -> float:
+    """JWT payload'ındaki exp (imza doğrulanmaz; yalnızca yenileme zamanlaması için)."""
+    try:
+        payload = token.split(".")[1]
+        return float(json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))).get("exp", 0))
+    except (IndexError, ValueError):
+        return 0.0
+
+def refresh_access_token_api() -> bool:
+    """Refresh token ile yeni token çifti alır; refresh token tek kullanımlıktır, yenisi saklanır."""
+    refresh_token = st.session_state.get("refresh_token")
+    if not refresh_token:
+        return False
+    try:
+        response = requests.post(f"{USER_SERVICE_BASE_URL}/auth/refresh", json={"refresh_token": refresh_token})
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        st.session_state.access_token = None
+        st.session_state.refresh_token = None
+        return False
+    token_data = response.json()
+    st.session_state.access_token = token_data["access_token"]
+    st.session_state.refresh_token = token_data.get("refresh_token")
+    return True
+
 def get_auth_headers():
     token = st.session_state.get("access_token")
+    # Access token'lar kısa ömürlü: süresi dolmak üzereyse istekten önce yenile
+    if token and _token_expires_at(token) - time.time() < 30:
+        if refresh_access_token_api():
+            token = st.session_state.get("access_token")
     if token:
         return {"Authorization": f"Bearer {token}"}
     return {}
@@ -87,6 +119,30 @@ def deactivate_my_account_api():
         st.error(f"Hesap silinirken hata: {e.response.json().get('detail') if e.response else str(e)}")
         return False
 
+def get_my_profile_api():
+    """
+    Kullanıcı, adresler ve iletişim bilgilerini tek istekte getirir. Son yanıt ETag'iyle
+    session_state'te tutulur; değişiklik yoksa sunucu 304 döner ve saklanan yanıt kullanılır.
+    """
+    headers = get_auth_headers()
+    if not headers: return None
+    username = (st.session_state.get("user_info") or {}).get("username")
+    cached = st.session_state.get("profile_cache")
+    if cached and cached.get("username") == username:
+        headers = {**headers, "If-None-Match": cached["etag"]}
+    try:
+        response = requests.get(f"{USER_SERVICE_BASE_URL}/users/me/profile", headers=headers)
+        if response.status_code == 304 and cached:
+            return cached["data"]
+        response.raise_for_status()
+        profile = response.json()
+        if response.headers.get("ETag"):
+            st.session_state.profile_cache = {"username": username, "etag": response.headers["ETag"], "data": profile}
+        return profile
+    except requests.exceptions.RequestException as e:
+        st.error(f"Profil bilgileri getirilirken hata: {e.response.json().get('detail') if e.response else str(e)}")
+        return None
+
 def get_my_addresses_api():
     headers = get_auth_headers()
     if not headers: return []
@@ -337,16 +393,23 @@ def get_my_orders_api():
 
 
 
-def get_all_users_api(skip=0, limit=100): 
+def get_all_users_api(limit=100, after_id=None, q=None):
+    """(kullanıcılar, sonraki sayfa cursor'ı) döner; son sayfada cursor None'dır."""
     headers = get_auth_headers()
-    if not headers: return []
+    if not headers: return [], None
+    params = {"limit": limit}
+    if after_id is not None:
+        params["after_id"] = after_id
+    if q:
+        params["q"] = q
     try:
-        response = requests.get(f"{USER_SERVICE_BASE_URL}/users/?skip={skip}&limit={limit}", headers=headers)
+        response = requests.get(f"{USER_SERVICE_BASE_URL}/users/", params=params, headers=headers)
         response.raise_for_status()
-        return response.json()
+        next_cursor = response.headers.get("X-Next-Cursor")
+        return response.json(), int(next_cursor) if next_cursor else None
     except requests.exceptions.RequestException as e:
         st.error(f"Kullanıcılar getirilirken hata: {e.response.json().get('detail') if e.response else str(e)}")
-        return []
+        return [], None
 
 def get_user_details_admin_api(user_id: int): 
     headers = get_auth_headers()
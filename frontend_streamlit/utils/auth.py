@@ -8,6 +8,8 @@ def initialize_session_state():
     """Streamlit session state'i gerekli anahtarlarla başlatır."""
     if "access_token" not in st.session_state:
         st.session_state.access_token = None
+    if "refresh_token" not in st.session_state:
+        st.session_state.refresh_token = None
     if "user_info" not in st.session_state:
         st.session_state.user_info = None
     if "user_role" not in st.session_state:
@@ -19,6 +21,7 @@ def initialize_session_state():
 def login(username, password):
     """Kullanıcı girişi yapar, token ve kullanıcı bilgilerini session state'e kaydeder."""
     st.session_state.access_token = None
+    st.session_state.refresh_token = None
     st.session_state.user_info = None
     st.session_state.user_role = None
     st.session_state.force_password_change = False
@@ -26,6 +29,7 @@ def login(username, password):
     token_data = login_user_api(username, password)
     if token_data and "access_token" in token_data:
         st.session_state.access_token = token_data["access_token"]
+        st.session_state.refresh_token = token_data.get("refresh_token")
         user_details = get_current_user_api() # /users/me çağrısı
         if user_details:
             st.session_state.user_info = user_details
@@ -53,14 +57,18 @@ def logout():
     if token:
         try:
             headers = {"Authorization": f"Bearer {token}"}
+            # Token blacklist'e alınır ve oturumun refresh token'ları iptal edilir
+            requests.post(f"{USER_SERVICE_BASE_URL}/auth/logout", headers=headers, timeout=5)
         except requests.exceptions.RequestException:
             st.warning("Logout sırasında sunucuya ulaşılamadı.") 
 
     # Session state'i temizle
     st.session_state.access_token = None
+    st.session_state.refresh_token = None
     st.session_state.user_info = None
     st.session_state.user_role = None
     st.session_state.force_password_change = False 
+    st.session_state.pop("profile_cache", None)
     st.success("Başarıyla çıkış yapıldı.")
     st.rerun() 
 
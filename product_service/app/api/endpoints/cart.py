@@ -2,12 +2,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from typing import List
+import logging
 
 from app.schemas import cart as cart_schema 
 from app.services import cart_service          
 from app.db.database import get_db
 from app.core.auth import get_current_user_subject 
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post(
@@ -27,7 +29,7 @@ def add_or_update_cart_item(
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Error adding item to cart: {e}") # Loglama
+        logger.error("Error adding item to cart: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not add item to cart")
 
 
@@ -73,7 +75,7 @@ def update_cart_item(
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Error updating cart item: {e}")
+        logger.error("Error updating cart item: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not update cart item")
 
 @router.delete(
@@ -2,12 +2,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
+import logging
 
 from app.schemas import order as order_schema 
 from app.services import order_service          
 from app.db.database import get_db
-from app.core.auth import get_current_user_subject 
+from app.core.auth import get_current_user_subject, require_admin
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post(
@@ -27,7 +29,7 @@ def create_order(
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Error creating order via API: {e}") 
+        logger.error("Error creating order via API: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not create order")
 
 @router.get(
@@ -60,4 +62,19 @@ def read_order_details(
     order = order_service.get_order_details(db=db, order_id=order_id, user_id=current_user_sub)
     if order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found or not authorized")
-    return order
\ No newline at end of file
+    return order
+
+@router.put(
+    "/{order_id}/status",
+    response_model=order_schema.Order,
+    summary="Update order status (Admin only)",
+    description="Changes the status of an order. Sales reports are updated in the same transaction.",
+    responses={404: {"description": "Order not found"}},
+    dependencies=[Depends(require_admin)]
+)
+def update_order_status(
+    order_id: int,
+    status_update: order_schema.OrderStatusUpdate,
+    db: Session = Depends(get_db)
+):
+    return order_service.update_order_status(db=db, order_id=order_id, new_status=status_update.status)
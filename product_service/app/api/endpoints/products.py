@@ -10,7 +10,7 @@ from app.schemas.product import ProductBulkUpdateRequest, ProductBulkUpdateRespo
 from app.services import product_service
 
 from app.db.database import get_db
-from app.core.auth import require_admin, verify_access_token, TokenData
+from app.core.auth import require_permission, verify_access_token, TokenData
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +21,8 @@ router = APIRouter()
     response_model=product_schema.Product,
     status_code=status.HTTP_201_CREATED,
     summary="Create a new product (Admin only)",
-    description="Adds a new product to the catalog. Requires admin privileges.",
-    dependencies=[Depends(require_admin)] 
+    description="Adds a new product to the catalog. Requires the `products:create` permission.",
+    dependencies=[Depends(require_permission("products:create"))]
 )
 def create_new_product(
     product_in: product_schema.ProductCreate,
@@ -34,8 +34,7 @@ def create_new_product(
     "/",
     response_model=List[product_schema.Product],
     summary="List products (Filters by active status based on user role/query)",
-    description="Regular users see only active products. Admins can use the 'active_status' query parameter to see 'all', 'active', or 'inactive' products.",
-    dependencies=[Depends(verify_access_token)] 
+    description="Regular users see only active products. Admins can use the 'active_status' query parameter to see 'all', 'active', or 'inactive' products."
 )
 def read_products(
     db: Session = Depends(get_db),
@@ -57,19 +56,19 @@ def read_products(
     if is_admin:
         if active_status == "active":
             effective_is_active_filter = True
-            logger.info("Admin requested 'active' products.")
+            logger.info("Admin requested 'active' products.", extra={"sampled": True})
         elif active_status == "inactive":
             effective_is_active_filter = False
-            logger.info("Admin requested 'inactive' products.")
+            logger.info("Admin requested 'inactive' products.", extra={"sampled": True})
         elif active_status == "all":
             effective_is_active_filter = None 
-            logger.info("Admin requested 'all' products.")
+            logger.info("Admin requested 'all' products.", extra={"sampled": True})
         else: 
             effective_is_active_filter = None 
-            logger.info(f"Admin: active_status='{active_status}', defaulting to 'all' (None filter).")
+            logger.info("Admin: active_status='%s', defaulting to 'all' (None filter).", active_status, extra={"sampled": True})
     else: 
         effective_is_active_filter = True 
-        logger.info("Non-admin user. Listing only active products.")
+        logger.info("Non-admin user. Listing only active products.", extra={"sampled": True})
 
 
     products = product_service.get_products(
@@ -85,7 +84,6 @@ def read_products(
     response_model=product_schema.Product,
     summary="Get a specific product (Admins see all, users see active only)",
     description="Retrieves details for a specific product by its ID. Admins can see inactive products, regular users only see active ones.",
-    dependencies=[Depends(verify_access_token)], # Token gerekli
     responses={404: {"description": "Product not found or not accessible"}}
 )
 def read_product(
@@ -102,18 +100,21 @@ def read_product(
         is_admin = True
 
     if not is_admin and not db_product.is_active:
-        logger.info(f"Non-admin user {token_data.sub} attempted to access inactive product {product_id}.")
+        logger.info("Non-admin user %s attempted to access inactive product %s.", token_data.sub, product_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found or not available")
 
-    logger.info(f"Product {product_id} details accessed by user {token_data.sub} (role: {token_data.role}).")
+    logger.info(
+        "Product %s details accessed by user %s (role: %s).", product_id, token_data.sub, token_data.role,
+        extra={"sampled": True}
+    )
     return db_product
 
 @router.put(
     "/{product_id}",
     response_model=product_schema.Product,
     summary="Update a product (Admin only)",
-    description="Updates details for a specific product. Requires admin privileges.",
-    dependencies=[Depends(require_admin)], # Admin yetkisi kontrolü
+    description="Updates details for a specific product. Requires the `products:update` permission.",
+    dependencies=[Depends(require_permission("products:update"))],
     responses={404: {"description": "Product not found"}}
 )
 def update_existing_product(
@@ -130,8 +131,8 @@ def update_existing_product(
 @router.patch(
     "/bulk",
     summary="Bulk update products (Admin only)",
-    description="Updates multiple products based on a list of product IDs and new data. Requires admin privileges.",
-    dependencies=[Depends(require_admin)]
+    description="Updates multiple products based on a list of product IDs and new data. Requires the `products:update` permission.",
+    dependencies=[Depends(require_permission("products:update"))]
 )
 def bulk_update_existing_products(
     update_request: product_schema.ProductBulkUpdateRequest,
@@ -145,7 +146,7 @@ def bulk_update_existing_products(
     except HTTPException as e:
         raise e 
     except Exception as e:
-        logger.error(f"API Error during bulk product update: {e}", exc_info=True)
+        logger.error("API Error during bulk product update: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An error occurred during bulk update.")
 
 
@@ -154,8 +155,8 @@ def bulk_update_existing_products(
     "/{product_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a product (Admin only)",
-    description="Deletes a product permanently from the catalog. Requires admin privileges.",
-    dependencies=[Depends(require_admin)], # Admin yetkisi kontrolü
+    description="Deletes a product permanently from the catalog. Requires the `products:delete` permission.",
+    dependencies=[Depends(require_permission("products:delete"))],
     responses={404: {"description": "Product not found"}}
 )
 def delete_existing_product(
@@ -1,14 +1,21 @@
 # app/api/endpoints/reports.py
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from datetime import date, timedelta 
+from datetime import date, datetime, timedelta 
+from typing import Literal, Optional
+import os
 import logging
 
 
 from app.schemas import report as report_schema 
 from app.services import report_service          
+from app.services import report_job_service
+from app.services import export_service
 from app.db.database import get_db
-from app.core.auth import require_admin 
+from app.db.models.report import ReportJobStatus
+from app.core.auth import require_admin, get_current_user_subject
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -41,5 +48,249 @@ def get_sales_summary_report(
             **summary_data 
         )
     except Exception as e:
-        logger.error(f"Error generating sales summary report: {e}", exc_info=True)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate sales report")
\ No newline at end of file
+        logger.error("Error generating sales summary report: %s", e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate sales report")
+
+@router.get(
+    "/sales/unique-customers",
+    response_model=report_schema.UniqueCustomersReport,
+    summary="Get Approximate Unique Customers (Admin only)",
+    description=(
+        "Estimates the number of distinct users with orders in counted statuses (PROCESSING, SHIPPED, DELIVERED) "
+        "in the range by merging daily HyperLogLog sketches. Orders cancelled after being counted stay included "
+        "until the sketches are rebuilt. Bounds are an approximate 95% confidence interval."
+    ),
+    dependencies=[Depends(require_admin)]
+)
+def get_unique_customers_report(
+    start_date: date = Query(
+        default_factory=lambda: date.today() - timedelta(days=30),
+        description="Start date for the report (YYYY-MM-DD, UTC)"
+    ),
+    end_date: date = Query(
+        default_factory=date.today,
+        description="End date for the report (YYYY-MM-DD, UTC)"
+    ),
+    per_day: bool = Query(False, description="Also return an estimate for each day"),
+    db: Session = Depends(get_db)
+):
+    try:
+        data = report_service.get_unique_customers(db=db, start_date=start_date, end_date=end_date, per_day=per_day)
+        return report_schema.UniqueCustomersReport(start_date=start_date, end_date=end_date, **data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error generating unique customers report: %s", e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate customers report")
+
+@router.get(
+    "/sales/timeseries",
+    response_model=report_schema.SalesTimeseriesReport,
+    summary="Get Sales Time Series (Admin only)",
+    description="Returns order counts and revenue grouped by day, week or month in the given timezone. Closed buckets are served from cache.",
+    dependencies=[Depends(require_admin)]
+)
+def get_sales_timeseries_report(
+    start_date: date = Query(
+        default_factory=lambda: date.today() - timedelta(days=30),
+        description="Start date for the report (YYYY-MM-DD, in the given timezone)"
+    ),
+    end_date: date = Query(
+        default_factory=date.today,
+        description="End date for the report (YYYY-MM-DD, inclusive)"
+    ),
+    bucket: Literal["day", "week", "month"] = Query("day", description="Bucket size"),
+    tz: str = Query("UTC", alias="timezone", description="IANA timezone used for bucketing, e.g. Europe/Istanbul"),
+    db: Session = Depends(get_db)
+):
+    try:
+        points = report_service.get_sales_timeseries(
+            db=db, start_date=start_date, end_date=end_date, bucket=bucket, tz_name=tz
+        )
+        return report_schema.SalesTimeseriesReport(
+            start_date=start_date, end_date=end_date, bucket=bucket, timezone=tz, points=points
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error generating sales timeseries report: %s", e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate sales report")
+
+@router.get(
+    "/products/top",
+    response_model=report_schema.TopProductsReport,
+    summary="Get Top-Selling Products (Admin only)",
+    description="Returns the top N products by units sold or revenue within a date range (UTC days).",
+    dependencies=[Depends(require_admin)]
+)
+def get_top_products_report(
+    start_date: date = Query(
+        default_factory=lambda: date.today() - timedelta(days=30),
+        description="Start date for the report (YYYY-MM-DD)"
+    ),
+    end_date: date = Query(
+        default_factory=date.today,
+        description="End date for the report (YYYY-MM-DD)"
+    ),
+    limit: int = Query(10, ge=1, le=100, description="Number of products to return"),
+    order_by: Literal["units", "revenue"] = Query("units", description="Ranking metric"),
+    db: Session = Depends(get_db)
+):
+    try:
+        products = report_service.get_top_products(
+            db=db, start_date=start_date, end_date=end_date, limit=limit, order_by=order_by
+        )
+        return report_schema.TopProductsReport(
+            start_date=start_date, end_date=end_date, order_by=order_by, products=products
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error generating top products report: %s", e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate products report")
+
+@router.get(
+    "/categories/revenue",
+    response_model=report_schema.CategoryRevenueReport,
+    summary="Get Revenue per Category (Admin only)",
+    description="Returns units sold and revenue per category within a date range (UTC days).",
+    dependencies=[Depends(require_admin)]
+)
+def get_category_revenue_report(
+    start_date: date = Query(
+        default_factory=lambda: date.today() - timedelta(days=30),
+        description="Start date for the report (YYYY-MM-DD)"
+    ),
+    end_date: date = Query(
+        default_factory=date.today,
+        description="End date for the report (YYYY-MM-DD)"
+    ),
+    db: Session = Depends(get_db)
+):
+    try:
+        categories = report_service.get_category_revenue(db=db, start_date=start_date, end_date=end_date)
+        return report_schema.CategoryRevenueReport(start_date=start_date, end_date=end_date, categories=categories)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error generating category revenue report: %s", e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate category report")
+
+@router.get(
+    "/inventory",
+    response_model=report_schema.InventoryReport,
+    summary="Get Inventory Report (Admin only)",
+    description=(
+        "Returns active products with sales velocity over a trailing window, sell-through rate and estimated days of cover. "
+        "Products at or below the stock threshold, or with fewer days of cover than the cover threshold, are flagged as low stock."
+    ),
+    dependencies=[Depends(require_admin)]
+)
+def get_inventory_report(
+    window_days: int = Query(30, ge=1, le=365, description="Trailing sales window in days"),
+    low_stock_threshold: int = Query(5, ge=0, description="Stock at or below this is low"),
+    cover_days_threshold: float = Query(14.0, ge=0, description="Days of cover below this is low"),
+    only_low_stock: bool = Query(False, description="Return only low-stock products"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    try:
+        return report_service.get_inventory_report(
+            db=db, window_days=window_days, low_stock_threshold=low_stock_threshold,
+            cover_days_threshold=cover_days_threshold, only_low_stock=only_low_stock, limit=limit
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error generating inventory report: %s", e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not generate inventory report")
+
+@router.post(
+    "/jobs",
+    response_model=report_schema.ReportJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a background report job (Admin only)",
+    description="Queues a report for background execution and returns the job. Poll the job and download its result when it has SUCCEEDED.",
+    responses={503: {"description": "Too many pending report jobs"}},
+    dependencies=[Depends(require_admin)]
+)
+def submit_report_job(
+    job_in: report_schema.ReportJobCreate,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user_sub: str = Depends(get_current_user_subject)
+):
+    params = job_in.model_dump(exclude={"kind"})
+    db_job = report_job_service.submit_job(db=db, kind=job_in.kind, params=params, submitted_by=current_user_sub)
+    response.headers["Location"] = str(request.url_for("read_report_job", job_id=db_job.id))
+    return db_job
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=report_schema.ReportJob,
+    summary="Get report job status (Admin only)",
+    responses={404: {"description": "Job not found or expired"}},
+    dependencies=[Depends(require_admin)]
+)
+def read_report_job(job_id: str, db: Session = Depends(get_db)):
+    db_job = report_job_service.get_job(db=db, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found or expired")
+    return db_job
+
+@router.get(
+    "/jobs/{job_id}/result",
+    response_model=report_schema.ReportJobResult,
+    summary="Download report job result (Admin only)",
+    responses={404: {"description": "Job not found or expired"}, 409: {"description": "Job has not succeeded"}},
+    dependencies=[Depends(require_admin)]
+)
+def read_report_job_result(job_id: str, db: Session = Depends(get_db)):
+    db_job = report_job_service.get_job(db=db, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found or expired")
+    if db_job.status != ReportJobStatus.SUCCEEDED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Report job is {db_job.status.value}")
+    return report_schema.ReportJobResult(id=db_job.id, kind=db_job.kind, result=db_job.result)
+
+@router.get(
+    "/export/{dataset}",
+    response_class=FileResponse,
+    summary="Export orders / order items as Parquet or Arrow (Admin only)",
+    description=(
+        "Streams `orders` or `order_items` rows (optionally limited to a UTC date range) into a Parquet or Arrow IPC file. "
+        "For incremental exports pass the previous response's `X-Export-High-Watermark` header value as `since`."
+    ),
+    responses={200: {"content": {"application/vnd.apache.parquet": {}, "application/vnd.apache.arrow.file": {}}}},
+    dependencies=[Depends(require_admin)]
+)
+def export_orders(
+    dataset: Literal["orders", "order_items"],
+    fmt: Literal["parquet", "arrow"] = Query("parquet", alias="format", description="Output file format"),
+    start_date: Optional[date] = Query(None, description="First day to export (YYYY-MM-DD, UTC)"),
+    end_date: Optional[date] = Query(None, description="Last day to export (YYYY-MM-DD, UTC)"),
+    since: Optional[datetime] = Query(None, description="Only rows created after this timestamp (incremental export)"),
+    db: Session = Depends(get_db)
+):
+    try:
+        export_file = export_service.export_dataset(
+            db=db, dataset=dataset, fmt=fmt, start_date=start_date, end_date=end_date, since=since
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error exporting %s: %s", dataset, e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not export data")
+
+    headers = {"X-Export-Row-Count": str(export_file.row_count)}
+    if export_file.high_watermark is not None:
+        headers["X-Export-High-Watermark"] = export_file.high_watermark.isoformat()
+    return FileResponse(
+        export_file.path,
+        media_type=export_file.media_type,
+        filename=export_file.filename,
+        headers=headers,
+        background=BackgroundTask(os.unlink, export_file.path),
+    )
+
@@ -3,10 +3,16 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import FrozenSet, Optional
+import hashlib
 import logging
+import time
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.jwks import ASYMMETRIC_ALGORITHMS, key_set
+from app.core.permission_claims import PERMISSIONS_VERSION_CLAIM, decode_permissions, permission_registry
+from app.core.revocation import is_token_revoked
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,32 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 class TokenData(BaseModel):
     sub: Optional[str] = None
     role: Optional[str] = None
+    jti: Optional[str] = None
+    iat: Optional[float] = None
+    permissions: Optional[FrozenSet[str]] = None # çözülmüş `perms` claim'i; eski token'larda None
+
+# sha256(token) -> (exp, TokenData). Yalnızca başarıyla doğrulanmış token'lar cache'lenir.
+_verified_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_ENTRIES)
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+def clear_token_cache() -> None:
+    _verified_token_cache.clear()
+
+def _decode_token(token: str) -> dict:
+    """
+    Asimetrik imzalı token'lar (RS256/ES256 ...) header'daki `kid` ile yerel JWKS kopyasından
+    seçilen public anahtarla, diğerleri paylaşılan SECRET_KEY ile doğrulanır.
+    """
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        key = key_set.get_or_refresh(header.get("kid"))
+        if key is None or key.get("alg") != algorithm:
+            raise JWTError(f"Unknown signing key id: {header.get('kid')}")
+        return jwt.decode(token, key, algorithms=[algorithm])
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
 
 def verify_access_token(token: str = Depends(oauth2_scheme)) -> TokenData:
     credentials_exception = HTTPException(
@@ -23,44 +55,99 @@ def verify_access_token(token: str = Depends(oauth2_scheme)) -> TokenData:
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    cache_key = _token_cache_key(token)
+    cached = _verified_token_cache.get(cache_key)
+    if cached is not None:
+        expires_at, token_data = cached
+        if expires_at > time.time():
+            # İptal kontrolü cache'ten dönen token'lar için de yapılır (yerel set, ağ çağrısı yok)
+            if is_token_revoked(token_data.jti, token_data.sub, token_data.iat):
+                _verified_token_cache.discard(cache_key)
+                logger.info("Rejected revoked token JTI %s for subject %s.", token_data.jti, token_data.sub)
+                raise credentials_exception
+            return token_data
+        _verified_token_cache.discard(cache_key)
+
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = _decode_token(token)
         subject: Optional[str] = payload.get("sub")
         role: Optional[str] = payload.get("role") 
 
         if subject is None:
-            print("DEBUG: Subject (sub) is missing in token payload!")
+            logger.debug("Subject (sub) is missing in token payload.")
             raise credentials_exception
         if role is None:
-             print("DEBUG: Role (role) is missing or None in token payload!")
+             logger.debug("Role (role) is missing or None in token payload.")
              raise credentials_exception 
 
-        token_data = TokenData(sub=subject, role=role)
+        permissions_version = payload.get(PERMISSIONS_VERSION_CLAIM)
+        if permissions_version is not None:
+            # user_service registry'yi değiştirmiş olabilir; bilinmeyen versiyonda registry yeniden çekilir
+            permission_registry.ensure_version(permissions_version)
+        permissions = decode_permissions(payload)
+        if permissions is None and permissions_version is not None:
+            # Versiyon hâlâ uyuşmuyor: izinler güvenilir şekilde çözülemez, `role` kontrolüne düşülür.
+            logger.warning(
+                "Permission registry version %s of token for subject %s is unknown; falling back to role check.",
+                permissions_version, subject
+            )
+
+        token_data = TokenData(
+            sub=subject, role=role, jti=payload.get("jti"), iat=payload.get("iat"),
+            permissions=permissions
+        )
+        expires_at = payload.get("exp")
 
+    except HTTPException:
+        raise
     except KeyError as e:
-        print(f"DEBUG: KeyError accessing payload: {e}")
+        logger.debug("KeyError accessing payload: %s", e)
         raise credentials_exception from e
     except JWTError as e:
-        print(f"DEBUG: JWTError decoding token: {e}")
+        logger.debug("JWTError decoding token: %s", e)
         raise credentials_exception from e
     except Exception as e:
-        print(f"DEBUG: Unexpected error in verify_access_token: {e}")
+        logger.warning("Unexpected error in verify_access_token: %s", e)
         raise credentials_exception from e
 
 
-    print(f"DEBUG: Decoded token data in verify_access_token: {token_data}")
+    if is_token_revoked(token_data.jti, token_data.sub, token_data.iat):
+        logger.info("Rejected revoked token JTI %s for subject %s.", token_data.jti, token_data.sub)
+        raise credentials_exception
+
+    logger.debug("Decoded token for subject %s (role: %s).", token_data.sub, token_data.role)
+    if isinstance(expires_at, (int, float)):
+        remaining = expires_at - time.time()
+        if remaining > 0:
+            _verified_token_cache.set(cache_key, (expires_at, token_data), ttl_seconds=remaining)
     return token_data
 
 async def require_admin(token_data: TokenData = Depends(verify_access_token)):
     if not token_data.role or token_data.role.lower() != "admin":
-        logger.warning(f"Admin privilege check failed for subject: {token_data.sub}, role: {token_data.role}")
+        logger.warning("Admin privilege check failed for subject: %s, role: %s", token_data.sub, token_data.role)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Administrator privileges required",
         )
-    logger.debug(f"Admin access granted for subject: {token_data.sub}")
+    logger.debug("Admin access granted for subject: %s", token_data.sub)
+
+def require_permission(permission_name: str):
+    """
+    Token'daki `perms` claim'i ile izin kontrolü (I/O yok). İzin claim'i taşımayan ya da registry
+    versiyonu çözülemeyen token'lar için kaba `role` kontrolüne düşülür.
+    """
+    async def _require_permission(token_data: TokenData = Depends(verify_access_token)):
+        if token_data.permissions is not None:
+            allowed = permission_name in token_data.permissions
+        else:
+            allowed = bool(token_data.role) and token_data.role.lower() == "admin"
+        if not allowed:
+            logger.warning("Permission check '%s' failed for subject: %s", permission_name, token_data.sub)
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission '{permission_name}' required",
+            )
+    return _require_permission
 
 def get_current_user_subject(token_data: TokenData = Depends(verify_access_token)) -> str:
     return token_data.sub
\ No newline at end of file
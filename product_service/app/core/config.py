@@ -2,15 +2,69 @@
 import os
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    # Opsiyonel Redis ayarları
-    # REDIS_HOST: str = "localhost"
-    # REDIS_PORT: int = 6379
+    # user_service'in asimetrik imzalı token'ları için public key set'i (bkz. app/core/jwks.py).
+    # Tanımlı değilse yalnızca SECRET_KEY/ALGORITHM ile imzalanmış token'lar kabul edilir.
+    JWKS_URL: Optional[str] = None
+    JWKS_REFRESH_INTERVAL_SECONDS: int = 300
+    JWKS_MIN_REFRESH_INTERVAL_SECONDS: int = 30
+    JWKS_FETCH_TIMEOUT_SECONDS: float = 2.0
+    # `perms` claim'inin bit sırası (bkz. app/core/permission_claims.py); JWKS ile aynı aralıklarla yenilenir.
+    # Tanımlı değilse koddaki bootstrap registry kullanılır.
+    PERMISSION_REGISTRY_URL: Optional[str] = None
+    # Doğrulanmış token claim'leri için process içi LRU cache (token exp'ine kadar geçerli)
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+
+    # Logging (bkz. app/core/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json" # json | text
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATE: float = 0.1 # Örneklenen yüksek hacimli olayların geçirilme oranı
+    LOG_SAMPLED_LOGGERS: str = "uvicorn.access"
+
+    # user_service'in token blacklist'inin bulunduğu Redis; iptal edilen token'lar buradan
+    # pub/sub ile process içine kopyalanır (bkz. app/core/revocation.py)
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_BLACKLIST_DB: int = 1
+    REDIS_REVOCATION_CHANNEL: str = "token_revocations"
+    REVOCATION_SYNC_ENABLED: bool = True
+    REVOCATION_PURGE_INTERVAL_SECONDS: int = 60
+
+    # orders / order_items aylık partition ayarları
+    ORDER_PARTITION_PREMAKE_MONTHS: int = 3
+    # Geriye dönük tarihli siparişler (ay başında dünün siparişi, import) için geçmiş ay partition'ları
+    ORDER_PARTITION_PAST_MONTHS: int = 1
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 6 * 60 * 60
+
+    # Rapor cache'i (kapanmış zaman dilimlerinin sonuçları)
+    REPORT_CACHE_MAX_ENTRIES: int = 10000
+    REPORT_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    INVENTORY_REPORT_CACHE_TTL_SECONDS: int = 60
+
+    # Arka plan rapor işleri; kendi bağlantı havuzlarını kullanırlar (havuz boyutu = worker sayısı)
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOB_MAX_PENDING: int = 20
+    REPORT_JOB_RESULT_TTL_SECONDS: int = 60 * 60
+    REPORT_JOB_STATEMENT_TIMEOUT_MS: int = 10 * 60 * 1000
+    REPORT_JOB_CLEANUP_INTERVAL_SECONDS: int = 10 * 60
+    # Bu süreden uzun QUEUED/RUNNING kalan işler (çöken ya da kapanan replika) FAILED işaretlenir;
+    # kuyruk bekleme süresi + statement timeout'tan uzun olmalı
+    REPORT_JOB_STALE_AFTER_SECONDS: int = 2 * 60 * 60
+
+    # Müşteri HLL sketch'lerinin orders'tan yeniden hesaplanmasında okunan satır grubu
+    CUSTOMER_SKETCH_REBUILD_BATCH_SIZE: int = 50000
+
+    # Parquet / Arrow export
+    EXPORT_BATCH_SIZE: int = 50000
+    # Henüz commit edilmemiş siparişleri kaçırmamak için export'un üst sınırı now() - lag ile kırpılır
+    EXPORT_WATERMARK_LAG_SECONDS: int = 60
 
     class Config:
         env_file = ".env"
@@ -20,4 +74,4 @@ class Settings(BaseSettings):
 def get_settings():
     return Settings()
 
-settings = get_settings()
\ No newline at end of file
+settings = get_settings()
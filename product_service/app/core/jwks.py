@@ -0,0 +1,78 @@
+# app/core/jwks.py
+"""
+user_service'in `/.well-known/jwks.json` adresinden alınan public anahtarların process içi kopyası.
+
+Anahtarlar `kid` ile tutulur ve lifespan'deki arka plan task'ı tarafından
+`JWKS_REFRESH_INTERVAL_SECONDS` aralıklarla yenilenir; token doğrulama ağ çağrısı yapmaz.
+Bilinmeyen bir `kid` geldiğinde (ör. anahtar rotasyonu ile periyodik yenileme arasında) key set
+en fazla `JWKS_MIN_REFRESH_INTERVAL_SECONDS`'de bir senkron olarak yeniden çekilir.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class KeySet:
+    def __init__(self):
+        self._keys: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._last_fetch = 0.0
+
+    def get(self, kid: Optional[str]) -> Optional[dict]:
+        return self._keys.get(kid) if kid is not None else None
+
+    def replace(self, keys: Dict[str, dict]) -> None:
+        # Okuyucular kilitsiz okur; sözlük bütün olarak değiştirilir.
+        self._keys = dict(keys)
+
+    def refresh(self) -> bool:
+        """JWKS'i çekip key set'i değiştirir. JWKS_URL tanımlı değilse ya da istek başarısızsa False."""
+        if not settings.JWKS_URL:
+            return False
+        with self._lock:
+            self._last_fetch = time.monotonic()
+            try:
+                response = httpx.get(settings.JWKS_URL, timeout=settings.JWKS_FETCH_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                keys = {
+                    key["kid"]: key for key in response.json().get("keys", [])
+                    if key.get("kid") and key.get("alg") in ASYMMETRIC_ALGORITHMS
+                }
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                logger.warning("Could not refresh JWKS from %s: %s", settings.JWKS_URL, e)
+                return False
+            self.replace(keys)
+        logger.debug("JWKS refreshed: %s key(s).", len(keys))
+        return True
+
+    def get_or_refresh(self, kid: Optional[str]) -> Optional[dict]:
+        key = self.get(kid)
+        if key is not None or kid is None:
+            return key
+        if time.monotonic() - self._last_fetch >= settings.JWKS_MIN_REFRESH_INTERVAL_SECONDS:
+            logger.info("Unknown signing key id %s; refreshing JWKS.", kid)
+            self.refresh()
+        return self.get(kid)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+key_set = KeySet()
+
+
+async def run_jwks_refresh() -> None:
+    """Lifespan'de arka plan task'ı olarak çalışır."""
+    while True:
+        await asyncio.to_thread(key_set.refresh)
+        await asyncio.sleep(settings.JWKS_REFRESH_INTERVAL_SECONDS)
@@ -0,0 +1,157 @@
+# app/core/permission_claims.py
+"""
+user_service'in access token'lara gömdüğü kompakt izin claim'inin (`pv` + `perms`) çözümü.
+
+`perms`, izin registry'sinin sırasına göre bir bitset'tir (izin i -> bit i, base64url); `pv`
+registry'nin versiyonudur. Registry user_service'in `/.well-known/permission-registry.json`
+adresinden (`PERMISSION_REGISTRY_URL`) alınır ve JWKS gibi lifespan'deki arka plan task'ı
+tarafından yenilenir; bilinmeyen bir `pv` geldiğinde en fazla `JWKS_MIN_REFRESH_INTERVAL_SECONDS`'de
+bir senkron olarak yeniden çekilir.
+
+`BOOTSTRAP_PERMISSION_REGISTRY` URL tanımlı değilken ya da registry henüz çekilemediyken kullanılır;
+user_service/app/initial_data.py içindeki `PERMISSIONS` ile aynı kaldığı
+tests/test_shared_modules.py'de kontrol edilir. Versiyon yine de uyuşmazsa claim çözülmez ve
+çağıran `role` kontrolüne düşer.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PERMISSIONS_VERSION_CLAIM = "pv"
+PERMISSIONS_CLAIM = "perms"
+
+BOOTSTRAP_PERMISSION_REGISTRY: Tuple[str, ...] = (
+    "users:read_self",
+    "users:update_self",
+    "users:delete_self",
+    "users:read_all",
+    "users:update_any",
+    "users:delete_any",
+    "users:reset_password_any",
+    "users:manage_roles",
+    "addresses:create_own",
+    "addresses:read_own",
+    "addresses:update_own",
+    "addresses:delete_own",
+    "contacts:create_own",
+    "contacts:read_own",
+    "contacts:update_own",
+    "contacts:delete_own",
+    "products:create",
+    "products:update",
+    "products:delete",
+)
+
+
+def registry_version(permissions: Iterable[str]) -> str:
+    """user_service ile aynı hesap: sıralı izin isimlerinin hash'i."""
+    return hashlib.sha256("\n".join(permissions).encode("utf-8")).hexdigest()[:8]
+
+
+class PermissionRegistry:
+    def __init__(self, permissions: Iterable[str]):
+        self._lock = threading.Lock()
+        self._last_fetch = 0.0
+        self.replace(permissions)
+
+    def replace(self, permissions: Iterable[str]) -> None:
+        permissions = tuple(permissions)
+        bits = {name: 1 << index for index, name in enumerate(permissions)}
+        # Okuyucular kilitsiz okur; (versiyon, izinler, bitler) bütün olarak değiştirilir.
+        self._snapshot: Tuple[str, Tuple[str, ...], Dict[str, int]] = (registry_version(permissions), permissions, bits)
+
+    @property
+    def version(self) -> str:
+        return self._snapshot[0]
+
+    @property
+    def permissions(self) -> Tuple[str, ...]:
+        return self._snapshot[1]
+
+    def snapshot(self) -> Tuple[str, Tuple[str, ...], Dict[str, int]]:
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        """Registry'yi user_service'ten çeker. URL tanımlı değilse, istek başarısızsa ya da yanıt tutarsızsa False."""
+        if not settings.PERMISSION_REGISTRY_URL:
+            return False
+        with self._lock:
+            self._last_fetch = time.monotonic()
+            try:
+                response = httpx.get(settings.PERMISSION_REGISTRY_URL, timeout=settings.JWKS_FETCH_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                body = response.json()
+                permissions = tuple(str(name) for name in body["permissions"])
+                version = body["version"]
+            except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+                logger.warning("Could not refresh permission registry from %s: %s", settings.PERMISSION_REGISTRY_URL, e)
+                return False
+            if registry_version(permissions) != version:
+                logger.warning("Ignoring permission registry with mismatching version %s.", version)
+                return False
+            if version != self.version:
+                logger.info("Permission registry changed: %s -> %s (%s permission(s)).", self.version, version, len(permissions))
+            self.replace(permissions)
+        return True
+
+    def ensure_version(self, version: str) -> bool:
+        """Token'daki `pv` bilinmiyorsa registry'yi (sınırlı sıklıkta) yeniden çeker; sonunda eşleşiyor mu döner."""
+        if version == self.version:
+            return True
+        if time.monotonic() - self._last_fetch >= settings.JWKS_MIN_REFRESH_INTERVAL_SECONDS:
+            logger.info("Unknown permission registry version %s; refreshing registry.", version)
+            self.refresh()
+        return version == self.version
+
+
+permission_registry = PermissionRegistry(BOOTSTRAP_PERMISSION_REGISTRY)
+
+
+def encode_permissions(permission_names: Iterable[str]) -> str:
+    _, permissions, bits_by_name = permission_registry.snapshot()
+    bits = 0
+    for name in permission_names:
+        bits |= bits_by_name.get(name, 0)
+    raw = bits.to_bytes((len(permissions) + 7) // 8, "little")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def permission_claims(permission_names: Iterable[str]) -> dict:
+    return {
+        PERMISSIONS_VERSION_CLAIM: permission_registry.version,
+        PERMISSIONS_CLAIM: encode_permissions(permission_names),
+    }
+
+
+def decode_permissions(payload: dict) -> Optional[FrozenSet[str]]:
+    """
+    Claim yoksa, versiyon uyuşmuyorsa ya da bozuksa None. Sonuç izin isimleridir; bitler tek bir
+    registry snapshot'ıyla çözülür, sonradan registry değişse de cache'teki token'lar etkilenmez.
+    """
+    version, permissions, _ = permission_registry.snapshot()
+    encoded = payload.get(PERMISSIONS_CLAIM)
+    if payload.get(PERMISSIONS_VERSION_CLAIM) != version or not isinstance(encoded, str):
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    except ValueError:
+        return None
+    bits = int.from_bytes(raw, "little")
+    return frozenset(name for index, name in enumerate(permissions) if bits >> index & 1)
+
+
+async def run_permission_registry_refresh() -> None:
+    """Lifespan'de arka plan task'ı olarak çalışır."""
+    while True:
+        await asyncio.to_thread(permission_registry.refresh)
+        await asyncio.sleep(settings.JWKS_REFRESH_INTERVAL_SECONDS)
@@ -0,0 +1,205 @@
+# app/core/revocation.py
+"""
+user_service'te iptal edilen (logout) token'ların process içi kopyası.
+
+user_service logout'ta `blacklist:{jti}` anahtarını yazar ve aynı anda
+`REDIS_REVOCATION_CHANNEL` kanalına `{"jti": ..., "exp": ...}` yayınlar. Logout-all, şifre
+değişikliği ve pasife almada ise `tokens_valid_after:{username}` yazılır ve
+`{"sub": ..., "valid_after": ..., "exp": ...}` yayınlanır: o kullanıcının iat'i valid_after'dan
+önce olan tüm token'ları geçersizdir. Bu servis kanala abone olur ve her iki türü de exp
+zamanına kadar bellekte tutar; böylece her istekte yapılan kontrol Redis'e gitmeden O(1) bir
+dict aramasıdır.
+
+Bağlantı koparsa yeniden bağlanırken önce kanala abone olunur, sonra mevcut `blacklist:*` ve
+`tokens_valid_after:*` anahtarları SCAN ile okunur; arada yayınlanan iptaller kaybolmaz. Bağlantı yokken gelen
+iptaller yeniden bağlanana kadar görülmez (fail-open); bu süre log'da uyarı olarak görünür.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_KEY_PREFIX = "blacklist:"
+USER_EPOCH_KEY_PREFIX = "tokens_valid_after:"
+
+
+class RevokedTokenSet:
+    """jti -> exp (epoch saniye). Süresi dolmuş JTI'ler zaten reddedildiği için periyodik olarak silinir."""
+
+    def __init__(self):
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._expiry[jti] = max(expires_at, self._expiry.get(jti, 0.0))
+
+    def __contains__(self, jti: str) -> bool:
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [jti for jti, expires_at in self._expiry.items() if expires_at <= now]
+            for jti in expired:
+                del self._expiry[jti]
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry.clear()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+class UserTokenEpochs:
+    """sub -> (valid_after, exp). valid_after'dan önce verilmiş (iat) token'lar geçersizdir."""
+
+    def __init__(self):
+        self._epochs: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def set(self, subject: str, valid_after: float, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            current = self._epochs.get(subject)
+            if current is None or valid_after >= current[0]:
+                self._epochs[subject] = (valid_after, max(expires_at, current[1] if current else 0.0))
+
+    def revokes(self, subject: str, issued_at: Optional[float]) -> bool:
+        entry = self._epochs.get(subject)
+        if entry is None or entry[1] <= time.time():
+            return False
+        return issued_at is None or issued_at < entry[0]
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [subject for subject, (_, expires_at) in self._epochs.items() if expires_at <= now]
+            for subject in expired:
+                del self._epochs[subject]
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epochs.clear()
+
+    def __len__(self) -> int:
+        return len(self._epochs)
+
+
+revoked_tokens = RevokedTokenSet()
+user_epochs = UserTokenEpochs()
+
+
+def is_token_revoked(jti: Optional[str], subject: Optional[str] = None, issued_at: Optional[float] = None) -> bool:
+    if jti is not None and jti in revoked_tokens:
+        return True
+    return subject is not None and user_epochs.revokes(subject, issued_at)
+
+
+def handle_revocation_message(data: str) -> None:
+    try:
+        message = json.loads(data)
+        if "sub" in message:
+            user_epochs.set(str(message["sub"]), float(message["valid_after"]), float(message["exp"]))
+        else:
+            revoked_tokens.add(str(message["jti"]), float(message["exp"]))
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.warning("Ignoring malformed revocation message %r: %s", data, e)
+
+
+async def _load_revocations(client: redis.Redis) -> int:
+    loaded = 0
+    for prefix in (BLACKLIST_KEY_PREFIX, USER_EPOCH_KEY_PREFIX):
+        batch = []
+        async for key in client.scan_iter(match=f"{prefix}*", count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                loaded += await _load_batch(client, prefix, batch)
+                batch = []
+        if batch:
+            loaded += await _load_batch(client, prefix, batch)
+    return loaded
+
+
+async def _load_batch(client: redis.Redis, prefix: str, keys: list) -> int:
+    now = time.time()
+    async with client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.ttl(key)
+            pipe.get(key)
+        replies = await pipe.execute()
+    loaded = 0
+    for key, ttl, value in zip(keys, replies[0::2], replies[1::2]):
+        # -1: süresiz, -2: bu arada silinmiş
+        if ttl == -2 or value is None:
+            continue
+        expires_at = now + ttl if ttl > 0 else now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        name = key[len(prefix):]
+        if prefix == USER_EPOCH_KEY_PREFIX:
+            try:
+                user_epochs.set(name, float(value), expires_at)
+            except ValueError:
+                continue
+        else:
+            revoked_tokens.add(name, expires_at)
+        loaded += 1
+    return loaded
+
+
+async def _sync_once() -> None:
+    client = redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_BLACKLIST_DB,
+        decode_responses=True,
+    )
+    try:
+        async with client.pubsub() as pubsub:
+            await pubsub.subscribe(settings.REDIS_REVOCATION_CHANNEL)
+            loaded = await _load_revocations(client)
+            logger.info("Token revocation mirror synced (%s revocation entries loaded).", loaded)
+
+            next_purge = time.monotonic() + settings.REVOCATION_PURGE_INTERVAL_SECONDS
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None and message["type"] == "message":
+                    handle_revocation_message(message["data"])
+                if time.monotonic() >= next_purge:
+                    revoked_tokens.purge_expired()
+                    user_epochs.purge_expired()
+                    next_purge = time.monotonic() + settings.REVOCATION_PURGE_INTERVAL_SECONDS
+    finally:
+        await client.aclose()
+
+
+async def run_revocation_sync() -> None:
+    """Lifespan'de arka plan task'ı olarak çalışır; bağlantı hatalarında artan bekleme ile yeniden dener."""
+    delay = 1.0
+    while True:
+        started = time.monotonic()
+        try:
+            await _sync_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Uzun süre ayakta kalmış bir bağlantı koptuysa beklemeyi sıfırla
+            if time.monotonic() - started > 60.0:
+                delay = 1.0
+            logger.warning("Token revocation sync interrupted, retrying in %.0fs: %s", delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
@@ -1,9 +1,11 @@
 # app/db/models/order.py
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, func, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, ForeignKeyConstraint, Float, DateTime, Index, func, event, Enum as SQLEnum
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 import enum
 
 from app.db.database import Base
+from app.db.partitions import create_initial_partitions
 from .product import Product
 
 class OrderStatus(str, enum.Enum):
@@ -13,14 +15,25 @@ class OrderStatus(str, enum.Enum):
     DELIVERED = "DELIVERED"     
     CANCELLED = "CANCELLED"     
 
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Order(Base):
     __tablename__ = "orders"
+    # created_at ayına göre RANGE partition; partition anahtarı PK'nın parçası olmak zorunda.
+    __table_args__ = (
+        # Satış raporları için covering index: tabloya dönmeden index-only scan.
+        Index("ix_orders_status_created_at", "status", "created_at", postgresql_include=["total_amount"]),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(String, index=True, nullable=False)
     total_amount = Column(Float, nullable=False) 
     status = Column(SQLEnum(OrderStatus), nullable=False, default=OrderStatus.PENDING)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=_utcnow, server_default=func.now())
 
     items = relationship(
         "OrderItem",
@@ -35,9 +48,22 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    # Kalemler siparişin ayındaki partition'a düşer; join'ler (order_id, order_created_at) üzerinden budanır.
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"], ["orders.id", "orders.created_at"], ondelete="CASCADE"
+        ),
+        # Ürün/kategori raporları için covering index: kalem satırlarına dönmeden toplanır.
+        Index(
+            "ix_order_items_order_created_at", "order_created_at", "order_id",
+            postgresql_include=["product_id", "quantity", "price_at_purchase"],
+        ),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(Integer, nullable=False)
+    order_created_at = Column(DateTime(timezone=True), primary_key=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="SET NULL"), nullable=True) 
     quantity = Column(Integer, nullable=False)
     price_at_purchase = Column(Float, nullable=False)
@@ -46,4 +72,8 @@ class OrderItem(Base):
     product = relationship("Product", lazy="joined")
 
     def __repr__(self):
-         return f"<OrderItem(id={self.id}, order_id={self.order_id}, product_id={self.product_id}, quantity={self.quantity})>"
\ No newline at end of file
+         return f"<OrderItem(id={self.id}, order_id={self.order_id}, product_id={self.product_id}, quantity={self.quantity})>"
+
+
+event.listen(Order.__table__, "after_create", create_initial_partitions)
+event.listen(OrderItem.__table__, "after_create", create_initial_partitions)
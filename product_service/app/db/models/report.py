@@ -0,0 +1,63 @@
+# app/db/models/report.py
+from sqlalchemy import Column, Integer, SmallInteger, Float, Date, DateTime, String, Text, JSON, func, Enum as SQLEnum
+import enum
+
+from app.db.database import Base
+from .order import OrderStatus
+
+class DailySales(Base):
+    """
+    Sipariş sayısı ve cirosunun (UTC) gün + durum bazında özeti.
+    Sipariş oluşturma ve durum değişikliği ile aynı transaction içinde güncellenir.
+    """
+    __tablename__ = "daily_sales"
+
+    day = Column(Date, primary_key=True)
+    status = Column(SQLEnum(OrderStatus), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0, server_default="0")
+    revenue = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    def __repr__(self):
+        return f"<DailySales(day={self.day}, status='{self.status}', order_count={self.order_count}, revenue={self.revenue})>"
+
+
+class DailyCustomerSketch(Base):
+    """
+    Gün bazında sipariş veren kullanıcıların (user_id) HyperLogLog sketch'i; sıfır olmayan her
+    register bir satırdır. Sipariş oluşturma ile aynı transaction içinde GREATEST ile güncellenir.
+    """
+    __tablename__ = "daily_customer_hll"
+
+    day = Column(Date, primary_key=True)
+    register = Column(SmallInteger, primary_key=True)
+    rank = Column(SmallInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<DailyCustomerSketch(day={self.day}, register={self.register}, rank={self.rank})>"
+
+
+class ReportJobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class ReportJob(Base):
+    """Arka planda çalışan rapor işi; sonuç `expires_at` sonrasında silinir."""
+    __tablename__ = "report_jobs"
+
+    id = Column(String(36), primary_key=True) # uuid4
+    kind = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False)
+    status = Column(SQLEnum(ReportJobStatus), nullable=False, default=ReportJobStatus.QUEUED, index=True)
+    submitted_by = Column(String, nullable=False, index=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<ReportJob(id='{self.id}', kind='{self.kind}', status='{self.status}')>"
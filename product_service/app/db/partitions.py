@@ -0,0 +1,160 @@
+# app/db/partitions.py
+"""
+orders / order_items tabloları için aylık RANGE partition yönetimi.
+
+Her iki tablo da `created_at` ayına göre bölünür (order_items için partition
+anahtarı, siparişten kopyalanan `order_created_at` kolonudur). Partition'lar
+`<tablo>_yYYYYmMM` adıyla oluşturulur; her zaman birkaç ay ilerisi ve
+`ORDER_PARTITION_PAST_MONTHS` ay gerisi hazır tutulur, böylece yeni ve yakın
+geçmiş tarihli siparişler partition'sız bir aralığa düşmez. Daha eski tarihli
+veri (import) için önce `ensure_month_partitions` çağrılmalıdır.
+"""
+import logging
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ORDER_TABLES = ("orders", "order_items")
+LEGACY_SUFFIX = "_legacy"
+
+
+def month_floor(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + (month.month - 1) + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def get_relkind(conn: Connection, table: str) -> Optional[str]:
+    """'p' partitioned, 'r' normal tablo, tablo yoksa None."""
+    return conn.execute(
+        text(
+            "SELECT c.relkind FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = :table AND n.nspname = current_schema()"
+        ),
+        {"table": table},
+    ).scalar()
+
+
+def create_month_partition(conn: Connection, table: str, month: date) -> None:
+    # Sınırlar kod tarafından üretilen tarihlerdir, kullanıcı girdisi değildir.
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+        f"PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+
+
+def ensure_month_partitions(conn: Connection, table: str, first_month: date, last_month: date) -> None:
+    month = month_floor(first_month)
+    while month <= last_month:
+        create_month_partition(conn, table, month)
+        month = add_months(month, 1)
+
+
+def _premake_window(premake_months: Optional[int] = None) -> tuple[date, date]:
+    if premake_months is None:
+        premake_months = settings.ORDER_PARTITION_PREMAKE_MONTHS
+    current = month_floor(datetime.now(timezone.utc))
+    return add_months(current, -settings.ORDER_PARTITION_PAST_MONTHS), add_months(current, premake_months)
+
+
+def ensure_order_partitions(engine: Engine, premake_months: Optional[int] = None) -> None:
+    """Geçmiş `ORDER_PARTITION_PAST_MONTHS` ay, bu ay ve ileriki `premake_months` ay için partition'ları oluşturur (idempotent)."""
+    first_month, last_month = _premake_window(premake_months)
+    with engine.begin() as conn:
+        for table in ORDER_TABLES:
+            if get_relkind(conn, table) != "p":
+                continue
+            ensure_month_partitions(conn, table, first_month, last_month)
+    logger.info("Order partitions ensured through %s.", last_month.isoformat())
+
+
+def create_initial_partitions(target, connection: Connection, **kw) -> None:
+    """`after_create` listener'ı: create_all ile oluşturulan tabloya partition ekler."""
+    if connection.dialect.name != "postgresql":
+        return
+    first_month, last_month = _premake_window()
+    ensure_month_partitions(connection, target.name, first_month, last_month)
+
+
+def _rename_legacy_table(conn: Connection, table: str) -> None:
+    legacy = f"{table}{LEGACY_SUFFIX}"
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    # Index ve sequence isimleri şema seviyesinde tekildir; create_all ile çakışmasınlar.
+    index_names = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+        {"table": legacy},
+    ).scalars().all()
+    for index_name in index_names:
+        conn.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{index_name}{LEGACY_SUFFIX}"'))
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": legacy}).scalar()
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {legacy}_id_seq"))
+
+
+def migrate_legacy_order_tables(engine: Engine, drop_legacy: bool = False) -> bool:
+    """
+    `Base.metadata.create_all` ile oluşturulmuş partition'sız orders/order_items
+    tablolarını partition'lı yapıya taşır. Tek transaction içinde çalışır:
+    eski tablolar `_legacy` son ekiyle yeniden adlandırılır, yeni tablolar ve
+    verinin kapsadığı tüm aylar için partition'lar oluşturulur, veri kopyalanır
+    ve id sequence'ları ilerletilir. Taşıma yapıldıysa True döner.
+    """
+    from app.db.models.order import Order, OrderItem
+
+    with engine.begin() as conn:
+        if get_relkind(conn, "orders") != "r":
+            return False
+
+        logger.warning("Legacy (non-partitioned) order tables detected, migrating to monthly partitions...")
+        for table in ORDER_TABLES:
+            if get_relkind(conn, table) == "r":
+                _rename_legacy_table(conn, table)
+
+        Order.__table__.create(bind=conn, checkfirst=True)
+        OrderItem.__table__.create(bind=conn, checkfirst=True)
+
+        oldest = conn.execute(text("SELECT min(created_at) FROM orders_legacy")).scalar()
+        first_month, last_month = _premake_window()
+        if oldest is not None:
+            first_month = min(first_month, month_floor(oldest))
+        for table in ORDER_TABLES:
+            ensure_month_partitions(conn, table, first_month, last_month)
+
+        conn.execute(text(
+            "INSERT INTO orders (id, user_id, total_amount, status, created_at) "
+            "SELECT id, user_id, total_amount, status, COALESCE(created_at, now()) FROM orders_legacy"
+        ))
+        if get_relkind(conn, "order_items_legacy") == "r":
+            conn.execute(text(
+                "INSERT INTO order_items (id, order_id, order_created_at, product_id, quantity, price_at_purchase) "
+                "SELECT i.id, i.order_id, o.created_at, i.product_id, i.quantity, i.price_at_purchase "
+                "FROM order_items_legacy i JOIN orders o ON o.id = i.order_id"
+            ))
+        for table in ORDER_TABLES:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"
+            ))
+
+        if drop_legacy:
+            conn.execute(text("DROP TABLE IF EXISTS order_items_legacy"))
+            conn.execute(text("DROP TABLE IF EXISTS orders_legacy"))
+
+    logger.warning("Order tables migrated to monthly partitions (legacy tables %s).",
+                   "dropped" if drop_legacy else "kept with '_legacy' suffix")
+    return True
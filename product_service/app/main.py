@@ -1,21 +1,101 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.api.endpoints import products, cart as cart_api, orders, categories, reports 
-from app.db.database import engine, Base
-from app.db.models import product, cart as cart_model, order, category 
+from app.api.endpoints import products, cart as cart_api, orders, categories, reports
+from app.core.config import settings
+from app.core.logging_config import setup_logging_from_settings
+from app.core.jwks import run_jwks_refresh
+from app.core.permission_claims import run_permission_registry_refresh
+from app.core.revocation import run_revocation_sync
+from app.db.database import engine, Base, SessionLocal
+from app.db.models import product, cart as cart_model, order, category, report as report_model
+from app.db.partitions import ensure_order_partitions, migrate_legacy_order_tables
+from app.services import report_service, report_job_service
+
+setup_logging_from_settings()
+logger = logging.getLogger(__name__)
+
+
+async def _partition_maintenance_loop():
+    """İleriki aylar için order partition'larını periyodik olarak hazır tutar."""
+    while True:
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(ensure_order_partitions, engine)
+        except Exception as e:
+            logger.error("Order partition maintenance failed: %s", e, exc_info=True)
+
+
+def _clean_up_report_jobs() -> None:
+    with SessionLocal() as db:
+        failed = report_job_service.fail_stale_jobs(db)
+        if failed:
+            logger.warning("Marked %s stale report jobs as failed.", failed)
+        purged = report_job_service.purge_expired_jobs(db)
+        if purged:
+            logger.info("Purged %s expired report jobs.", purged)
+
+
+async def _report_job_cleanup_loop():
+    """Takılı kalmış işleri FAILED yapar ve süresi dolmuş rapor işi sonuçlarını siler."""
+    while True:
+        await asyncio.sleep(settings.REPORT_JOB_CLEANUP_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(_clean_up_report_jobs)
+        except Exception as e:
+            logger.error("Report job cleanup failed: %s", e, exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        logger.info("Attempting to create database tables...")
+        migrate_legacy_order_tables(engine)
+        Base.metadata.create_all(bind=engine)
+        # create_all mevcut tablolara sonradan eklenen index'leri oluşturmaz.
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        ensure_order_partitions(engine)
+        logger.info("Database tables check/creation complete.")
+    except Exception as e:
+        logger.error("Error creating database tables: %s", e, exc_info=True)
+
+    try:
+        with SessionLocal() as db:
+            if report_service.backfill_rollups_if_empty(db):
+                logger.info("Report rollups backfilled from existing orders.")
+    except Exception as e:
+        logger.error("Report rollup backfill failed: %s", e, exc_info=True)
+
+    try:
+        _clean_up_report_jobs()
+    except Exception as e:
+        logger.error("Report job cleanup failed: %s", e, exc_info=True)
+
+    maintenance_task = asyncio.create_task(_partition_maintenance_loop())
+    cleanup_task = asyncio.create_task(_report_job_cleanup_loop())
+    revocation_task = asyncio.create_task(run_revocation_sync()) if settings.REVOCATION_SYNC_ENABLED else None
+    jwks_task = asyncio.create_task(run_jwks_refresh()) if settings.JWKS_URL else None
+    registry_task = asyncio.create_task(run_permission_registry_refresh()) if settings.PERMISSION_REGISTRY_URL else None
+    yield
 
+    maintenance_task.cancel()
+    cleanup_task.cancel()
+    for task in (revocation_task, jwks_task, registry_task):
+        if task is not None:
+            task.cancel()
+    report_job_service.shutdown()
 
-try:
-    print("Attempting to create database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables check/creation complete.")
-except Exception as e:
-    print(f"Error creating database tables: {e}")
 
 app = FastAPI(
     title="Product Service API",
     description="API for managing products, categories, carts, and orders.",
     version="0.1.0",
+    lifespan=lifespan,
     openapi_extra = {
         "components": {
             "securitySchemes": {
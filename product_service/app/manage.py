@@ -0,0 +1,73 @@
+# app/manage.py
+"""
+Bakım komutları. Kullanım (container içinde, /code dizininden):
+
+    python -m app.manage migrate-order-partitions [--drop-legacy]
+    python -m app.manage ensure-order-partitions [--months N]
+    python -m app.manage rebuild-daily-sales [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+"""
+import argparse
+import logging
+from datetime import date
+
+from app.core.logging_config import setup_logging_from_settings
+from app.db.database import engine, Base, SessionLocal
+from app.db.models import product, cart, order, category, report
+from app.db.partitions import ensure_order_partitions, migrate_legacy_order_tables
+from app.services import report_service
+
+logger = logging.getLogger(__name__)
+
+
+def cmd_migrate_order_partitions(args: argparse.Namespace) -> None:
+    migrated = migrate_legacy_order_tables(engine, drop_legacy=args.drop_legacy)
+    if not migrated:
+        logger.info("Order tables are already partitioned (or missing); nothing to migrate.")
+    Base.metadata.create_all(bind=engine)
+
+
+def cmd_ensure_order_partitions(args: argparse.Namespace) -> None:
+    ensure_order_partitions(engine, premake_months=args.months)
+
+
+def cmd_rebuild_daily_sales(args: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        written = report_service.rebuild_daily_sales(db, start_date=args.start, end_date=args.end)
+        sketch_rows = report_service.rebuild_customer_sketches(db, start_date=args.start, end_date=args.end)
+    logger.info("daily_sales rebuilt (%s rows written), daily_customer_hll rebuilt (%s rows).", written, sketch_rows)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description="Product Service maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser(
+        "migrate-order-partitions",
+        help="Move non-partitioned orders/order_items tables to monthly partitions",
+    )
+    migrate.add_argument("--drop-legacy", action="store_true", help="Drop the *_legacy tables after copying")
+    migrate.set_defaults(func=cmd_migrate_order_partitions)
+
+    ensure = subparsers.add_parser("ensure-order-partitions", help="Create upcoming monthly partitions")
+    ensure.add_argument("--months", type=int, default=None, help="Months to create ahead of the current one")
+    ensure.set_defaults(func=cmd_ensure_order_partitions)
+
+    rebuild = subparsers.add_parser(
+        "rebuild-daily-sales",
+        help="Recompute daily_sales and daily_customer_hll from orders (whole tables when no range is given)",
+    )
+    rebuild.add_argument("--start", type=date.fromisoformat, default=None, help="First day to rebuild (UTC)")
+    rebuild.add_argument("--end", type=date.fromisoformat, default=None, help="Last day to rebuild (UTC)")
+    rebuild.set_defaults(func=cmd_rebuild_daily_sales)
+
+    return parser
+
+
+def main() -> None:
+    setup_logging_from_settings()
+    args = build_parser().parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ class OrderItem(BaseModel):
 class OrderCreate(BaseModel):
     pass 
 
+class OrderStatusUpdate(BaseModel):
+    status: OrderStatus
+
 class Order(BaseModel):
     id: int
     user_id: str 
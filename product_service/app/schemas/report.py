@@ -1,9 +1,118 @@
 # app/schemas/report.py
 from pydantic import BaseModel, Field
-from datetime import date
+from datetime import date, datetime, timedelta
+from typing import Any, List, Literal, Optional
+
+from app.db.models.report import ReportJobStatus
 
 class SalesReport(BaseModel):
     start_date: date
     end_date: date
     total_orders: int = Field(..., ge=0)
     total_revenue: float = Field(..., ge=0.0)
+    unique_customers: Optional[int] = Field(
+        None, ge=0,
+        description=(
+            "Approximate (HyperLogLog) number of distinct users with orders in counted statuses "
+            "(PROCESSING, SHIPPED, DELIVERED) in the range, like total_orders. Orders cancelled after "
+            "being counted stay included until the customer sketches are rebuilt."
+        )
+    )
+
+class SalesTimeseriesPoint(BaseModel):
+    bucket_start: datetime
+    total_orders: int = Field(..., ge=0)
+    total_revenue: float = Field(..., ge=0.0)
+
+class SalesTimeseriesReport(BaseModel):
+    start_date: date
+    end_date: date
+    bucket: Literal["day", "week", "month"]
+    timezone: str
+    points: List[SalesTimeseriesPoint]
+
+class ProductSales(BaseModel):
+    product_id: Optional[int] # Silinmiş ürünler için None
+    product_name: Optional[str] = None
+    units_sold: int = Field(..., ge=0)
+    revenue: float = Field(..., ge=0.0)
+
+class TopProductsReport(BaseModel):
+    start_date: date
+    end_date: date
+    order_by: Literal["units", "revenue"]
+    products: List[ProductSales]
+
+class CategoryRevenue(BaseModel):
+    category_id: Optional[int] # Kategorisiz ürünler için None
+    category_name: Optional[str] = None
+    units_sold: int = Field(..., ge=0)
+    revenue: float = Field(..., ge=0.0)
+
+class CategoryRevenueReport(BaseModel):
+    start_date: date
+    end_date: date
+    categories: List[CategoryRevenue]
+
+class ReportJobCreate(BaseModel):
+    kind: Literal["sales_summary", "sales_timeseries", "top_products", "category_revenue"]
+    start_date: date = Field(default_factory=lambda: date.today() - timedelta(days=30))
+    end_date: date = Field(default_factory=date.today)
+    bucket: Literal["day", "week", "month"] = "day"  # sales_timeseries
+    timezone: str = "UTC"                             # sales_timeseries
+    limit: int = Field(10, ge=1, le=100)              # top_products
+    order_by: Literal["units", "revenue"] = "units"   # top_products
+
+class ReportJob(BaseModel):
+    id: str
+    kind: str
+    params: dict
+    status: ReportJobStatus
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ReportJobResult(BaseModel):
+    id: str
+    kind: str
+    result: Any
+
+class CardinalityEstimate(BaseModel):
+    estimate: int = Field(..., ge=0)
+    lower_bound: int = Field(..., ge=0) # ~%95 güven aralığı
+    upper_bound: int = Field(..., ge=0)
+
+class DailyCardinalityEstimate(CardinalityEstimate):
+    day: date
+
+class UniqueCustomersReport(BaseModel):
+    start_date: date
+    end_date: date
+    unique_customers: CardinalityEstimate
+    relative_standard_error: float
+    days: Optional[List[DailyCardinalityEstimate]] = None
+
+class InventoryItem(BaseModel):
+    product_id: int
+    product_name: str
+    category_id: Optional[int] = None
+    stock: int
+    units_sold: int = Field(..., ge=0)
+    daily_velocity: float = Field(..., ge=0.0)
+    sell_through: Optional[float] = None # units_sold / (units_sold + stock)
+    days_of_cover: Optional[float] = None # Satış yoksa None
+    is_low_stock: bool
+    category_sales_rank: int
+    velocity_percentile: float
+
+class InventoryReport(BaseModel):
+    window_days: int
+    generated_at: datetime
+    total_products: int
+    low_stock_count: int
+    products: List[InventoryItem]
@@ -1,6 +1,7 @@
 # app/services/order_service.py
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import logging
 from fastapi import HTTPException, status
 
 from app.db.models.order import Order as OrderModel, OrderItem as OrderItemModel, OrderStatus
@@ -9,6 +10,9 @@ from app.db.models.cart import CartItem as CartItemModel
 
 from . import cart_service 
 from . import product_service 
+from . import report_service
+
+logger = logging.getLogger(__name__)
 
 def create_order_from_cart(db: Session, user_id: str) -> OrderModel:
     cart_items = cart_service.get_user_cart_items(db=db, user_id=user_id)
@@ -53,6 +57,7 @@ def create_order_from_cart(db: Session, user_id: str) -> OrderModel:
         for item in cart_items:
             order_item = OrderItemModel(
                 order_id=db_order.id, 
+                order_created_at=db_order.created_at,
                 product_id=item.product_id,
                 quantity=item.quantity,
                 price_at_purchase=item.product.price 
@@ -69,6 +74,9 @@ def create_order_from_cart(db: Session, user_id: str) -> OrderModel:
 
         cart_service.clear_cart(db=db, user_id=user_id)
 
+        report_service.apply_order_to_daily_sales(db, db_order, db_order.status)
+        report_service.apply_order_to_customer_sketch(db, db_order)
+
         db.commit()
 
         db.refresh(db_order) 
@@ -78,7 +86,7 @@ def create_order_from_cart(db: Session, user_id: str) -> OrderModel:
 
     except Exception as e:
         db.rollback()
-        print(f"Error creating order: {e}") # Loglama
+        logger.error("Error creating order: %s", e)
         if isinstance(e, HTTPException):
             raise e
         raise HTTPException(
@@ -92,6 +100,11 @@ def get_user_orders(db: Session, user_id: str, skip: int = 0, limit: int = 100)
              .order_by(OrderModel.created_at.desc())\
              .offset(skip).limit(limit).all()
 
+# Not (partition budama): sipariş id'si API'de tek başına dolaştığından id ile yapılan tekil aramalar
+# created_at bilmeden her aylık partition'ın id index'ine birer probe atar. Partition sayısı aylarla
+# sınırlı ve her probe tek bir index lookup olduğundan bu bilinçli bir istisnadır; kalemler ve durum
+# güncellemesi bulunan siparişin (id, created_at) PK'sı üzerinden gider ve budanır. Aralık taramaları
+# (raporlar, export) her zaman created_at ile filtrelenir; bkz. tests/test_partitions.py.
 def get_order_details(db: Session, order_id: int, user_id: str) -> Optional[OrderModel]:
     order = db.query(OrderModel).filter(
         OrderModel.id == order_id,
@@ -103,4 +116,33 @@ def get_order_details(db: Session, order_id: int, user_id: str) -> Optional[Orde
         for item in order.items:
             _ = item.product 
 
-    return order
\ No newline at end of file
+    return order
+
+def update_order_status(db: Session, order_id: int, new_status: OrderStatus) -> OrderModel:
+    # Satır kilidi, aynı sipariş için eşzamanlı durum değişikliklerinin rollup'ı iki kez düzeltmesini önler.
+    db_order = db.query(OrderModel).filter(OrderModel.id == order_id).with_for_update().first()
+    if db_order is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+
+    old_status = db_order.status
+    if old_status == new_status:
+        return db_order
+
+    try:
+        db_order.status = new_status
+        db.flush()
+        report_service.apply_order_to_daily_sales(db, db_order, old_status, sign=-1)
+        report_service.apply_order_to_daily_sales(db, db_order, new_status, sign=1)
+        report_service.apply_order_to_customer_sketch(db, db_order)
+        db.commit()
+        report_service.invalidate_report_cache_for_order(db_order.created_at)
+    except Exception as e:
+        db.rollback()
+        logger.error("Error updating order status: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while updating the order status."
+        )
+
+    db.refresh(db_order)
+    return db_order
@@ -106,7 +106,7 @@ def bulk_update_products(db: Session, updates: List[ProductBulkUpdateItem]) -> i
 
     except Exception as e:
         db.rollback() 
-        logger.error(f"Error during bulk product update: {e}", exc_info=True) 
+        logger.error("Error during bulk product update: %s", e, exc_info=True) 
         if isinstance(e, HTTPException): 
             raise e
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Bulk update failed.")
@@ -0,0 +1,249 @@
+# app/services/report_job_service.py
+import logging
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.models.report import ReportJob as ReportJobModel, ReportJobStatus
+from . import report_service
+
+logger = logging.getLogger(__name__)
+
+
+def _run_sales_summary(db: Session, params: dict):
+    return report_service.get_sales_summary(
+        db, date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+    )
+
+def _run_sales_timeseries(db: Session, params: dict):
+    return report_service.get_sales_timeseries(
+        db, date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"]),
+        bucket=params["bucket"], tz_name=params["timezone"]
+    )
+
+def _run_top_products(db: Session, params: dict):
+    return report_service.get_top_products(
+        db, date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"]),
+        limit=params["limit"], order_by=params["order_by"]
+    )
+
+def _run_category_revenue(db: Session, params: dict):
+    return report_service.get_category_revenue(
+        db, date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+    )
+
+REPORT_RUNNERS: Dict[str, Callable[[Session, dict], object]] = {
+    "sales_summary": _run_sales_summary,
+    "sales_timeseries": _run_sales_timeseries,
+    "top_products": _run_top_products,
+    "category_revenue": _run_category_revenue,
+}
+
+
+# İşler, istek havuzundan ayrı, worker sayısı kadar bağlantılık kendi havuzlarında çalışır;
+# böylece ağır analitik sorgular transactional endpoint'lerin bağlantılarını tüketemez.
+_executor: Optional[ThreadPoolExecutor] = None
+_job_sessionmaker: Optional[sessionmaker] = None
+_init_lock = threading.Lock()
+# Çalışan + kuyrukta bekleyen iş sayısı sınırı
+_pending_slots = threading.BoundedSemaphore(settings.REPORT_JOB_WORKERS + settings.REPORT_JOB_MAX_PENDING)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _job_sessionmaker
+    with _init_lock:
+        if _executor is None:
+            job_engine = create_engine(
+                settings.DATABASE_URL,
+                pool_pre_ping=True,
+                pool_size=settings.REPORT_JOB_WORKERS,
+                max_overflow=0,
+                connect_args={"options": f"-c statement_timeout={int(settings.REPORT_JOB_STATEMENT_TIMEOUT_MS)}"},
+            )
+            _job_sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=job_engine)
+            _executor = ThreadPoolExecutor(max_workers=settings.REPORT_JOB_WORKERS, thread_name_prefix="report-job")
+        return _executor
+
+
+@contextmanager
+def _job_session() -> Iterator[Session]:
+    _get_executor()
+    db = _job_sessionmaker()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Henüz başlamamış işlerin future'ları; kapanışta iptal edilenler FAILED işaretlenir
+_queued_futures: Dict[str, Future] = {}
+
+
+def _dispatch(job_id: str) -> None:
+    future = _get_executor().submit(_run_job_and_release, job_id)
+    _queued_futures[job_id] = future
+    future.add_done_callback(lambda _: _queued_futures.pop(job_id, None))
+
+
+def _run_job_and_release(job_id: str) -> None:
+    try:
+        run_job(job_id)
+    finally:
+        _pending_slots.release()
+
+
+def _mark_failed(db: Session, job_ids: Iterable[str], error: str) -> int:
+    """Henüz bitmemiş işleri FAILED yapar; sonuç TTL'i kadar görünür kalır."""
+    now = datetime.now(timezone.utc)
+    updated = db.query(ReportJobModel).filter(
+        ReportJobModel.id.in_(list(job_ids)),
+        ReportJobModel.status.in_([ReportJobStatus.QUEUED, ReportJobStatus.RUNNING]),
+    ).update({
+        ReportJobModel.status: ReportJobStatus.FAILED,
+        ReportJobModel.error: error,
+        ReportJobModel.finished_at: now,
+        ReportJobModel.expires_at: now + timedelta(seconds=settings.REPORT_JOB_RESULT_TTL_SECONDS),
+    }, synchronize_session=False)
+    db.commit()
+    return updated
+
+
+def shutdown() -> None:
+    global _executor
+    with _init_lock:
+        if _executor is None:
+            return
+        # İptal edilen future'ların callback'leri onları sözlükten hemen siler; önce kopyalanır
+        queued = dict(_queued_futures)
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    cancelled = [job_id for job_id, future in queued.items() if future.cancelled()]
+    if cancelled:
+        db = _job_sessionmaker()
+        try:
+            _mark_failed(db, cancelled, "Report job was cancelled because the service shut down")
+        except Exception as e:
+            logger.error("Could not mark %s cancelled report job(s) as failed: %s", len(cancelled), e)
+        finally:
+            db.close()
+
+
+def submit_job(db: Session, kind: str, params: dict, submitted_by: str) -> ReportJobModel:
+    if kind not in REPORT_RUNNERS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown report kind: {kind}")
+    if not _pending_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many report jobs are pending, try again later.",
+            headers={"Retry-After": "30"},
+        )
+
+    try:
+        db_job = ReportJobModel(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            params=jsonable_encoder(params),
+            status=ReportJobStatus.QUEUED,
+            submitted_by=submitted_by,
+            # Hiç bitmeyen (çöken replikada kalan) işler için son tarih; iş bitince sonuç TTL'iyle değişir
+            expires_at=datetime.now(timezone.utc) + timedelta(
+                seconds=settings.REPORT_JOB_STALE_AFTER_SECONDS + settings.REPORT_JOB_RESULT_TTL_SECONDS
+            ),
+        )
+        db.add(db_job)
+        db.commit()
+        db.refresh(db_job)
+    except Exception:
+        db.rollback()
+        _pending_slots.release()
+        raise
+
+    try:
+        _dispatch(db_job.id)
+    except Exception as e:
+        _pending_slots.release()
+        logger.error("Report job %s could not be scheduled: %s", db_job.id, e, exc_info=True)
+        _mark_failed(db, [db_job.id], "Report job could not be scheduled")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Report job could not be scheduled, try again later.",
+            headers={"Retry-After": "30"},
+        )
+    return db_job
+
+
+def run_job(job_id: str) -> None:
+    with _job_session() as db:
+        db_job = db.get(ReportJobModel, job_id)
+        if db_job is None or db_job.status != ReportJobStatus.QUEUED:
+            return
+        db_job.status = ReportJobStatus.RUNNING
+        db_job.started_at = datetime.now(timezone.utc)
+        db.commit()
+
+        try:
+            result = jsonable_encoder(REPORT_RUNNERS[db_job.kind](db, db_job.params))
+            db_job.status = ReportJobStatus.SUCCEEDED
+            db_job.result = result
+        except Exception as e:
+            db.rollback()
+            logger.error("Report job %s (%s) failed: %s", job_id, db_job.kind, e, exc_info=True)
+            db_job.status = ReportJobStatus.FAILED
+            db_job.error = e.detail if isinstance(e, HTTPException) else "Report generation failed"
+
+        finished_at = datetime.now(timezone.utc)
+        db_job.finished_at = finished_at
+        db_job.expires_at = finished_at + timedelta(seconds=settings.REPORT_JOB_RESULT_TTL_SECONDS)
+        try:
+            db.commit()
+        except Exception as e:
+            # Örn. sonuç yazılamadı; iş RUNNING'de kalmasın
+            db.rollback()
+            logger.error("Could not store outcome of report job %s: %s", job_id, e, exc_info=True)
+            try:
+                _mark_failed(db, [job_id], "Report result could not be stored")
+            except Exception as mark_error:
+                db.rollback()
+                logger.error("Could not mark report job %s as failed: %s", job_id, mark_error)
+
+
+def get_job(db: Session, job_id: str) -> Optional[ReportJobModel]:
+    db_job = db.get(ReportJobModel, job_id)
+    if db_job is None:
+        return None
+    if db_job.expires_at is not None and db_job.expires_at <= datetime.now(timezone.utc):
+        return None
+    return db_job
+
+
+def fail_stale_jobs(db: Session) -> int:
+    """
+    `REPORT_JOB_STALE_AFTER_SECONDS`'tan eski QUEUED/RUNNING işleri FAILED yapar: çöken ya da
+    yeniden başlatılan bir replikada kalmış işler artık hiçbir worker tarafından alınmaz.
+    Açılışta ve periyodik temizlikte çağrılır.
+    """
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.REPORT_JOB_STALE_AFTER_SECONDS)
+    stale_ids = [job_id for (job_id,) in db.query(ReportJobModel.id).filter(
+        ReportJobModel.status.in_([ReportJobStatus.QUEUED, ReportJobStatus.RUNNING]),
+        ReportJobModel.created_at < stale_before,
+    )]
+    if not stale_ids:
+        return 0
+    return _mark_failed(db, stale_ids, "Report job was interrupted")
+
+
+def purge_expired_jobs(db: Session) -> int:
+    deleted = db.query(ReportJobModel).filter(
+        ReportJobModel.expires_at <= datetime.now(timezone.utc)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
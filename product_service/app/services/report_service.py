@@ -1,26 +1,497 @@
 # app/services/report_service.py
-from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date 
-from datetime import date, datetime, time 
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import func, cast, case, or_, Date, Float, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from fastapi import HTTPException, status
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from app.db.models.order import Order as OrderModel, OrderStatus
+from app.core import hll
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models.order import Order as OrderModel, OrderItem as OrderItemModel, OrderStatus
+from app.db.models.product import Product as ProductModel
+from app.db.models.category import Category as CategoryModel
+from app.db.models.report import DailySales as DailySalesModel, DailyCustomerSketch as DailyCustomerSketchModel
 
-def get_sales_summary(db: Session, start_date: date, end_date: date) -> dict:
-    start_datetime = datetime.combine(start_date, time.min) 
-    end_datetime = datetime.combine(end_date, time.max)     
+VALID_SALES_STATUSES = [OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED]
+SALES_BUCKETS = ("day", "week", "month")
+
+# Kapanmış dilimlerin sonuçları; anahtarın son iki elemanı dilimin UTC [başlangıç, bitiş) aralığıdır.
+_report_cache = TTLCache(maxsize=settings.REPORT_CACHE_MAX_ENTRIES, ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS)
+# Stok anlık değiştiği için envanter raporu yalnızca kısa süre cache'lenir.
+_inventory_cache = TTLCache(maxsize=256, ttl_seconds=settings.INVENTORY_REPORT_CACHE_TTL_SECONDS)
+
+def _utc_day(value: datetime) -> date:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+def apply_order_to_daily_sales(db: Session, order: OrderModel, order_status: OrderStatus, sign: int = 1) -> None:
+    """
+    Siparişi `order_status` satırına ekler (sign=1) ya da çıkarır (sign=-1).
+    Commit etmez; çağıran servisin transaction'ı içinde çalışır.
+    """
+    stmt = pg_insert(DailySalesModel).values(
+        day=_utc_day(order.created_at),
+        status=order_status,
+        order_count=sign,
+        revenue=sign * order.total_amount,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailySalesModel.day, DailySalesModel.status],
+        set_={
+            "order_count": DailySalesModel.order_count + stmt.excluded.order_count,
+            "revenue": DailySalesModel.revenue + stmt.excluded.revenue,
+        },
+    )
+    db.execute(stmt)
+
+def _daily_sales_source_query(db: Session, start_date: Optional[date], end_date: Optional[date]) -> Query:
+    day = cast(func.timezone("UTC", OrderModel.created_at), Date)
+    query = db.query(
+        day.label("day"),
+        OrderModel.status.label("status"),
+        func.count(OrderModel.id).label("order_count"),
+        func.coalesce(func.sum(OrderModel.total_amount), 0.0).label("revenue"),
+    )
+    # created_at üzerindeki sabit aralık, planner'ın yalnızca ilgili aylık partition'ları taramasını sağlar.
+    if start_date is not None:
+        query = query.filter(OrderModel.created_at >= datetime.combine(start_date, time.min, tzinfo=timezone.utc))
+    if end_date is not None:
+        query = query.filter(OrderModel.created_at <= datetime.combine(end_date, time.max, tzinfo=timezone.utc))
+    return query.group_by(day, OrderModel.status)
+
+def rebuild_daily_sales(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+    """
+    daily_sales satırlarını verilen gün aralığı için (aralık yoksa tamamen) orders tablosundan
+    yeniden hesaplar. Yazılan satır sayısını döner.
+    """
+    # Tablo kilidi, eşzamanlı sipariş transaction'larının upsert'lerini rebuild bitene kadar bekletir;
+    # kilit alındıktan sonraki sorgular o ana kadar commit edilmiş tüm siparişleri görür.
+    db.execute(text("LOCK TABLE daily_sales IN SHARE ROW EXCLUSIVE MODE"))
+
+    delete_query = db.query(DailySalesModel)
+    if start_date is not None:
+        delete_query = delete_query.filter(DailySalesModel.day >= start_date)
+    if end_date is not None:
+        delete_query = delete_query.filter(DailySalesModel.day <= end_date)
+    delete_query.delete(synchronize_session=False)
+
+    rows = [row._asdict() for row in _daily_sales_source_query(db, start_date, end_date).all()]
+    if rows:
+        db.execute(pg_insert(DailySalesModel), rows)
+    db.commit()
+    return len(rows)
+
+def apply_order_to_customer_sketch(db: Session, order: OrderModel) -> None:
+    """
+    Sipariş satış sayılan bir durumdaysa (VALID_SALES_STATUSES) kullanıcısını siparişin gününün HLL
+    sketch'ine ekler; register yalnızca büyürse yazılır. Sipariş oluşturulurken ve durumu
+    değiştiğinde çağrılır. HLL'den eleman çıkarılamadığı için sayıldıktan sonra iptal edilen
+    siparişin kullanıcısı `rebuild_customer_sketches` çalışana kadar sayılmaya devam eder.
+    """
+    if order.status not in VALID_SALES_STATUSES:
+        return
+    register, rank = hll.register_for(order.user_id)
+    stmt = pg_insert(DailyCustomerSketchModel).values(day=_utc_day(order.created_at), register=register, rank=rank)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyCustomerSketchModel.day, DailyCustomerSketchModel.register],
+        set_={"rank": func.greatest(DailyCustomerSketchModel.rank, stmt.excluded.rank)},
+        where=DailyCustomerSketchModel.rank < stmt.excluded.rank,
+    )
+    db.execute(stmt)
+
+def rebuild_customer_sketches(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+    """daily_customer_hll satırlarını verilen gün aralığı için orders tablosundan yeniden hesaplar."""
+    db.execute(text("LOCK TABLE daily_customer_hll IN SHARE ROW EXCLUSIVE MODE"))
+
+    delete_query = db.query(DailyCustomerSketchModel)
+    if start_date is not None:
+        delete_query = delete_query.filter(DailyCustomerSketchModel.day >= start_date)
+    if end_date is not None:
+        delete_query = delete_query.filter(DailyCustomerSketchModel.day <= end_date)
+    delete_query.delete(synchronize_session=False)
+
+    day = cast(func.timezone("UTC", OrderModel.created_at), Date)
+    source = db.query(day.label("day"), OrderModel.user_id).filter(
+        OrderModel.status.in_(VALID_SALES_STATUSES)
+    ).distinct()
+    if start_date is not None:
+        source = source.filter(OrderModel.created_at >= datetime.combine(start_date, time.min, tzinfo=timezone.utc))
+    if end_date is not None:
+        source = source.filter(OrderModel.created_at <= datetime.combine(end_date, time.max, tzinfo=timezone.utc))
+
+    registers = {}
+    for row in source.yield_per(settings.CUSTOMER_SKETCH_REBUILD_BATCH_SIZE):
+        register, rank = hll.register_for(row.user_id)
+        key = (row.day, register)
+        if rank > registers.get(key, 0):
+            registers[key] = rank
 
-    valid_statuses = [OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.DELIVERED]
+    rows = [{"day": d, "register": register, "rank": rank} for (d, register), rank in registers.items()]
+    if rows:
+        db.execute(pg_insert(DailyCustomerSketchModel), rows)
+    db.commit()
+    return len(rows)
 
+def backfill_rollups_if_empty(db: Session) -> bool:
+    """Rollup tabloları boşsa ve sipariş varsa tamamını doldurur (ilk kurulum için)."""
+    if db.query(OrderModel.id).first() is None:
+        return False
+    backfilled = False
+    if db.query(DailySalesModel.day).first() is None:
+        rebuild_daily_sales(db)
+        backfilled = True
+    if db.query(DailyCustomerSketchModel.day).first() is None:
+        rebuild_customer_sketches(db)
+        backfilled = True
+    return backfilled
+
+def _unique_customers_estimate(db: Session, start_date: date, end_date: date) -> dict:
+    # Günlük sketch'ler register bazında max ile birleştirilir; yalnızca rank histogramı (<= 53 satır) döner.
+    merged = db.query(
+        DailyCustomerSketchModel.register, func.max(DailyCustomerSketchModel.rank).label("rank")
+    ).filter(
+        DailyCustomerSketchModel.day >= start_date,
+        DailyCustomerSketchModel.day <= end_date,
+    ).group_by(DailyCustomerSketchModel.register).subquery()
+    histogram = dict(db.query(merged.c.rank, func.count()).group_by(merged.c.rank).all())
+    return _estimate_payload(histogram)
+
+def _estimate_payload(histogram: dict) -> dict:
+    estimate = hll.estimate_from_histogram(histogram)
+    lower_bound, upper_bound = hll.error_bounds(estimate)
+    return {"estimate": round(estimate), "lower_bound": lower_bound, "upper_bound": upper_bound}
+
+def get_unique_customers(db: Session, start_date: date, end_date: date, per_day: bool = False) -> dict:
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    result = {
+        "unique_customers": _unique_customers_estimate(db, start_date, end_date),
+        "relative_standard_error": round(hll.relative_standard_error(), 4),
+        "days": None,
+    }
+    if per_day:
+        rows = db.query(
+            DailyCustomerSketchModel.day, DailyCustomerSketchModel.rank, func.count()
+        ).filter(
+            DailyCustomerSketchModel.day >= start_date,
+            DailyCustomerSketchModel.day <= end_date,
+        ).group_by(DailyCustomerSketchModel.day, DailyCustomerSketchModel.rank).all()
+        histograms = {}
+        for day, rank, count in rows:
+            histograms.setdefault(day, {})[rank] = count
+        result["days"] = [
+            {"day": day, **_estimate_payload(histograms[day])} for day in sorted(histograms)
+        ]
+    return result
+
+def get_sales_summary(db: Session, start_date: date, end_date: date) -> dict:
+    # Aralık ne kadar uzun olursa olsun en fazla gün x durum kadar küçük satır okunur.
     summary = db.query(
-        func.count(OrderModel.id).label("total_orders"),
-        func.coalesce(func.sum(OrderModel.total_amount), 0.0).label("total_revenue")
+        func.coalesce(func.sum(DailySalesModel.order_count), 0).label("total_orders"),
+        func.coalesce(func.sum(DailySalesModel.revenue), 0.0).label("total_revenue")
     ).filter(
-        OrderModel.created_at >= start_datetime,
-        OrderModel.created_at <= end_datetime,
-        OrderModel.status.in_(valid_statuses) 
-    ).first() 
+        DailySalesModel.day >= start_date,
+        DailySalesModel.day <= end_date,
+        DailySalesModel.status.in_(VALID_SALES_STATUSES)
+    ).first()
 
     return {
-        "total_orders": summary.total_orders,
-        "total_revenue": round(float(summary.total_revenue), 2) 
-    }
\ No newline at end of file
+        "total_orders": int(summary.total_orders),
+        "total_revenue": round(float(summary.total_revenue), 2),
+        "unique_customers": _unique_customers_estimate(db, start_date, end_date)["estimate"],
+    }
+
+def invalidate_report_cache_for_order(order_created_at: datetime) -> None:
+    """Siparişin durumu değiştiğinde, onu kapsayan kapanmış dilimlerin cache kayıtlarını siler."""
+    _report_cache.discard_where(lambda key: key[-2] <= order_created_at < key[-1])
+
+def clear_report_cache() -> None:
+    _report_cache.clear()
+    _inventory_cache.clear()
+
+def _resolve_timezone(tz_name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown timezone: {tz_name}")
+
+def _bucket_floor(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday()) # date_trunc('week') gibi pazartesi
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def _next_bucket(bucket_start: date, bucket: str) -> date:
+    if bucket == "week":
+        return bucket_start + timedelta(days=7)
+    if bucket == "month":
+        return (bucket_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return bucket_start + timedelta(days=1)
+
+def _local_midnight_utc(day: date, tz: ZoneInfo) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=tz).astimezone(timezone.utc)
+
+def _iter_buckets(start_date: date, end_date: date, bucket: str, tz: ZoneInfo) -> List[tuple]:
+    """(dilim başlangıç günü, UTC aralık başı, UTC aralık sonu) listesi; ilk/son dilim istenen aralığa kırpılır."""
+    buckets = []
+    bucket_start = _bucket_floor(start_date, bucket)
+    range_end = end_date + timedelta(days=1)
+    while bucket_start < range_end:
+        next_start = _next_bucket(bucket_start, bucket)
+        buckets.append((
+            bucket_start,
+            _local_midnight_utc(max(bucket_start, start_date), tz),
+            _local_midnight_utc(min(next_start, range_end), tz),
+        ))
+        bucket_start = next_start
+    return buckets
+
+def _sales_timeseries_query(db: Session, bucket: str, tz_name: str, range_start: datetime, range_end: datetime) -> Query:
+    bucket_start = func.date_trunc(bucket, func.timezone(tz_name, OrderModel.created_at))
+    # (status, created_at) INCLUDE (total_amount) index'i ile index-only scan; count(id) yerine count(*).
+    return db.query(
+        bucket_start.label("bucket_start"),
+        func.count().label("total_orders"),
+        func.coalesce(func.sum(OrderModel.total_amount), 0.0).label("total_revenue"),
+    ).filter(
+        OrderModel.status.in_(VALID_SALES_STATUSES),
+        OrderModel.created_at >= range_start,
+        OrderModel.created_at < range_end,
+    ).group_by("bucket_start")
+
+def get_sales_timeseries(db: Session, start_date: date, end_date: date, bucket: str = "day", tz_name: str = "UTC") -> List[dict]:
+    if bucket not in SALES_BUCKETS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"bucket must be one of {SALES_BUCKETS}")
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    tz = _resolve_timezone(tz_name)
+
+    now = datetime.now(timezone.utc)
+    buckets = _iter_buckets(start_date, end_date, bucket, tz)
+    results = {}
+    missing = []
+    for bucket_day, range_start, range_end in buckets:
+        cached = _report_cache.get(("sales_timeseries", bucket, tz_name, range_start, range_end))
+        if cached is not None:
+            results[bucket_day] = cached
+        else:
+            missing.append((bucket_day, range_start, range_end))
+
+    if missing:
+        # Eksik dilimleri kapsayan tek bir aralık sorgulanır (tipik olarak yalnızca açık olan son dilim).
+        rows = _sales_timeseries_query(db, bucket, tz_name, missing[0][1], missing[-1][2]).all()
+        fetched = {row.bucket_start.date(): (row.total_orders, float(row.total_revenue)) for row in rows}
+        for bucket_day, range_start, range_end in missing:
+            value = fetched.get(bucket_day, (0, 0.0))
+            results[bucket_day] = value
+            if range_end <= now:
+                _report_cache.set(("sales_timeseries", bucket, tz_name, range_start, range_end), value)
+
+    return [
+        {
+            "bucket_start": datetime.combine(bucket_day, time.min, tzinfo=tz),
+            "total_orders": results[bucket_day][0],
+            "total_revenue": round(results[bucket_day][1], 2),
+        }
+        for bucket_day, _, _ in buckets
+    ]
+
+def _utc_day_range(start_date: date, end_date: date) -> tuple[datetime, datetime]:
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    return _local_midnight_utc(start_date, timezone.utc), _local_midnight_utc(end_date + timedelta(days=1), timezone.utc)
+
+def _memoize_period(key: tuple, range_end: datetime, compute):
+    """Aralığı kapanmış (tamamen geçmişte kalan) dönemlerin sonucunu cache'ler."""
+    cached = _report_cache.get(key)
+    if cached is not None:
+        return cached
+    result = compute()
+    if range_end <= datetime.now(timezone.utc):
+        _report_cache.set(key, result)
+    return result
+
+_PARTITIONWISE_SETTINGS = {"join_name": "enable_partitionwise_join", "aggregate_name": "enable_partitionwise_aggregate"}
+
+@contextmanager
+def _partitionwise_planning(db: Session):
+    """
+    İçinde çalıştırılan sorgular için partition bazında join/aggregate'i açar ve ardından çağıranın
+    transaction'ındaki önceki değerleri geri yükler. Sorgu hata verirse transaction zaten geri
+    alınacağından (SET LOCAL de onunla birlikte) geri yükleme denenmez.
+    """
+    names = _PARTITIONWISE_SETTINGS
+    previous = db.execute(text("SELECT current_setting(:join_name), current_setting(:aggregate_name)"), names).one()
+    set_both = text(
+        "SELECT set_config(:join_name, :join_value, true), set_config(:aggregate_name, :aggregate_value, true)"
+    )
+    db.execute(set_both, {**names, "join_value": "on", "aggregate_value": "on"})
+    yield
+    db.execute(set_both, {**names, "join_value": previous[0], "aggregate_value": previous[1]})
+
+def _product_sales_subquery(db: Session, range_start: datetime, range_end: datetime):
+    """
+    Geçerli durumdaki siparişlerin kalemlerinin ürün bazında toplamı. Her iki tabloda da partition
+    anahtarı üzerinden filtre ve join yapılır; planner aylık partition'ları budar ve sorgu
+    `_partitionwise_planning` içinde çalıştırıldığında partition bazında join/aggregate eder.
+    Ürün/kategori bilgisi bu (küçük) sonuca sonradan eklenir.
+    """
+    return db.query(
+        OrderItemModel.product_id.label("product_id"),
+        func.sum(OrderItemModel.quantity).label("units_sold"),
+        func.sum(OrderItemModel.quantity * OrderItemModel.price_at_purchase).label("revenue"),
+    ).join(
+        OrderModel,
+        (OrderModel.id == OrderItemModel.order_id) & (OrderModel.created_at == OrderItemModel.order_created_at),
+    ).filter(
+        OrderItemModel.order_created_at >= range_start,
+        OrderItemModel.order_created_at < range_end,
+        OrderModel.created_at >= range_start,
+        OrderModel.created_at < range_end,
+        OrderModel.status.in_(VALID_SALES_STATUSES),
+    ).group_by(OrderItemModel.product_id).subquery()
+
+def get_top_products(db: Session, start_date: date, end_date: date, limit: int = 10, order_by: str = "units") -> List[dict]:
+    if order_by not in ("units", "revenue"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="order_by must be 'units' or 'revenue'")
+    range_start, range_end = _utc_day_range(start_date, end_date)
+
+    def compute() -> List[dict]:
+        sold = _product_sales_subquery(db, range_start, range_end)
+        metric = sold.c.units_sold if order_by == "units" else sold.c.revenue
+        query = db.query(
+            sold.c.product_id, ProductModel.name.label("product_name"), sold.c.units_sold, sold.c.revenue
+        ).outerjoin(ProductModel, ProductModel.id == sold.c.product_id)\
+         .order_by(metric.desc(), sold.c.product_id).limit(limit)
+        with _partitionwise_planning(db):
+            rows = query.all()
+        return [
+            {
+                "product_id": row.product_id,
+                "product_name": row.product_name,
+                "units_sold": int(row.units_sold),
+                "revenue": round(float(row.revenue), 2),
+            }
+            for row in rows
+        ]
+
+    return _memoize_period(("top_products", order_by, limit, range_start, range_end), range_end, compute)
+
+def get_category_revenue(db: Session, start_date: date, end_date: date) -> List[dict]:
+    range_start, range_end = _utc_day_range(start_date, end_date)
+
+    def compute() -> List[dict]:
+        sold = _product_sales_subquery(db, range_start, range_end)
+        revenue = func.sum(sold.c.revenue).label("revenue")
+        query = db.query(
+            CategoryModel.id.label("category_id"),
+            CategoryModel.name.label("category_name"),
+            func.sum(sold.c.units_sold).label("units_sold"),
+            revenue,
+        ).select_from(sold)\
+         .outerjoin(ProductModel, ProductModel.id == sold.c.product_id)\
+         .outerjoin(CategoryModel, CategoryModel.id == ProductModel.category_id)\
+         .group_by(CategoryModel.id, CategoryModel.name)\
+         .order_by(revenue.desc())
+        with _partitionwise_planning(db):
+            rows = query.all()
+        return [
+            {
+                "category_id": row.category_id,
+                "category_name": row.category_name,
+                "units_sold": int(row.units_sold),
+                "revenue": round(float(row.revenue), 2),
+            }
+            for row in rows
+        ]
+
+    return _memoize_period(("category_revenue", range_start, range_end), range_end, compute)
+
+def get_inventory_report(
+    db: Session,
+    window_days: int = 30,
+    low_stock_threshold: int = 5,
+    cover_days_threshold: float = 14.0,
+    only_low_stock: bool = False,
+    limit: int = 100,
+) -> dict:
+    """
+    Aktif ürünler için son `window_days` günlük satış hızına göre sell-through ve kaç günlük stok
+    kaldığı (days of cover). Tek bir set-based sorgu: ürün bazında satış toplamı + window fonksiyonları.
+    """
+    cache_key = (window_days, low_stock_threshold, cover_days_threshold, only_low_stock, limit)
+    cached = _inventory_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    range_end = datetime.now(timezone.utc)
+    range_start = range_end - timedelta(days=window_days)
+    sold = _product_sales_subquery(db, range_start, range_end)
+
+    units_sold = func.coalesce(sold.c.units_sold, 0)
+    velocity = cast(units_sold, Float) * (1.0 / window_days)
+    days_of_cover = case((units_sold > 0, cast(ProductModel.stock, Float) / velocity), else_=None)
+    is_low_stock = or_(
+        ProductModel.stock <= low_stock_threshold,
+        days_of_cover < cover_days_threshold,
+    )
+    metrics = db.query(
+        ProductModel.id.label("product_id"),
+        ProductModel.name.label("product_name"),
+        ProductModel.category_id,
+        ProductModel.stock,
+        units_sold.label("units_sold"),
+        velocity.label("daily_velocity"),
+        (cast(units_sold, Float) / cast(func.nullif(units_sold + ProductModel.stock, 0), Float)).label("sell_through"),
+        days_of_cover.label("days_of_cover"),
+        is_low_stock.label("is_low_stock"),
+        func.rank().over(
+            partition_by=ProductModel.category_id, order_by=units_sold.desc()
+        ).label("category_sales_rank"),
+        func.cume_dist().over(order_by=units_sold).label("velocity_percentile"),
+        func.count().over().label("total_products"),
+        func.count().filter(is_low_stock).over().label("low_stock_count"),
+    ).outerjoin(sold, sold.c.product_id == ProductModel.id)\
+     .filter(ProductModel.is_active == True).subquery()
+
+    query = db.query(metrics)
+    if only_low_stock:
+        query = query.filter(metrics.c.is_low_stock)
+    query = query.order_by(
+        metrics.c.days_of_cover.asc().nulls_last(), metrics.c.stock.asc(), metrics.c.product_id
+    ).limit(limit)
+    with _partitionwise_planning(db):
+        rows = query.all()
+
+    totals = rows[0] if rows else None
+    result = {
+        "window_days": window_days,
+        "generated_at": range_end,
+        "total_products": totals.total_products if totals else 0,
+        "low_stock_count": totals.low_stock_count if totals else 0,
+        "products": [
+            {
+                "product_id": row.product_id,
+                "product_name": row.product_name,
+                "category_id": row.category_id,
+                "stock": row.stock,
+                "units_sold": int(row.units_sold),
+                "daily_velocity": round(row.daily_velocity, 3),
+                "sell_through": round(row.sell_through, 4) if row.sell_through is not None else None,
+                "days_of_cover": round(row.days_of_cover, 1) if row.days_of_cover is not None else None,
+                "is_low_stock": bool(row.is_low_stock),
+                "category_sales_rank": row.category_sales_rank,
+                "velocity_percentile": round(row.velocity_percentile, 4),
+            }
+            for row in rows
+        ],
+    }
+    _inventory_cache.set(cache_key, result)
+    return result
+
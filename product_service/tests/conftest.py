@@ -4,7 +4,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy_utils import database_exists, create_database, drop_database
-from typing import Generator, Any
+from typing import Generator, Any, Optional
 import sys
 import os
 import logging
@@ -74,6 +74,14 @@ def override_get_db_product(db_session_product: Session):
     yield
     app.dependency_overrides.clear()
 
+@pytest.fixture(autouse=True)
+def clear_report_cache():
+    # Test transaction'ları geri alındığı için process içi rapor cache'i testler arasında taşınmamalı.
+    from app.services import report_service
+    report_service.clear_report_cache()
+    yield
+    report_service.clear_report_cache()
+
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
     logger.info("Creating TestClient for Product Service module.")
@@ -82,7 +90,7 @@ def client() -> Generator[TestClient, None, None]:
     logger.info("TestClient for Product Service module finished.")
 
 
-def create_test_access_token(subject: str, role: str) -> str:
+def create_test_access_token(subject: str, role: str, extra_claims: Optional[dict] = None) -> str:
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     expire = datetime.now(timezone.utc) + access_token_expires
     to_encode = {
@@ -91,6 +99,7 @@ def create_test_access_token(subject: str, role: str) -> str:
         "exp": expire,
         "jti": os.urandom(16).hex() # Basit bir jti
     }
+    to_encode.update(extra_claims or {})
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -0,0 +1,225 @@
+# tests/test_auth.py (product_service)
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta, timezone
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+import json
+import os
+import time
+
+from app.core import auth, jwks, revocation
+from app.core.permission_claims import (
+    BOOTSTRAP_PERMISSION_REGISTRY, decode_permissions, permission_claims, permission_registry, registry_version
+)
+from app.core.config import settings
+from .conftest import create_test_access_token
+
+
+@pytest.fixture
+def decode_counter(monkeypatch):
+    calls = []
+    real_decode = auth.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    auth.clear_token_cache()
+    yield calls
+    auth.clear_token_cache()
+
+
+def test_verified_token_is_cached(decode_counter: list):
+    token = create_test_access_token(subject="cache_user", role="user")
+    first = auth.verify_access_token(token)
+    second = auth.verify_access_token(token)
+    assert first.sub == second.sub == "cache_user"
+    assert len(decode_counter) == 1
+
+
+def test_invalid_and_expired_tokens_are_not_cached(decode_counter: list):
+    expired = jwt.encode(
+        {"sub": "old_user", "role": "user", "exp": datetime.now(timezone.utc) - timedelta(minutes=1)},
+        settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            auth.verify_access_token(expired)
+        assert exc_info.value.status_code == 401
+
+    tampered = create_test_access_token(subject="cache_user", role="user")[:-2] + "xx"
+    with pytest.raises(HTTPException):
+        auth.verify_access_token(tampered)
+    assert len(decode_counter) == 3
+
+
+def test_route_decodes_token_once_per_request(client: TestClient, decode_counter: list):
+    headers = {"Authorization": f"Bearer {create_test_access_token(subject=f'once_{os.urandom(2).hex()}', role='admin')}"}
+    response = client.get("/products/", headers=headers)
+    assert response.status_code == 200
+    assert len(decode_counter) == 1
+
+    client.get("/products/", headers=headers)
+    assert len(decode_counter) == 1 # ikinci istek cache'ten
+
+
+@pytest.fixture
+def revoked_tokens():
+    revocation.revoked_tokens.clear()
+    revocation.user_epochs.clear()
+    auth.clear_token_cache()
+    yield revocation.revoked_tokens
+    revocation.revoked_tokens.clear()
+    revocation.user_epochs.clear()
+    auth.clear_token_cache()
+
+
+def _jti_and_exp(token: str):
+    claims = jwt.get_unverified_claims(token)
+    return claims["jti"], claims["exp"]
+
+
+def test_revoked_token_is_rejected_even_when_cached(client: TestClient, revoked_tokens):
+    token = create_test_access_token(subject=f"revoke_{os.urandom(2).hex()}", role="user")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/cart/", headers=headers).status_code == 200
+
+    jti, exp = _jti_and_exp(token)
+    revocation.handle_revocation_message(json.dumps({"jti": jti, "exp": exp}))
+    assert client.get("/cart/", headers=headers).status_code == 401
+
+    other = create_test_access_token(subject="still_valid", role="user")
+    assert auth.verify_access_token(other).sub == "still_valid"
+
+
+def test_user_epoch_revokes_tokens_issued_before_it(revoked_tokens):
+    def token_issued_at(iat: float) -> str:
+        claims = {
+            "sub": "epoch_user", "role": "user", "jti": os.urandom(8).hex(), "iat": iat,
+            "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+        }
+        return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    now = time.time()
+    old_token, new_token = token_issued_at(now - 10), token_issued_at(now + 0.5)
+    assert auth.verify_access_token(old_token).sub == "epoch_user" # cache'e girer
+
+    revocation.handle_revocation_message(json.dumps({"sub": "epoch_user", "valid_after": now, "exp": now + 600}))
+    with pytest.raises(HTTPException) as exc_info:
+        auth.verify_access_token(old_token)
+    assert exc_info.value.status_code == 401
+    assert auth.verify_access_token(new_token).sub == "epoch_user"
+    # iat'siz token'lar epoch'u olan kullanıcı için reddedilir
+    with pytest.raises(HTTPException):
+        auth.verify_access_token(create_test_access_token(subject="epoch_user", role="user"))
+
+
+def test_revocation_set_ignores_expired_and_malformed_entries(revoked_tokens):
+    revocation.handle_revocation_message("not json")
+    revocation.handle_revocation_message(json.dumps({"jti": "no-exp"}))
+    revocation.handle_revocation_message(json.dumps({"jti": "old", "exp": time.time() - 1}))
+    assert len(revoked_tokens) == 0
+
+    revoked_tokens.add("short", time.time() + 0.05)
+    assert revocation.is_token_revoked("short")
+    time.sleep(0.1)
+    assert not revocation.is_token_revoked("short")
+    assert revoked_tokens.purge_expired() == 1
+    assert not revocation.is_token_revoked(None)
+
+
+@pytest.fixture
+def rsa_signing_key():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_jwk = jwk.construct(pem, "RS256").public_key().to_dict()
+    public_jwk["kid"] = "test-key-1"
+    jwks.key_set.replace({"test-key-1": public_jwk})
+    auth.clear_token_cache()
+    yield pem
+    jwks.key_set.replace({})
+    auth.clear_token_cache()
+
+
+def _rs256_token(pem: str, kid: str, subject: str) -> str:
+    claims = {
+        "sub": subject, "role": "user", "jti": os.urandom(8).hex(),
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+    }
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+
+def test_rs256_token_is_verified_with_cached_jwks(rsa_signing_key: str):
+    token = _rs256_token(rsa_signing_key, "test-key-1", "rs_user")
+    assert auth.verify_access_token(token).sub == "rs_user"
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth.verify_access_token(_rs256_token(rsa_signing_key, "unknown-key", "rs_user"))
+    assert exc_info.value.status_code == 401
+
+    # HS256 token'ları (SECRET_KEY) kabul edilmeye devam eder
+    assert auth.verify_access_token(create_test_access_token(subject="hs_user", role="user")).sub == "hs_user"
+
+
+def test_permission_claim_round_trip():
+    claims = permission_claims(["products:create", "users:read_self", "not:registered"])
+    assert decode_permissions(claims) == {"products:create", "users:read_self"}
+    assert decode_permissions({**claims, "pv": "00000000"}) is None
+    assert decode_permissions({"sub": "legacy"}) is None
+
+
+def test_permission_claim_is_checked_without_role(client: TestClient):
+    subject = f"perm_user_{os.urandom(2).hex()}"
+    creator = create_test_access_token(subject, "user", permission_claims(["products:create"]))
+    headers = {"Authorization": f"Bearer {creator}"}
+
+    response = client.post("/products/", headers=headers, json={"name": f"Perm Product {os.urandom(2).hex()}", "price": 5, "stock": 1})
+    assert response.status_code == 201, response.text
+    product_id = response.json()["id"]
+
+    # Rol "admin" olsa da claim'de products:delete yoksa izin verilmez
+    admin_without_delete = create_test_access_token(subject, "admin", permission_claims(["products:create"]))
+    response = client.delete(f"/products/{product_id}", headers={"Authorization": f"Bearer {admin_without_delete}"})
+    assert response.status_code == 403
+
+
+def test_permission_registry_version_mismatch_falls_back_to_role(client: TestClient):
+    # Registry çekilemese de token'lar reddedilmez; izin kontrolü role göre yapılır
+    stale = {"pv": "00000000", "perms": "AAAA"}
+    admin_token = create_test_access_token(f"stale_{os.urandom(2).hex()}", "admin", stale)
+    response = client.post(
+        "/products/", headers={"Authorization": f"Bearer {admin_token}"},
+        json={"name": f"Stale {os.urandom(2).hex()}", "price": 1, "stock": 1}
+    )
+    assert response.status_code == 201, response.text
+
+    user_token = create_test_access_token(f"stale_{os.urandom(2).hex()}", "user", stale)
+    response = client.post(
+        "/products/", headers={"Authorization": f"Bearer {user_token}"},
+        json={"name": f"Stale {os.urandom(2).hex()}", "price": 1, "stock": 1}
+    )
+    assert response.status_code == 403
+
+
+@pytest.fixture
+def restore_permission_registry():
+    yield permission_registry
+    permission_registry.replace(BOOTSTRAP_PERMISSION_REGISTRY)
+    auth.clear_token_cache()
+
+
+def test_permission_claims_follow_the_current_registry(restore_permission_registry):
+    reordered = ("products:delete",) + BOOTSTRAP_PERMISSION_REGISTRY[:-1]
+    old_claims = permission_claims(["products:delete"])
+    restore_permission_registry.replace(reordered)
+    assert restore_permission_registry.version == registry_version(reordered)
+
+    # Yeni registry'yle basılmış token çözülür; eski versiyon artık çözülmez
+    assert decode_permissions(permission_claims(["products:delete"])) == {"products:delete"}
+    assert decode_permissions(old_claims) is None
@@ -0,0 +1,73 @@
+# tests/test_export.py (product_service)
+import pytest
+import io
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+from app.db import partitions
+from app.db.models.order import Order as OrderModel, OrderItem as OrderItemModel, OrderStatus
+
+
+@pytest.fixture
+def past_orders(db_session_product: Session) -> list:
+    # Sabit bir geçmiş gün; partition'ı takvimden bağımsız olsun diye burada oluşturulur
+    created_at = datetime(2021, 4, 10, 12, 0, tzinfo=timezone.utc)
+    for table in partitions.ORDER_TABLES:
+        partitions.ensure_month_partitions(db_session_product.connection(), table, created_at.date(), created_at.date())
+    orders = []
+    for offset in range(3):
+        db_order = OrderModel(
+            user_id="export_test_user", total_amount=10.0 + offset, status=OrderStatus.DELIVERED,
+            created_at=created_at + timedelta(minutes=offset)
+        )
+        db_session_product.add(db_order)
+        db_session_product.flush()
+        db_session_product.add(OrderItemModel(
+            order_id=db_order.id, order_created_at=db_order.created_at, product_id=None, quantity=1,
+            price_at_purchase=db_order.total_amount
+        ))
+        orders.append(db_order)
+    db_session_product.flush()
+    return orders
+
+
+def test_export_orders_parquet_and_incremental(client: TestClient, admin_product_token_headers: dict, past_orders: list):
+    day = past_orders[0].created_at.date().isoformat()
+    params = {"start_date": day, "end_date": day, "format": "parquet"}
+    response = client.get("/reports/export/orders", headers=admin_product_token_headers, params=params)
+    assert response.status_code == 200, response.text
+
+    table = pq.read_table(io.BytesIO(response.content))
+    exported = {row["id"]: row for row in table.to_pylist()}
+    for db_order in past_orders:
+        assert exported[db_order.id]["status"] == "DELIVERED"
+        assert exported[db_order.id]["total_amount"] == db_order.total_amount
+    assert int(response.headers["X-Export-Row-Count"]) == table.num_rows
+
+    watermark = response.headers["X-Export-High-Watermark"]
+    response_incremental = client.get(
+        "/reports/export/orders", headers=admin_product_token_headers, params={**params, "since": watermark}
+    )
+    assert response_incremental.status_code == 200
+    assert pq.read_table(io.BytesIO(response_incremental.content)).num_rows == 0
+
+
+def test_export_order_items_arrow(client: TestClient, admin_product_token_headers: dict, past_orders: list):
+    day = past_orders[0].created_at.date().isoformat()
+    response = client.get(
+        "/reports/export/order_items", headers=admin_product_token_headers,
+        params={"start_date": day, "end_date": day, "format": "arrow"}
+    )
+    assert response.status_code == 200, response.text
+    table = pa_ipc.open_file(io.BytesIO(response.content)).read_all()
+    exported_order_ids = set(table.column("order_id").to_pylist())
+    assert {db_order.id for db_order in past_orders} <= exported_order_ids
+
+
+def test_export_requires_admin(client: TestClient, normal_user_product_token_headers: tuple):
+    headers, _ = normal_user_product_token_headers
+    response = client.get("/reports/export/orders", headers=headers)
+    assert response.status_code == 403
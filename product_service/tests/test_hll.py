@@ -0,0 +1,29 @@
+# tests/test_hll.py (product_service)
+import pytest
+
+from app.core import hll
+
+
+@pytest.mark.parametrize("cardinality", [0, 1, 100, 5000, 50000])
+def test_hll_estimate_close_to_exact_count(cardinality: int):
+    values = [f"customer-{i}" for i in range(cardinality)]
+    sketch = hll.HyperLogLog()
+    sketch.update(values + values[: cardinality // 2]) # tekrarlar sayıyı değiştirmemeli
+
+    exact = len(set(values))
+    estimate = sketch.estimate()
+    lower_bound, upper_bound = hll.error_bounds(estimate)
+    assert lower_bound <= exact <= upper_bound
+    assert abs(estimate - exact) <= max(1.0, 3 * hll.relative_standard_error() * exact)
+
+
+def test_hll_merge_matches_union():
+    first, second = hll.HyperLogLog(), hll.HyperLogLog()
+    first.update(f"customer-{i}" for i in range(3000))
+    second.update(f"customer-{i}" for i in range(2000, 6000))
+    first.merge(second)
+
+    union = hll.HyperLogLog()
+    union.update(f"customer-{i}" for i in range(6000))
+    assert first.registers == union.registers
+    assert abs(first.estimate() - 6000) <= 3 * hll.relative_standard_error() * 6000
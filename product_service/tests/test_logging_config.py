@@ -0,0 +1,42 @@
+# tests/test_logging_config.py
+import json
+import logging
+import queue
+
+from app.core.logging_config import JsonFormatter, NonBlockingQueueHandler, SamplingFilter
+
+
+def _record(level=logging.INFO, name="app.test", msg="Order %s created", args=(42,), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_formatter_includes_message_and_extra_fields():
+    entry = json.loads(JsonFormatter().format(_record(order_id=42)))
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["message"] == "Order 42 created"
+    assert entry["order_id"] == 42
+
+
+def test_sampling_filter_only_samples_marked_records():
+    drop_all = SamplingFilter(rate=0.0, logger_names=["uvicorn.access"])
+    assert drop_all.filter(_record()) is True
+    assert drop_all.filter(_record(sampled=True)) is False
+    assert drop_all.filter(_record(name="uvicorn.access")) is False
+    # WARNING ve üzeri asla örneklenmez
+    assert drop_all.filter(_record(level=logging.WARNING, sampled=True)) is True
+
+
+def test_queue_handler_drops_when_full_without_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    first = _record()
+    handler.emit(first)
+    handler.emit(_record())
+    assert handler.dropped == 1
+    # Kayıt formatlanmadan kuyruğa atılır; args listener tarafında uygulanır.
+    queued = handler.queue.get_nowait()
+    assert queued is first
+    assert queued.args == (42,)
@@ -0,0 +1,103 @@
+# tests/test_partitions.py (product_service)
+import pytest
+from fastapi.testclient import TestClient
+from datetime import date, datetime, timezone
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, with_parent
+import os
+
+from app.db import partitions
+from app.db.models.order import Order as OrderModel, OrderItem as OrderItemModel
+from app.services import report_service, order_service
+
+
+def _explain(db: Session, statement) -> str:
+    compiled = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan_rows = db.connection().exec_driver_sql(f"EXPLAIN {compiled}").scalars().all()
+    return "\n".join(plan_rows)
+
+
+def test_order_tables_are_partitioned(db_session_product: Session):
+    current_month = partitions.month_floor(datetime.now(timezone.utc))
+    for table in partitions.ORDER_TABLES:
+        assert partitions.get_relkind(db_session_product.connection(), table) == "p"
+        partition_names = db_session_product.execute(
+            text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                 "WHERE i.inhparent = CAST(:table AS regclass)"),
+            {"table": table}
+        ).scalars().all()
+        assert partitions.partition_name(table, partitions.add_months(current_month, -1)) in partition_names
+        assert partitions.partition_name(table, current_month) in partition_names
+        assert partitions.partition_name(table, partitions.add_months(current_month, 1)) in partition_names
+
+
+def test_daily_sales_source_query_prunes_to_requested_month(db_session_product: Session):
+    past_month = date(2020, 1, 1)
+    partitions.ensure_month_partitions(db_session_product.connection(), "orders", past_month, past_month)
+    current_month = partitions.month_floor(datetime.now(timezone.utc))
+
+    query = report_service._daily_sales_source_query(db_session_product, date(2020, 1, 1), date(2020, 1, 31))
+    plan = _explain(db_session_product, query.statement)
+
+    assert partitions.partition_name("orders", past_month) in plan
+    assert partitions.partition_name("orders", current_month) not in plan
+
+
+def test_sales_timeseries_query_prunes_to_requested_month(db_session_product: Session):
+    past_month = date(2020, 1, 1)
+    partitions.ensure_month_partitions(db_session_product.connection(), "orders", past_month, past_month)
+    current_month = partitions.month_floor(datetime.now(timezone.utc))
+
+    query = report_service._sales_timeseries_query(
+        db_session_product, "day", "UTC",
+        datetime(2020, 1, 1, tzinfo=timezone.utc), datetime(2020, 2, 1, tzinfo=timezone.utc)
+    )
+    plan = _explain(db_session_product, query.statement)
+
+    assert partitions.partition_name("orders", past_month) in plan
+    assert partitions.partition_name("orders", current_month) not in plan
+
+
+def test_product_sales_query_prunes_both_tables(db_session_product: Session):
+    past_month = date(2020, 1, 1)
+    for table in partitions.ORDER_TABLES:
+        partitions.ensure_month_partitions(db_session_product.connection(), table, past_month, past_month)
+    current_month = partitions.month_floor(datetime.now(timezone.utc))
+
+    subquery = report_service._product_sales_subquery(
+        db_session_product, datetime(2020, 1, 1, tzinfo=timezone.utc), datetime(2020, 2, 1, tzinfo=timezone.utc)
+    )
+    plan = _explain(db_session_product, select(subquery))
+
+    for table in partitions.ORDER_TABLES:
+        assert partitions.partition_name(table, past_month) in plan
+        assert partitions.partition_name(table, current_month) not in plan
+
+
+def test_partitionwise_settings_do_not_leak_into_the_transaction(db_session_product: Session):
+    def setting() -> str:
+        return db_session_product.execute(text("SHOW enable_partitionwise_join")).scalar()
+
+    before = setting()
+    report_service.clear_report_cache() # sonuç cache'ten gelirse sorgu hiç çalışmaz
+    report_service.get_top_products(db_session_product, date(2020, 1, 1), date(2020, 1, 31))
+    assert setting() == before
+
+
+def test_order_items_load_prunes_to_order_month(
+    client: TestClient, db_session_product: Session,
+    normal_user_product_token_headers: tuple, admin_product_token_headers: dict
+):
+    headers, username = normal_user_product_token_headers
+    product_data = {"name": f"Partition Test Ürün {os.urandom(2).hex()}", "price": 10.0, "stock": 5, "is_active": True}
+    product_id = client.post("/products/", headers=admin_product_token_headers, json=product_data).json()["id"]
+    client.post("/cart/items", headers=headers, json={"product_id": product_id, "quantity": 1})
+    assert client.post("/orders/", headers=headers).status_code == 201
+
+    db_order = order_service.get_user_orders(db=db_session_product, user_id=username)[0]
+    plan = _explain(db_session_product, select(OrderItemModel).where(with_parent(db_order, OrderModel.items)))
+
+    order_month = partitions.month_floor(db_order.created_at)
+    assert partitions.partition_name("order_items", order_month) in plan
+    assert partitions.partition_name("order_items", partitions.add_months(order_month, 1)) not in plan
@@ -0,0 +1,111 @@
+# tests/test_report_jobs.py (product_service)
+import pytest
+import threading
+from contextlib import contextmanager
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.models.report import ReportJob as ReportJobModel, ReportJobStatus
+from app.services import report_job_service
+
+
+@pytest.fixture
+def inline_report_jobs(monkeypatch, db_session_product: Session):
+    """İşleri arka plan havuzu yerine istek içinde, test transaction'ının session'ı ile çalıştırır."""
+    @contextmanager
+    def _session():
+        yield db_session_product
+    monkeypatch.setattr(report_job_service, "_job_session", _session)
+    monkeypatch.setattr(report_job_service, "_dispatch", report_job_service._run_job_and_release)
+
+
+@pytest.fixture
+def queued_report_jobs(monkeypatch):
+    """İşleri kuyrukta bırakır (hiçbir worker almaz)."""
+    monkeypatch.setattr(report_job_service, "_pending_slots", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(report_job_service, "_dispatch", lambda job_id: None)
+
+
+def test_report_job_lifecycle(client: TestClient, admin_product_token_headers: dict, inline_report_jobs):
+    today = datetime.now(timezone.utc).date().isoformat()
+    job_spec = {"kind": "sales_summary", "start_date": today, "end_date": today}
+    response = client.post("/reports/jobs", headers=admin_product_token_headers, json=job_spec)
+    assert response.status_code == 202, response.text
+    job = response.json()
+    assert response.headers["Location"].endswith(f"/reports/jobs/{job['id']}")
+
+    response_status = client.get(f"/reports/jobs/{job['id']}", headers=admin_product_token_headers)
+    assert response_status.status_code == 200
+    assert response_status.json()["status"] == "SUCCEEDED"
+    assert response_status.json()["expires_at"] is not None
+
+    response_result = client.get(f"/reports/jobs/{job['id']}/result", headers=admin_product_token_headers)
+    assert response_result.status_code == 200
+    sync_summary = client.get(
+        "/reports/sales/summary", headers=admin_product_token_headers, params={"start_date": today, "end_date": today}
+    ).json()
+    assert response_result.json()["result"]["total_orders"] == sync_summary["total_orders"]
+    assert response_result.json()["result"]["total_revenue"] == sync_summary["total_revenue"]
+
+
+def test_report_job_result_not_ready_and_queue_limit(client: TestClient, admin_product_token_headers: dict, queued_report_jobs):
+    response = client.post("/reports/jobs", headers=admin_product_token_headers, json={"kind": "category_revenue"})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.json()["status"] == "QUEUED"
+
+    response_result = client.get(f"/reports/jobs/{job_id}/result", headers=admin_product_token_headers)
+    assert response_result.status_code == 409
+
+    response_full = client.post("/reports/jobs", headers=admin_product_token_headers, json={"kind": "category_revenue"})
+    assert response_full.status_code == 503
+    assert "Retry-After" in response_full.headers
+
+
+def test_report_job_validation_and_not_found(client: TestClient, admin_product_token_headers: dict, normal_user_product_token_headers: tuple):
+    response = client.post("/reports/jobs", headers=admin_product_token_headers, json={"kind": "no_such_report"})
+    assert response.status_code == 422
+
+    headers, _ = normal_user_product_token_headers
+    response = client.post("/reports/jobs", headers=headers, json={"kind": "sales_summary"})
+    assert response.status_code == 403
+
+    response = client.get("/reports/jobs/00000000-0000-0000-0000-000000000000", headers=admin_product_token_headers)
+    assert response.status_code == 404
+
+
+def test_report_job_scheduling_failure_marks_job_failed(
+    client: TestClient, admin_product_token_headers: dict, db_session_product: Session, monkeypatch
+):
+    def _reject(job_id: str) -> None:
+        raise RuntimeError("cannot schedule new futures after shutdown")
+    monkeypatch.setattr(report_job_service, "_dispatch", _reject)
+
+    response = client.post("/reports/jobs", headers=admin_product_token_headers, json={"kind": "category_revenue"})
+    assert response.status_code == 503
+
+    db_job = db_session_product.query(ReportJobModel).order_by(ReportJobModel.created_at.desc()).first()
+    assert db_job.status == ReportJobStatus.FAILED
+    assert db_job.expires_at is not None
+
+
+def test_stale_report_jobs_are_failed(
+    client: TestClient, admin_product_token_headers: dict, db_session_product: Session, queued_report_jobs
+):
+    response = client.post("/reports/jobs", headers=admin_product_token_headers, json={"kind": "category_revenue"})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    # Oluşturulurken bir son tarih verilir; hiçbir worker almasa da sonsuza kadar kalmaz
+    assert response.json()["expires_at"] is not None
+
+    db_session_product.query(ReportJobModel).filter(ReportJobModel.id == job_id).update(
+        {ReportJobModel.created_at: datetime.now(timezone.utc) - timedelta(seconds=settings.REPORT_JOB_STALE_AFTER_SECONDS + 60)},
+        synchronize_session=False
+    )
+    assert report_job_service.fail_stale_jobs(db_session_product) == 1
+
+    response_status = client.get(f"/reports/jobs/{job_id}", headers=admin_product_token_headers)
+    assert response_status.status_code == 200
+    assert response_status.json()["status"] == "FAILED"
@@ -0,0 +1,242 @@
+# tests/test_reports.py (product_service)
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timezone
+import os
+
+from app.db import partitions
+from app.db.models.order import Order as OrderModel, OrderStatus
+from app.db.models.report import DailySales as DailySalesModel
+from app.services import report_service
+
+def _create_order(client: TestClient, headers: dict, admin_headers: dict, price: float = 20.0, quantity: int = 2) -> dict:
+    product_data = {"name": f"Rapor Test Ürün {os.urandom(2).hex()}", "price": price, "stock": 10, "is_active": True}
+    product = client.post("/products/", headers=admin_headers, json=product_data).json()
+    client.post("/cart/items", headers=headers, json={"product_id": product["id"], "quantity": quantity})
+    response = client.post("/orders/", headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def _summary(client: TestClient, admin_headers: dict, day: date) -> dict:
+    response = client.get(
+        "/reports/sales/summary", headers=admin_headers,
+        params={"start_date": day.isoformat(), "end_date": day.isoformat()}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _rollup_rows(db: Session) -> set:
+    return {(r.day, r.status, r.order_count, round(r.revenue, 2)) for r in db.query(DailySalesModel).all() if r.order_count}
+
+def test_sales_summary_follows_order_status(
+    client: TestClient, db_session_product: Session,
+    normal_user_product_token_headers: tuple, admin_product_token_headers: dict
+):
+    headers, _ = normal_user_product_token_headers
+    today = datetime.now(timezone.utc).date()
+    before = _summary(client, admin_product_token_headers, today)
+
+    order = _create_order(client, headers, admin_product_token_headers, price=20.0, quantity=2)
+    # PENDING siparişler satış sayılmaz
+    assert _summary(client, admin_product_token_headers, today) == before
+
+    response = client.put(f"/orders/{order['id']}/status", headers=admin_product_token_headers, json={"status": "PROCESSING"})
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "PROCESSING"
+    after = _summary(client, admin_product_token_headers, today)
+    assert after["total_orders"] == before["total_orders"] + 1
+    assert after["total_revenue"] == pytest.approx(before["total_revenue"] + 40.0)
+
+    client.put(f"/orders/{order['id']}/status", headers=admin_product_token_headers, json={"status": "CANCELLED"})
+    assert _summary(client, admin_product_token_headers, today) == before
+
+def test_rebuild_daily_sales_matches_incremental_rollup(
+    client: TestClient, db_session_product: Session,
+    normal_user_product_token_headers: tuple, admin_product_token_headers: dict
+):
+    headers, _ = normal_user_product_token_headers
+    first = _create_order(client, headers, admin_product_token_headers, price=12.5, quantity=1)
+    _create_order(client, headers, admin_product_token_headers, price=7.0, quantity=3)
+    client.put(f"/orders/{first['id']}/status", headers=admin_product_token_headers, json={"status": "SHIPPED"})
+
+    incremental = _rollup_rows(db_session_product)
+    report_service.rebuild_daily_sales(db_session_product)
+    assert _rollup_rows(db_session_product) == incremental
+
+def test_update_order_status_requires_admin(client: TestClient, normal_user_product_token_headers: tuple):
+    headers, _ = normal_user_product_token_headers
+    response = client.put("/orders/1/status", headers=headers, json={"status": "SHIPPED"})
+    assert response.status_code == 403
+
+def test_update_order_status_not_found(client: TestClient, admin_product_token_headers: dict):
+    response = client.put("/orders/999999/status", headers=admin_product_token_headers, json={"status": "SHIPPED"})
+    assert response.status_code == 404
+
+def test_sales_timeseries_buckets(
+    client: TestClient, normal_user_product_token_headers: tuple, admin_product_token_headers: dict
+):
+    headers, _ = normal_user_product_token_headers
+    order = _create_order(client, headers, admin_product_token_headers, price=15.0, quantity=2)
+    client.put(f"/orders/{order['id']}/status", headers=admin_product_token_headers, json={"status": "DELIVERED"})
+
+    today = datetime.now(timezone.utc).date()
+    response = client.get(
+        "/reports/sales/timeseries", headers=admin_product_token_headers,
+        params={"start_date": today.isoformat(), "end_date": today.isoformat(), "bucket": "month"}
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["bucket"] == "month"
+    assert len(data["points"]) == 1
+    assert data["points"][0]["bucket_start"].startswith(today.replace(day=1).isoformat())
+    assert data["points"][0]["total_orders"] >= 1
+    assert data["points"][0]["total_revenue"] >= 30.0
+
+def test_sales_timeseries_week_buckets_and_timezone(client: TestClient, admin_product_token_headers: dict):
+    response = client.get(
+        "/reports/sales/timeseries", headers=admin_product_token_headers,
+        params={"start_date": "2020-01-01", "end_date": "2020-01-31", "bucket": "week", "timezone": "Europe/Istanbul"}
+    )
+    assert response.status_code == 200, response.text
+    points = response.json()["points"]
+    assert [p["bucket_start"][:10] for p in points] == ["2019-12-30", "2020-01-06", "2020-01-13", "2020-01-20", "2020-01-27"]
+    assert all(p["bucket_start"].endswith("+03:00") for p in points)
+
+def test_sales_timeseries_closed_buckets_are_cached(
+    client: TestClient, db_session_product: Session, admin_product_token_headers: dict
+):
+    # Kapanmış bir dilimin siparişi; sabit bir geçmiş gün, partition'ı test içinde oluşturulur
+    order_day = date(2021, 3, 15)
+    for table in partitions.ORDER_TABLES:
+        partitions.ensure_month_partitions(db_session_product.connection(), table, order_day, order_day)
+    db_order = OrderModel(
+        user_id="timeseries_cache_user", total_amount=10.0, status=OrderStatus.PROCESSING,
+        created_at=datetime.combine(order_day, time(12, 0), tzinfo=timezone.utc)
+    )
+    db_session_product.add(db_order)
+    db_session_product.flush()
+
+    params = {"start_date": order_day.isoformat(), "end_date": order_day.isoformat(), "bucket": "day"}
+    first = client.get("/reports/sales/timeseries", headers=admin_product_token_headers, params=params).json()
+    assert first["points"][0]["total_orders"] >= 1
+
+    # Cache'lenmiş kapanmış dilim tekrar hesaplanmaz...
+    db_session_product.execute(text("UPDATE orders SET total_amount = 110.0 WHERE id = :id"), {"id": db_order.id})
+    second = client.get("/reports/sales/timeseries", headers=admin_product_token_headers, params=params).json()
+    assert second["points"] == first["points"]
+
+    # ...ama siparişin durumu değişince o dilim geçersiz kılınır.
+    client.put(f"/orders/{db_order.id}/status", headers=admin_product_token_headers, json={"status": "CANCELLED"})
+    third = client.get("/reports/sales/timeseries", headers=admin_product_token_headers, params=params).json()
+    assert third["points"][0]["total_orders"] == first["points"][0]["total_orders"] - 1
+
+def test_sales_timeseries_rejects_unknown_timezone(client: TestClient, admin_product_token_headers: dict):
+    response = client.get(
+        "/reports/sales/timeseries", headers=admin_product_token_headers, params={"timezone": "Mars/Olympus"}
+    )
+    assert response.status_code == 400
+
+def test_top_products_and_category_revenue(
+    client: TestClient, normal_user_product_token_headers: tuple, admin_product_token_headers: dict
+):
+    headers, _ = normal_user_product_token_headers
+    admin_headers = admin_product_token_headers
+    category = client.post("/categories/", headers=admin_headers, json={"name": f"RaporKat{os.urandom(2).hex()}"}).json()
+
+    def create_product(price: float) -> dict:
+        data = {"name": f"Top Ürün {os.urandom(2).hex()}", "price": price, "stock": 20, "is_active": True, "category_id": category["id"]}
+        return client.post("/products/", headers=admin_headers, json=data).json()
+
+    cheap, expensive = create_product(2.0), create_product(50.0)
+    client.post("/cart/items", headers=headers, json={"product_id": cheap["id"], "quantity": 5})
+    client.post("/cart/items", headers=headers, json={"product_id": expensive["id"], "quantity": 1})
+    order = client.post("/orders/", headers=headers).json()
+    client.put(f"/orders/{order['id']}/status", headers=admin_headers, json={"status": "PROCESSING"})
+
+    today = datetime.now(timezone.utc).date().isoformat()
+    params = {"start_date": today, "end_date": today, "limit": 100}
+
+    by_units = client.get("/reports/products/top", headers=admin_headers, params={**params, "order_by": "units"}).json()["products"]
+    ids_by_units = [p["product_id"] for p in by_units]
+    assert ids_by_units.index(cheap["id"]) < ids_by_units.index(expensive["id"])
+    cheap_row = next(p for p in by_units if p["product_id"] == cheap["id"])
+    assert cheap_row["units_sold"] == 5 and cheap_row["revenue"] == 10.0
+
+    by_revenue = client.get("/reports/products/top", headers=admin_headers, params={**params, "order_by": "revenue"}).json()["products"]
+    ids_by_revenue = [p["product_id"] for p in by_revenue]
+    assert ids_by_revenue.index(expensive["id"]) < ids_by_revenue.index(cheap["id"])
+
+    response = client.get("/reports/categories/revenue", headers=admin_headers, params={"start_date": today, "end_date": today})
+    assert response.status_code == 200, response.text
+    category_row = next(c for c in response.json()["categories"] if c["category_id"] == category["id"])
+    assert category_row["units_sold"] == 6
+    assert category_row["revenue"] == 60.0
+
+def test_unique_customers_from_daily_sketches(client: TestClient, admin_product_token_headers: dict):
+    from .conftest import create_test_access_token
+    from app.core import hll
+
+    def _order_as(username: str, new_status: str) -> None:
+        user_headers = {"Authorization": f"Bearer {create_test_access_token(subject=username, role='user')}"}
+        order = _create_order(client, user_headers, admin_product_token_headers, price=5.0, quantity=1)
+        response = client.put(f"/orders/{order['id']}/status", headers=admin_product_token_headers, json={"status": new_status})
+        assert response.status_code == 200, response.text
+
+    usernames = [f"hll_user_{i}_{os.urandom(2).hex()}" for i in range(4)]
+    for username in usernames + usernames[:2]: # ilk iki kullanıcı iki sipariş verir
+        _order_as(username, "PROCESSING")
+    # Yalnızca beklemede ya da iptal edilmiş siparişi olan kullanıcılar sayılmaz (total_orders gibi)
+    _order_as(f"hll_pending_{os.urandom(2).hex()}", "PENDING")
+    _order_as(f"hll_cancelled_{os.urandom(2).hex()}", "CANCELLED")
+
+    expected = hll.HyperLogLog()
+    expected.update(usernames)
+
+    today = datetime.now(timezone.utc).date().isoformat()
+    response = client.get(
+        "/reports/sales/unique-customers", headers=admin_product_token_headers,
+        params={"start_date": today, "end_date": today, "per_day": True}
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    # Test transaction'ında bugünün sketch'i yalnızca bu siparişleri içerir
+    assert data["unique_customers"]["estimate"] == round(expected.estimate())
+    assert data["unique_customers"]["lower_bound"] <= len(usernames) <= data["unique_customers"]["upper_bound"]
+    assert data["days"][0]["day"] == today
+
+    summary = _summary(client, admin_product_token_headers, datetime.now(timezone.utc).date())
+    assert summary["unique_customers"] == data["unique_customers"]["estimate"]
+
+def test_inventory_report_velocity_and_low_stock(
+    client: TestClient, normal_user_product_token_headers: tuple, admin_product_token_headers: dict
+):
+    headers, _ = normal_user_product_token_headers
+    admin_headers = admin_product_token_headers
+
+    def create_product(stock: int) -> dict:
+        data = {"name": f"Stok Ürün {os.urandom(2).hex()}", "price": 4.0, "stock": stock, "is_active": True}
+        return client.post("/products/", headers=admin_headers, json=data).json()
+
+    fast_mover, idle = create_product(stock=40), create_product(stock=3)
+    client.post("/cart/items", headers=headers, json={"product_id": fast_mover["id"], "quantity": 30})
+    order = client.post("/orders/", headers=headers).json()
+    client.put(f"/orders/{order['id']}/status", headers=admin_headers, json={"status": "SHIPPED"})
+
+    response = client.get("/reports/inventory", headers=admin_headers, params={"window_days": 30, "limit": 1000})
+    assert response.status_code == 200, response.text
+    report = response.json()
+    rows = {row["product_id"]: row for row in report["products"]}
+
+    fast = rows[fast_mover["id"]] # stok 40 - 30 = 10, günde 1 adet
+    assert fast["units_sold"] == 30
+    assert fast["daily_velocity"] == pytest.approx(1.0)
+    assert fast["days_of_cover"] == pytest.approx(10.0)
+    assert fast["sell_through"] == pytest.approx(30 / 40)
+    assert fast["is_low_stock"] is True # 10 gün < 14 gün
+
+    slow = rows[idle["id"]]
+    assert slow["units_sold"] == 0 and slow["days_of_cover"] is None
+    assert slow["is_low_stock"] is True # stok <= 5
+    assert report["low_stock_count"] >= 2
@@ -0,0 +1,51 @@
+# tests/test_shared_modules.py
+"""
+Servisler ayrı Docker build context'leriyle derlendiğinden ortak modüller paylaşılan bir paket yerine
+her serviste kopya olarak tutulur. Kaynak product_service'teki dosyadır; user_service'teki kopya
+onunla birebir aynı kalmalıdır. Değişiklik yaparken dosyayı iki servise de kopyalayın.
+"""
+import ast
+from pathlib import Path
+
+import pytest
+
+from app.core.permission_claims import BOOTSTRAP_PERMISSION_REGISTRY
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+MIRROR_ROOT = SERVICE_ROOT.parent / "user_service"
+
+SHARED_MODULES = [
+    "app/core/logging_config.py",
+    "app/core/cache.py",
+]
+
+
+@pytest.mark.parametrize("relative_path", SHARED_MODULES)
+def test_shared_module_copies_are_identical(relative_path: str):
+    mirror = MIRROR_ROOT / relative_path
+    if not mirror.exists():
+        # Test container'ında yalnızca bu servisin dosyaları bulunur; kontrol repo checkout'unda çalışır
+        pytest.skip("user_service checkout is not available")
+    source = SERVICE_ROOT / relative_path
+    assert mirror.read_bytes() == source.read_bytes(), (
+        f"user_service/{relative_path} differs from product_service/{relative_path}; copy the source file over"
+    )
+
+
+def _user_service_permissions() -> list:
+    """user_service/app/initial_data.py'deki `PERMISSIONS` sözlüğünün anahtarları (modül import edilmeden)."""
+    tree = ast.parse((MIRROR_ROOT / "app/initial_data.py").read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(target, "id", None) == "PERMISSIONS" for target in node.targets):
+            return [ast.literal_eval(key) for key in node.value.keys]
+    raise AssertionError("PERMISSIONS not found in user_service/app/initial_data.py")
+
+
+def test_bootstrap_permission_registry_matches_user_service():
+    if not (MIRROR_ROOT / "app/initial_data.py").exists():
+        pytest.skip("user_service checkout is not available")
+    # Bit sırası da önemli: izin i -> bit i
+    assert list(BOOTSTRAP_PERMISSION_REGISTRY) == _user_service_permissions(), (
+        "BOOTSTRAP_PERMISSION_REGISTRY in app/core/permission_claims.py is out of sync with "
+        "user_service's initial_data.PERMISSIONS"
+    )
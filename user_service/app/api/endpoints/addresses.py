@@ -6,8 +6,8 @@ from typing import List, Optional
 from app.schemas import address as address_schema 
 from app.services import address_service          
 from app.db.database import get_db
-from app.core.auth import get_current_active_user 
-from app.db.models.user import User as UserModel  
+from app.core.auth import get_current_principal
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -21,7 +21,7 @@ router = APIRouter()
 def create_address_for_current_user(
     address_in: address_schema.AddressCreate,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user) 
+    current_user: Principal = Depends(get_current_principal) 
 ):
     """
     Mevcut kimliği doğrulanmış kullanıcı için yeni bir adres oluşturur.
@@ -36,7 +36,7 @@ def create_address_for_current_user(
 )
 def read_addresses_for_current_user(
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user), 
+    current_user: Principal = Depends(get_current_principal), 
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100)
 ):
@@ -52,7 +52,7 @@ def read_addresses_for_current_user(
 def read_address(
     address_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
 
     db_address = address_service.get_address(db, address_id=address_id)
@@ -73,7 +73,7 @@ def update_existing_address(
     address_id: int,
     address_in: address_schema.AddressUpdate,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
 
     db_address = address_service.get_address(db, address_id=address_id)
@@ -95,7 +95,7 @@ def update_existing_address(
 def delete_existing_address(
     address_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
 
     db_address = address_service.get_address(db, address_id=address_id)
@@ -3,29 +3,61 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm 
 from sqlalchemy.orm import Session
 from datetime import timedelta 
-from typing import Set
+from typing import Optional, Set
+from starlette.concurrency import run_in_threadpool
 
 from app.schemas import token as token_schema 
 from app.schemas import user as user_schema
-from app.schemas.auth import CheckLoginResponse
+from app.schemas.auth import CheckLoginResponse, IntrospectionRequest, IntrospectionResponse
 from app.schemas.token import TokenData
-from app.services import auth_service
+from app.services import auth_service, refresh_token_service, user_service
 from app.core.security import create_access_token 
 from app.db.database import get_db
 from app.core.config import settings
 from app.core.auth import get_current_active_user
-from app.core.auth import verify_token
+from app.core.auth import verify_introspection_key, verify_token
 from app.db.models.user import User as UserModel
 from app.core.security import create_access_token 
 from app.core.auth import oauth2_scheme 
+from app.core.permission_claims import permission_claims
+from app.core.rate_limit import limit_login_attempts
 
 router = APIRouter()
 
+def _issue_tokens(db: Session, user: UserModel, refresh_token: Optional[str] = None, session_id: Optional[str] = None) -> dict:
+    if refresh_token is None:
+        refresh_token, session_id = refresh_token_service.issue_refresh_token(db, user)
+
+    user_is_admin = any(role.name == "ADMIN" for role in user.roles)
+    user_role = "admin" if user_is_admin else "user"
+
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    token_payload = {
+        "sub": user.username, 
+        "role": user_role,    
+        "sid": session_id, # refresh token ailesi; logout'ta birlikte iptal edilir
+    }
+    if settings.JWT_EMBED_PERMISSIONS:
+        token_payload.update(permission_claims(user.permissions))
+
+    access_token = create_access_token(
+        payload_data=token_payload, expires_delta=access_token_expires
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token,
+    }
+
 @router.post(
     "/login",
     response_model=token_schema.Token, # Başarılı yanıtta Token şeması dönecek
     summary="User Login",
-    description="Authenticate user with username and password, returns JWT token."
+    description="Authenticate user with username and password, returns JWT token.",
+    dependencies=[Depends(limit_login_attempts)],
+    responses={429: {"description": "Too many login attempts"}}
 )
 def login_for_access_token(
     db: Session = Depends(get_db),
@@ -42,33 +74,48 @@ def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return _issue_tokens(db, user)
 
-    user_is_admin = any(role.name == "ADMIN" for role in user.roles)
-    user_role = "admin" if user_is_admin else "user"
-
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-
-    token_payload = {
-        "sub": user.username, 
-        "role": user_role,    
-    }
-
-    access_token = create_access_token(
-        payload_data=token_payload, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+@router.post(
+    "/refresh",
+    response_model=token_schema.Token,
+    summary="Refresh access token",
+    description="Exchanges a refresh token for a new access token and a new refresh token. Each refresh token can be used once; reusing one revokes the whole session.",
+    responses={401: {"description": "Invalid, expired, reused or revoked refresh token"}}
+)
+def refresh_access_token(
+    refresh_in: token_schema.RefreshTokenRequest,
+    db: Session = Depends(get_db)
+):
+    user, refresh_token, session_id = refresh_token_service.rotate_refresh_token(db, refresh_in.refresh_token)
+    return _issue_tokens(db, user, refresh_token=refresh_token, session_id=session_id)
 
 @router.post(
     "/logout",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Logout user",
-    description="Adds the current user's token to the blacklist, effectively logging them out."
+    description="Adds the current user's token to the blacklist and revokes the refresh tokens of its session, effectively logging them out."
 )
 async def logout( 
     token: str = Depends(oauth2_scheme), 
+    db: Session = Depends(get_db),
 ):
     await auth_service.blacklist_token(token=token)
+    await run_in_threadpool(auth_service.revoke_session, db, token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post(
+    "/logout-all",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Logout from all sessions",
+    description="Revokes every token issued to the current user before now, on all devices and services."
+)
+def logout_all(
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    user = user_service.invalidate_user_tokens(db=db, user=current_user)
+    auth_service.publish_tokens_valid_after_from_thread(user.username, user.tokens_valid_after)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 router.get(
@@ -93,4 +140,13 @@ async def check_token_validity(
 ):
     return CheckLoginResponse(username=token_data.username)
 
-
+@router.post(
+    "/introspect",
+    response_model=IntrospectionResponse,
+    summary="Introspect access tokens (internal)",
+    description="Validates up to INTROSPECTION_MAX_TOKENS access tokens at once for internal consumers (other services, gateway). Requires the X-Introspection-Key header. Revocation of all tokens is checked in a single Redis round trip.",
+    dependencies=[Depends(verify_introspection_key)],
+    responses={503: {"description": "Revocation status could not be checked"}}
+)
+async def introspect_tokens(introspection_in: IntrospectionRequest):
+    return IntrospectionResponse(results=await auth_service.introspect_tokens(introspection_in.tokens))
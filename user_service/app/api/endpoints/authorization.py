@@ -5,8 +5,8 @@ from typing import List, Set
 
 from app.schemas import permission as permission_schema 
 from app.db.database import get_db
-from app.core.auth import get_current_active_user 
-from app.db.models.user import User as UserModel 
+from app.core.auth import get_current_principal
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -18,9 +18,9 @@ router = APIRouter()
     description="Retrieves a distinct set of all permission names assigned to the currently authenticated user via their roles."
 )
 async def read_my_all_permissions( 
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    return current_user.permissions
+    return set(current_user.permissions)
 
 @router.get(
     "/has-role/{role_name}",
@@ -30,9 +30,9 @@ async def read_my_all_permissions(
 )
 async def check_if_user_has_role( 
     role_name: str,
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    return any(role.name.upper() == role_name.upper() for role in current_user.roles)
+    return current_user.has_role(role_name)
 
 @router.get(
     "/has-permission/{permission_name}",
@@ -42,6 +42,6 @@ async def check_if_user_has_role(
 )
 async def check_if_user_has_permission(
     permission_name: str,
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     return current_user.has_permission(permission_name)
\ No newline at end of file
@@ -6,8 +6,8 @@ from typing import List, Optional
 from app.schemas import contact as contact_schema
 from app.services import contact_service
 from app.db.database import get_db
-from app.core.auth import get_current_active_user
-from app.db.models.user import User as UserModel
+from app.core.auth import get_current_principal
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -20,7 +20,7 @@ router = APIRouter()
 def create_contact_for_current_user(
     contact_in: contact_schema.ContactCreate,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     return contact_service.create_user_contact(db=db, contact_in=contact_in, owner_id=current_user.id)
 
@@ -31,7 +31,7 @@ def create_contact_for_current_user(
 )
 def read_contacts_for_current_user(
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_principal),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100)
 ):
@@ -46,7 +46,7 @@ def read_contacts_for_current_user(
 def read_contact(
     contact_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     db_contact = contact_service.get_contact(db, contact_id=contact_id)
     if db_contact is None:
@@ -65,7 +65,7 @@ def update_existing_contact(
     contact_id: int,
     contact_in: contact_schema.ContactUpdate,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     db_contact = contact_service.get_contact(db, contact_id=contact_id)
     if db_contact is None:
@@ -85,7 +85,7 @@ def update_existing_contact(
 def delete_existing_contact(
     contact_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     db_contact = contact_service.get_contact(db, contact_id=contact_id)
     if db_contact is None:
@@ -0,0 +1,27 @@
+# app/api/endpoints/jwks.py
+from fastapi import APIRouter, Response
+
+from app.core.config import settings
+from app.core.keys import get_jwks
+from app.core.permission_claims import PERMISSION_REGISTRY, PERMISSION_REGISTRY_VERSION
+
+router = APIRouter()
+
+@router.get(
+    "/.well-known/jwks.json",
+    summary="JSON Web Key Set",
+    description="Public keys for verifying access tokens locally, selected by the token's `kid` header. Empty when tokens are signed with a shared secret (HS256)."
+)
+def read_jwks(response: Response):
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}"
+    return get_jwks()
+
+
+@router.get(
+    "/.well-known/permission-registry.json",
+    summary="Permission registry",
+    description="Ordered permission names used to decode the `perms` bitset claim of access tokens. Bit i of the claim is permission i; `version` matches the token's `pv` claim."
+)
+def read_permission_registry(response: Response):
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}"
+    return {"version": PERMISSION_REGISTRY_VERSION, "permissions": list(PERMISSION_REGISTRY)}
@@ -24,11 +24,13 @@ def create_new_role(
     db: Session = Depends(get_db)
 ):
     try:
-        return role_permission_service.create_role(db=db, role_in=role_in)
+        db_role = role_permission_service.create_role(db=db, role_in=role_in)
+        role_permission_service.broadcast_permission_index_rebuild_from_thread()
+        return db_role
     except HTTPException as e:
         raise e 
     except Exception as e:
-        logger.error(f"Error creating role: {e}", exc_info=True)
+        logger.error("Error creating role: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not create role")
 
 @router.get(
@@ -75,11 +77,12 @@ def update_role_name_description(
         updated_role = role_permission_service.update_role_details(db=db, role_id=role_id, role_in=role_in)
         if updated_role is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
+        role_permission_service.broadcast_permission_index_rebuild_from_thread()
         return updated_role
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Error updating role details: {e}", exc_info=True)
+        logger.error("Error updating role details: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not update role details")
 
 
@@ -101,10 +104,11 @@ def update_permissions_for_role(
         )
         if updated_role is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found when updating permissions")
+        role_permission_service.broadcast_permission_index_rebuild_from_thread()
         return updated_role
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Error updating role permissions: {e}", exc_info=True)
+        logger.error("Error updating role permissions: %s", e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not update role permissions")
 
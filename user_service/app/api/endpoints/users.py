@@ -1,15 +1,19 @@
 # app/api/endpoints/users.py (Temizlenmiş ve Sıralanmış)
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import logging
 
 from app.schemas import user as user_schema
-from app.services import user_service
+from app.services import user_service, auth_service
 from app.db.database import get_db
-from app.core.auth import get_current_active_user, get_current_active_superuser
+from app.core.auth import get_current_active_user, get_current_active_superuser, get_current_principal
 from app.db.models.user import User as UserModel
+from app.core.principal import Principal
+from app.core.rate_limit import limit_registrations
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post(
@@ -18,6 +22,8 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     summary="Register a new user",
     description="Creates a new user account. This endpoint is typically public.",
+    dependencies=[Depends(limit_registrations)],
+    responses={429: {"description": "Too many registrations from this address"}}
 )
 def create_new_user(
     *, 
@@ -30,12 +36,33 @@ def create_new_user(
     except HTTPException as http_ex:
         raise http_ex
     except Exception as e:
-        print(f"Unexpected error creating user: {e}") 
+        logger.error("Unexpected error creating user: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred during user creation.",
         )
 
+@router.post(
+    "/bulk",
+    response_model=user_schema.UserBulkCreateResponse,
+    summary="Create users in bulk (Admin only)",
+    description=(
+        "Creates up to BULK_USER_CREATE_MAX_USERS users in one request and optionally assigns roles. "
+        "Rows that conflict with existing users (or earlier rows) or reference unknown roles are "
+        "skipped and reported per row; the rest are created."
+    ),
+    dependencies=[Depends(get_current_active_superuser)], # Sadece Admin
+    responses={503: {"description": "Password hashing pool is busy"}}
+)
+def bulk_create_users(
+    *,
+    db: Session = Depends(get_db),
+    bulk_in: user_schema.UserBulkCreateRequest
+):
+    results = user_service.bulk_create_users(db=db, users_in=bulk_in.users)
+    created = sum(result.status == "created" for result in results)
+    return user_schema.UserBulkCreateResponse(created=created, failed=len(results) - created, results=results)
+
 @router.get(
     "/me",
     response_model=user_schema.User,
@@ -49,6 +76,51 @@ def read_me(
     return current_user
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match zayıf karşılaştırma kullanır (RFC 9110 13.1.2)
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+@router.get(
+    "/me/profile",
+    response_model=user_schema.UserProfile,
+    summary="Get current user's profile with addresses and contacts",
+    description=(
+        "Returns the current user, their addresses and contacts in one response. Supports conditional "
+        "GET: send the ETag from a previous response in If-None-Match to get 304 Not Modified when "
+        "nothing has changed."
+    ),
+    responses={304: {"description": "Profile not modified"}, 401: {"description": "Authentication required"}}
+)
+def read_my_profile(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    if_none_match: Optional[str] = Header(None)
+):
+    version = user_service.get_profile_version(db, user_id=current_user.id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    # ETag profil yüklenmeden (profile_version, updated_at)'ten türetilir; 304 tek PK sorgusuna mal olur.
+    # Sürüm profilden önce okunduğu için arada gelen bir yazma en fazla yeni içeriğin eski ETag'le
+    # gönderilmesine yol açar; bir sonraki istek sürüm farkından 200 alır.
+    profile_version, updated_at = version
+    stamp = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+    etag = f'"{current_user.id}-{profile_version}-{stamp}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    db_user = user_service.get_user_profile(db, user_id=current_user.id)
+    if db_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    profile = user_schema.UserProfile(user=db_user, addresses=db_user.addresses, contacts=db_user.contacts)
+    return Response(content=profile.model_dump_json(), media_type="application/json", headers=headers)
+
+
 @router.put(
     "/me/password",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -72,6 +144,7 @@ def update_my_password(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
+    auth_service.publish_tokens_valid_after_from_thread(current_user.username, current_user.tokens_valid_after)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -92,6 +165,7 @@ def deactivate_me(
     deleted_user = user_service.delete_user(db=db, user_id=current_user.id)
     if deleted_user is None:
          raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found") 
+    auth_service.publish_tokens_valid_after_from_thread(deleted_user.username, deleted_user.tokens_valid_after)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -99,15 +173,28 @@ def deactivate_me(
     "/",
     response_model=List[user_schema.User],
     summary="List all users (Admin only)",
-    description="Retrieves a list of all users with pagination. Requires admin privileges.",
+    description=(
+        "Retrieves a list of users ordered by id. Requires admin privileges. "
+        "Use `after_id` with the `X-Next-Cursor` response header for keyset pagination; "
+        "`q` searches username, email, first and last name."
+    ),
     dependencies=[Depends(get_current_active_superuser)] # Sadece Admin
 )
 def read_all_users( 
+    response: Response,
     db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=200, description="Maximum number of records")
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of records to skip (use after_id instead)"),
+    limit: int = Query(100, ge=1, le=200, description="Maximum number of records"),
+    after_id: Optional[int] = Query(None, ge=0, description="Return users with id greater than this (cursor)"),
+    q: Optional[str] = Query(
+        None, min_length=user_service.USER_SEARCH_MIN_LENGTH, max_length=100,
+        description="Case-insensitive substring search"
+    ),
 ):
-    users = user_service.get_users(db, skip=skip, limit=limit)
+    users = user_service.get_users(db, skip=skip, limit=limit, after_id=after_id, q=q)
+    # Sayfa doluysa devamı olabilir; istemci bir sonraki istekte after_id olarak gönderir
+    if len(users) == limit:
+        response.headers["X-Next-Cursor"] = str(users[-1].id)
     return users
 
 
@@ -148,6 +235,8 @@ def update_user(
     updated_user = user_service.update_user(db=db, user_id=user_id, user_in=user_in)
     if updated_user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if user_in.password is not None or user_in.is_active is False:
+        auth_service.publish_tokens_valid_after_from_thread(updated_user.username, updated_user.tokens_valid_after)
     return updated_user
 
 
@@ -167,13 +256,14 @@ def admin_reset_password(
     user_id: int,
     password_in: user_schema.UserPasswordReset,
     db: Session = Depends(get_db),
-    current_admin_user: UserModel = Depends(get_current_active_superuser)
+    current_admin_user: Principal = Depends(get_current_active_superuser)
 ):
     if current_admin_user.id == user_id:
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Admins should reset their own password via the /users/me/password endpoint")
     updated_user = user_service.reset_user_password(db=db, user_id=user_id, password_in=password_in)
     if updated_user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    auth_service.publish_tokens_valid_after_from_thread(updated_user.username, updated_user.tokens_valid_after)
     return updated_user
 
 
@@ -191,13 +281,14 @@ def admin_reset_password(
 def deactivate_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_admin_user: UserModel = Depends(get_current_active_superuser) 
+    current_admin_user: Principal = Depends(get_current_active_superuser) 
 ):
     if current_admin_user.id == user_id:
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Admins cannot deactivate their own account via this endpoint.")
     deleted_user = user_service.delete_user(db=db, user_id=user_id)
     if deleted_user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    auth_service.publish_tokens_valid_after_from_thread(deleted_user.username, deleted_user.tokens_valid_after)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -1,16 +1,19 @@
 # app/core/auth.py (user_service - Temizlenmiş)
 import logging
+import secrets
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from pydantic import ValidationError
 import redis.asyncio as redis
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.redis_client import get_redis_blacklist_client, is_token_blacklisted
+from app.core.principal import Principal, cache_principal, get_cached_principal
+from app.core.security import decode_access_token
+from app.core.redis_client import get_redis_blacklist_client, is_token_revoked
 from app.db.database import get_db
 from app.db.models.user import User as UserModel
 from app.schemas.token import TokenData
@@ -30,12 +33,11 @@ async def verify_token(token: str = Depends(oauth2_scheme)) -> TokenData:
     redis_client: Optional[redis.Redis] = None
 
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_access_token(token)
         username: Optional[str] = payload.get("sub")
         jti: Optional[str] = payload.get("jti") 
         role: Optional[str] = payload.get("role") 
+        issued_at = payload.get("iat")
 
         if username is None or jti is None:
             logger.warning("Token missing required claims (sub or jti).")
@@ -43,56 +45,97 @@ async def verify_token(token: str = Depends(oauth2_scheme)) -> TokenData:
 
         try:
             redis_client = await get_redis_blacklist_client()
-            if await is_token_blacklisted(redis_client, jti):
-                logger.warning(f"Attempt to use blacklisted token JTI: {jti} for user: {username}")
+            if await is_token_revoked(redis_client, jti, username, issued_at):
+                logger.warning("Attempt to use revoked token JTI: %s for user: %s", jti, username)
                 raise credentials_exception
         except ConnectionError as redis_conn_err:
-             logger.error(f"Redis connection error during token verification: {redis_conn_err}")
+             logger.error("Redis connection error during token verification: %s", redis_conn_err)
              raise credentials_exception
 
-        token_data = TokenData(username=username, jti=jti, role=role)
+        token_data = TokenData(username=username, jti=jti, role=role, iat=issued_at)
 
     except JWTError as jwt_err: 
-        logger.warning(f"JWT Error decoding token: {jwt_err}")
+        logger.warning("JWT Error decoding token: %s", jwt_err)
         raise credentials_exception
     except ValidationError as pydantic_err: 
-         logger.error(f"Token payload validation error: {pydantic_err}")
+         logger.error("Token payload validation error: %s", pydantic_err)
          raise credentials_exception
 
     return token_data
 
 
-async def get_current_active_user(
-    token_data: TokenData = Depends(verify_token),
-    db: Session = Depends(get_db)
-) -> UserModel:
-    user = user_service.get_user_by_username(db, username=token_data.username)
+async def verify_introspection_key(x_introspection_key: Optional[str] = Header(None)) -> None:
+    """Servisler arası introspection çağrıları için paylaşılan anahtar kontrolü."""
+    if not settings.INTROSPECTION_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token introspection is not enabled")
+    if x_introspection_key is None or not secrets.compare_digest(x_introspection_key, settings.INTROSPECTION_API_KEY):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid introspection key")
 
-    if user is None:
-        logger.warning(f"User '{token_data.username}' from valid token not found in DB.")
+
+def _ensure_token_still_valid(token_data: TokenData, is_active: bool, tokens_valid_after: Optional[float]) -> None:
+    if tokens_valid_after is not None and (token_data.iat is None or token_data.iat < tokens_valid_after):
+        # Redis'teki kopya kaybolmuş olsa bile veritabanındaki değer esastır.
+        logger.warning("Token of user '%s' was issued before tokens_valid_after.", token_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User associated with token not found",
+            detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if not user.is_active:
-        logger.warning(f"Inactive user '{token_data.username}' attempted access.")
+    if not is_active:
+        logger.warning("Inactive user '%s' attempted access.", token_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, # 400 yerine 401 daha uygun olabilir
             detail="Inactive user",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def _user_not_found(username: Optional[str]) -> HTTPException:
+    logger.warning("User '%s' from valid token not found in DB.", username)
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User associated with token not found",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_active_user(
+    token_data: TokenData = Depends(verify_token),
+    db: Session = Depends(get_db)
+) -> UserModel:
+    """ORM nesnesi gereken (kullanıcıyı değiştiren) endpoint'ler için; her istekte DB'den okur."""
+    user = user_service.get_user_by_username(db, username=token_data.username)
+    if user is None:
+        raise _user_not_found(token_data.username)
+    _ensure_token_still_valid(
+        token_data, user.is_active, user.tokens_valid_after.timestamp() if user.tokens_valid_after else None
+    )
     return user
 
 
+async def get_current_principal(
+    token_data: TokenData = Depends(verify_token),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Yalnızca kimlik/rol/izin bilgisi gereken endpoint'ler için; cache'te varsa DB'ye gidilmez."""
+    principal = get_cached_principal(token_data.username)
+    if principal is None:
+        user = user_service.get_user_with_permissions(db, username=token_data.username)
+        if user is None:
+            raise _user_not_found(token_data.username)
+        principal = Principal.from_user(user)
+        cache_principal(principal)
+    _ensure_token_still_valid(token_data, principal.is_active, principal.tokens_valid_after)
+    return principal
+
+
 async def get_current_active_superuser(
-    current_user: UserModel = Depends(get_current_active_user)
-) -> UserModel:
-    is_admin = any(role.name.upper() == "ADMIN" for role in current_user.roles)
-    if not is_admin:
-        logger.warning(f"User '{current_user.username}' attempted admin action without privileges.")
+    current_user: Principal = Depends(get_current_principal)
+) -> Principal:
+    if not current_user.is_admin:
+        logger.warning("User '%s' attempted admin action without privileges.", current_user.username)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Administrator privileges required"
         )
-    return current_user
\ No newline at end of file
+    return current_user
@@ -12,7 +12,46 @@ class Settings(BaseSettings):
 
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Access token'lar kısa ömürlüdür; istemciler /auth/refresh ile yeniler
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 5
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    # POST /auth/introspect için servisler arası paylaşılan anahtar (X-Introspection-Key);
+    # tanımlı değilse endpoint kapalıdır
+    INTROSPECTION_API_KEY: Optional[str] = None
+    INTROSPECTION_MAX_TOKENS: int = 100
+    # ALGORITHM asimetrik (RS256/ES256 ...) ise kullanılır; bkz. app/core/keys.py
+    JWT_PRIVATE_KEY_FILE: Optional[str] = None
+    JWT_PUBLIC_KEY_FILES: str = "" # Virgülle ayrılmış; rotasyonda yayınlanmaya devam eden public anahtarlar
+    JWKS_CACHE_MAX_AGE_SECONDS: int = 300
+    # Kullanıcının izinleri token'a `pv` + `perms` claim'leri olarak gömülür; bkz. app/core/permission_claims.py
+    JWT_EMBED_PERMISSIONS: bool = True
+
+    # Şifre hash'leme (bkz. app/core/hashing.py). Worker sayısı 0 ise kullanılabilir çekirdek sayısı,
+    # bekleyen iş sınırı 0 ise worker sayısının 4 katı.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 0
+    # POST /users/bulk isteğindeki en fazla kullanıcı sayısı
+    BULK_USER_CREATE_MAX_USERS: int = 1000
+
+    # Login ve kayıt için token bucket rate limit (bkz. app/core/rate_limit.py). BURST bucket
+    # kapasitesi, PER_MINUTE dakikada yenilenen token sayısıdır.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False # Yalnızca güvenilir bir reverse proxy arkasında açın
+    RATE_LIMIT_LOGIN_IP_BURST: int = 20
+    RATE_LIMIT_LOGIN_IP_PER_MINUTE: float = 10.0
+    RATE_LIMIT_LOGIN_USERNAME_BURST: int = 5
+    RATE_LIMIT_LOGIN_USERNAME_PER_MINUTE: float = 5.0
+    RATE_LIMIT_REGISTER_IP_BURST: int = 5
+    RATE_LIMIT_REGISTER_IP_PER_MINUTE: float = 2.0
+    RATE_LIMIT_LOCAL_MAX_BUCKETS: int = 100000 # Redis'e ulaşılamadığında kullanılan process içi bucket'lar
+
+    # Logging (bkz. app/core/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json" # json | text
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATE: float = 0.1 # Örneklenen yüksek hacimli olayların geçirilme oranı
+    LOG_SAMPLED_LOGGERS: str = "uvicorn.access"
 
     FIRST_SUPERUSER_EMAIL: str
     FIRST_SUPERUSER_PASSWORD: str
@@ -21,6 +60,26 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_BLACKLIST_DB: int = 1 
+    # Blacklist client'ı: bloklayan havuz + circuit breaker (bkz. app/core/redis_client.py)
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 1.0
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 3
+    REDIS_BREAKER_RESET_SECONDS: float = 10.0
+    # Logout'ta iptal edilen JTI'lerin ve kullanıcı bazlı iptallerin yayınlandığı kanal (product_service dinler)
+    REDIS_REVOCATION_CHANNEL: str = "token_revocations"
+    # Rol-izin indeksi yeniden kurulduğunda diğer worker/replikalara yapılan duyuru
+    REDIS_PERMISSION_INDEX_CHANNEL: str = "permission_index"
+    # Yayın kaçırılsa bile rol-izin indeksi en geç bu süre sonra veritabanından yeniden kurulur
+    PERMISSION_INDEX_MAX_AGE_SECONDS: float = 300.0
+    # Kullanıcı başına tokens_valid_after değerlerinin process içi cache'i; diğer replikalardaki
+    # güncellemeler en geç bu süre sonra görülür (aynı process'teki güncellemeler hemen)
+    USER_EPOCH_CACHE_TTL_SECONDS: float = 5.0
+    USER_EPOCH_CACHE_MAX_ENTRIES: int = 100000
+    # Kimliği doğrulanmış kullanıcı özetleri (id, roller, izinler) için process içi cache
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 100000
 
     class Config:
         env_file = ".env"
@@ -35,7 +94,7 @@ def get_settings():
         logger.debug("Application settings loaded successfully.")
         return settings
     except Exception as e:
-        logger.critical(f"FATAL ERROR: Could not load settings from .env file or environment variables: {e}", exc_info=True)
+        logger.critical("FATAL ERROR: Could not load settings from .env file or environment variables: %s", e, exc_info=True)
         raise e
 
 settings = get_settings()
\ No newline at end of file
@@ -0,0 +1,176 @@
+# app/core/hashing.py
+"""
+Şifre hash'leme ve doğrulama için ayrı process havuzu.
+
+bcrypt her çağrıda onlarca milisaniye CPU harcar; anyio threadpool'unda çalıştığında login
+yoğunluğunda diğer sync endpoint'lerin thread'lerini tüketir. Burada işler, çekirdek sayısı
+kadar worker'lı bir `ProcessPoolExecutor`'a gönderilir. Aynı anda bekleyen iş sayısı
+`PASSWORD_HASH_MAX_PENDING` ile sınırlıdır; sınır doluysa çağrı beklemeden 503 ile reddedilir,
+böylece bekleyen threadpool thread'i sayısı da sınırlı kalır.
+
+Bir worker beklenmedik şekilde ölürse (ör. OOM killer) havuz `BrokenProcessPool` durumuna düşer ve
+bir daha iş kabul etmez. Bu durumda havuz atılıp yeniden kurulur ve iş bir kez daha denenir; yine
+başarısız olursa çağrı 503 ile reddedilir.
+
+Doğrulama `verify_and_update` ile yapılır: hash `PASSWORD_BCRYPT_ROUNDS`'tan farklı bir maliyetle
+üretilmişse yeni hash döner ve çağıran onu kaydeder (login'de şeffaf rehash).
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.security import pwd_context
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _worker_count() -> int:
+    if settings.PASSWORD_HASH_WORKERS > 0:
+        return settings.PASSWORD_HASH_WORKERS
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _max_pending() -> int:
+    if settings.PASSWORD_HASH_MAX_PENDING > 0:
+        return settings.PASSWORD_HASH_MAX_PENDING
+    return _worker_count() * 4
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending_slots = threading.BoundedSemaphore(_max_pending())
+_rejected_calls = 0
+
+
+# --- Worker process'lerde çalışan fonksiyonlar ---
+
+def _hash_in_worker(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update_in_worker(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def _noop() -> None:
+    return None
+
+
+def get_hashing_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = _worker_count()
+                # fork, çok thread'li bir process'te kilitleri kopyalayabilir; spawn güvenli
+                _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                logger.info("Password hashing pool started with %s worker(s), max %s pending.", workers, _max_pending())
+    return _executor
+
+
+def start_hashing_executor() -> None:
+    """Lifespan'de çağrılır; worker'ları önceden başlatır ki ilk login'ler spawn süresini beklemesin."""
+    executor = get_hashing_executor()
+    for future in [executor.submit(_noop) for _ in range(_worker_count())]:
+        future.result()
+
+
+def shutdown_hashing_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+@contextmanager
+def _pending_slot():
+    global _rejected_calls
+    if not _pending_slots.acquire(blocking=False):
+        _rejected_calls += 1
+        logger.warning("Password hashing pool saturated; rejecting request.")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        _pending_slots.release()
+
+
+def _discard_broken_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        # Başka bir thread havuzu zaten yenilemiş olabilir
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _call_with_executor(call: Callable[[ProcessPoolExecutor], T]) -> T:
+    """`call`'ı havuzla çalıştırır; havuz bozulmuşsa yenisini kurup bir kez daha dener."""
+    for attempt in range(2):
+        executor = get_hashing_executor()
+        try:
+            return call(executor)
+        except BrokenProcessPool:
+            logger.error("Password hashing pool is broken (attempt %s); recreating it.", attempt + 1)
+            _discard_broken_executor(executor)
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry.",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _run(fn, *args):
+    with _pending_slot():
+        return _call_with_executor(lambda executor: executor.submit(fn, *args).result())
+
+
+def hash_password(password: str) -> str:
+    """`get_password_hash`'in havuzda çalışan karşılığı. Sync kodda (threadpool) çağrılır."""
+    return _run(_hash_in_worker, password)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Toplu hash'leme (POST /users/bulk). Tek bir bekleyen iş hakkı kullanır ve işleri worker sayısı
+    kadarlık parçalar halinde gönderir; böylece aradaki login'ler binlerce hash'in arkasında
+    kuyrukta beklemez.
+    """
+    with _pending_slot():
+        chunk_size = _worker_count()
+        hashed: List[str] = []
+        for start in range(0, len(passwords), chunk_size):
+            chunk = passwords[start:start + chunk_size]
+            hashed.extend(_call_with_executor(lambda executor: list(executor.map(_hash_in_worker, chunk))))
+        return hashed
+
+
+def verify_and_update_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(doğru mu, maliyet değiştiyse yeni hash) döner."""
+    return _run(_verify_and_update_in_worker, password, hashed_password)
+
+
+def get_hashing_stats() -> dict:
+    return {
+        "workers": _worker_count(),
+        "max_pending": _max_pending(),
+        "rejected_calls": _rejected_calls,
+    }
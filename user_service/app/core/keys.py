@@ -0,0 +1,110 @@
+# app/core/keys.py
+"""
+Asimetrik JWT imzalama anahtarları ve yayınlanan JWKS.
+
+`ALGORITHM` RS256/ES256 gibi asimetrik bir algoritma olduğunda token'lar
+`JWT_PRIVATE_KEY_FILE` içindeki anahtarla imzalanır ve header'a `kid` (RFC 7638 thumbprint)
+eklenir. `/.well-known/jwks.json` imzalama anahtarının public kısmını ve
+`JWT_PUBLIC_KEY_FILES` içindeki ek public anahtarları yayınlar. Rotasyon:
+yeni anahtarın public kısmı önce `JWT_PUBLIC_KEY_FILES`'a eklenip yayınlanır, tüketiciler
+key set'lerini yeniledikten sonra imzalama anahtarı değiştirilir; eski anahtar, onunla
+imzalanmış token'ların süresi dolana kadar `JWT_PUBLIC_KEY_FILES`'ta tutulur.
+"""
+import base64
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+# RFC 7638: thumbprint'e giren zorunlu alanlar
+_THUMBPRINT_MEMBERS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm in ASYMMETRIC_ALGORITHMS
+
+
+def _thumbprint(public_jwk: dict) -> str:
+    members = {name: public_jwk[name] for name in _THUMBPRINT_MEMBERS[public_jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(hashlib.sha256(canonical).digest()).rstrip(b"=").decode("ascii")
+
+
+def _public_jwk(pem: str, algorithm: str) -> dict:
+    public = jwk.construct(pem, algorithm).public_key().to_dict()
+    public["kid"] = _thumbprint(public)
+    public["use"] = "sig"
+    return public
+
+
+def _generate_private_key_pem(algorithm: str) -> str:
+    if algorithm.startswith("ES"):
+        curve = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}[algorithm]
+        private_key = ec.generate_private_key(curve)
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode("ascii")
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@dataclass
+class KeyRing:
+    algorithm: str
+    signing_kid: str
+    signing_pem: str
+    public_keys: Dict[str, dict] = field(default_factory=dict)
+
+    def jwks(self) -> Dict[str, List[dict]]:
+        return {"keys": list(self.public_keys.values())}
+
+
+@lru_cache()
+def get_key_ring() -> Optional[KeyRing]:
+    """Asimetrik algoritma yapılandırılmamışsa (HS256) None."""
+    algorithm = settings.ALGORITHM
+    if not is_asymmetric(algorithm):
+        return None
+
+    if settings.JWT_PRIVATE_KEY_FILE:
+        signing_pem = _read(settings.JWT_PRIVATE_KEY_FILE)
+    else:
+        # Yalnızca geliştirme için: her process kendi anahtarını üretir, restart'ta token'lar geçersizleşir.
+        logger.warning("JWT_PRIVATE_KEY_FILE is not set; generating an ephemeral %s signing key.", algorithm)
+        signing_pem = _generate_private_key_pem(algorithm)
+
+    signing_public = _public_jwk(signing_pem, algorithm)
+    public_keys = {signing_public["kid"]: signing_public}
+    for path in filter(None, (p.strip() for p in settings.JWT_PUBLIC_KEY_FILES.split(","))):
+        extra = _public_jwk(_read(path), algorithm)
+        public_keys.setdefault(extra["kid"], extra)
+
+    logger.info("Loaded JWT key ring: signing kid %s, %s published key(s).", signing_public["kid"], len(public_keys))
+    return KeyRing(
+        algorithm=algorithm,
+        signing_kid=signing_public["kid"],
+        signing_pem=signing_pem,
+        public_keys=public_keys,
+    )
+
+
+def get_jwks() -> Dict[str, List[dict]]:
+    key_ring = get_key_ring()
+    return key_ring.jwks() if key_ring is not None else {"keys": []}
@@ -0,0 +1,150 @@
+# app/core/logging_config.py
+# Birebir kopyası diğer serviste de bulunur (kaynak: product_service); bkz. product_service/tests/test_shared_modules.py
+"""
+Servis geneli logging kurulumu.
+
+- Seviye `LOG_LEVEL` ayarından gelir; seviyesi kapalı çağrılar kayıt bile oluşturmaz.
+- Uygulama thread'leri kayıtları yalnızca sınırlı bir kuyruğa atar (QueueHandler); mesajın
+  formatlanması ve stdout'a yazılması QueueListener thread'inde yapılır. Kuyruk doluysa
+  kayıt bekletilmeden düşürülür ve sayılır.
+- Yüksek hacimli olaylar (`extra={"sampled": True}` ile işaretlenenler ve `LOG_SAMPLED_LOGGERS`
+  içindeki logger'lar, ör. uvicorn.access) `LOG_SAMPLE_RATE` oranında örneklenir; WARNING ve
+  üzeri asla örneklenmez.
+
+Log çağrılarında f-string yerine %-formatı kullanın: `logger.info("Order %s created", order_id)`.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable, Optional
+
+# LogRecord'un standart alanları; bunların dışındakiler `extra` ile gelmiştir ve JSON'a eklenir.
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sampled"}
+
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Yüksek hacimli INFO/DEBUG kayıtlarının yalnızca `rate` oranını geçirir."""
+
+    def __init__(self, rate: float, logger_names: Iterable[str] = ()):
+        super().__init__()
+        self.rate = rate
+        self.logger_names = frozenset(logger_names)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        if getattr(record, "sampled", False) or record.name in self.logger_names:
+            return random.random() < self.rate
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Kaydı formatlamadan kuyruğa atar (formatlama listener thread'inde yapılır) ve kuyruk
+    doluysa beklemek yerine kaydı düşürür.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Kuyruk aynı process içinde; kaydın pickle edilebilir hale getirilmesine gerek yok.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(
+    level: str = "INFO",
+    fmt: str = "json",
+    queue_size: int = 10000,
+    sample_rate: float = 1.0,
+    sampled_loggers: Iterable[str] = (),
+) -> None:
+    """Root logger'ı kuyruk tabanlı handler ile kurar. Tekrar çağrılırsa önceki kurulumu değiştirir."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if fmt == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+        queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        queue_handler.addFilter(SamplingFilter(sample_rate, sampled_loggers))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper())
+
+        # uvicorn kendi stdout handler'larını kurar; kayıtlarını root'taki kuyruğa yönlendir.
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers = []
+            uvicorn_logger.propagate = True
+            uvicorn_logger.setLevel(level.upper())
+
+        _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=False)
+        _listener.start()
+
+
+def setup_logging_from_settings() -> None:
+    from app.core.config import settings
+
+    setup_logging(
+        level=settings.LOG_LEVEL,
+        fmt=settings.LOG_FORMAT,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        sample_rate=settings.LOG_SAMPLE_RATE,
+        sampled_loggers=[name.strip() for name in settings.LOG_SAMPLED_LOGGERS.split(",") if name.strip()],
+    )
+
+
+def shutdown_logging() -> None:
+    """Kuyrukta kalan kayıtları yazıp listener thread'ini durdurur."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
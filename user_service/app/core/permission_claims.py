@@ -0,0 +1,66 @@
+# app/core/permission_claims.py
+"""
+Access token'lardaki kompakt izin claim'i.
+
+İzin seti, `initial_data.PERMISSIONS` sırasına göre bir bitset olarak kodlanır (izin i -> bit i)
+ve base64url olarak `perms` claim'ine yazılır. `pv` claim'i registry'nin versiyonudur: izin
+isimlerinin sıralı listesinin hash'i. Registry'ye izin eklenmesi ya da sıranın değişmesi
+versiyonu değiştirir; eski versiyonla basılmış token'ların claim'i çözülmez ve istemcinin
+yeni token alması gerekir. Bit pozisyonlarının sabit kalması için yeni izinler listenin
+sonuna eklenmelidir.
+
+product_service registry'yi `/.well-known/permission-registry.json` adresinden çeker; koddaki
+bootstrap kopyasının bu listeyle aynı kaldığı product_service/tests/test_shared_modules.py'de kontrol edilir.
+"""
+import base64
+import hashlib
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from app.initial_data import PERMISSIONS
+
+PERMISSIONS_VERSION_CLAIM = "pv"
+PERMISSIONS_CLAIM = "perms"
+
+PERMISSION_REGISTRY: Tuple[str, ...] = tuple(PERMISSIONS)
+PERMISSION_REGISTRY_VERSION = hashlib.sha256("\n".join(PERMISSION_REGISTRY).encode("utf-8")).hexdigest()[:8]
+
+_PERMISSION_BITS = {name: 1 << index for index, name in enumerate(PERMISSION_REGISTRY)}
+
+
+def encode_permissions(permission_names: Iterable[str]) -> str:
+    """Registry'de olmayan izinler (ör. DB'de elle eklenmiş) claim'e girmez."""
+    bits = 0
+    for name in permission_names:
+        bits |= _PERMISSION_BITS.get(name, 0)
+    raw = bits.to_bytes((len(PERMISSION_REGISTRY) + 7) // 8, "little")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def permission_claims(permission_names: Iterable[str]) -> dict:
+    return {
+        PERMISSIONS_VERSION_CLAIM: PERMISSION_REGISTRY_VERSION,
+        PERMISSIONS_CLAIM: encode_permissions(permission_names),
+    }
+
+
+def decode_permission_bits(payload: dict) -> Optional[int]:
+    """Claim yoksa, versiyon uyuşmuyorsa ya da bozuksa None; çağıran DB'ye düşmeli ya da yeni token istemeli."""
+    encoded = payload.get(PERMISSIONS_CLAIM)
+    if payload.get(PERMISSIONS_VERSION_CLAIM) != PERMISSION_REGISTRY_VERSION or not isinstance(encoded, str):
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    except ValueError:
+        return None
+    return int.from_bytes(raw, "little")
+
+
+def has_permission_bit(bits: int, permission_name: str) -> bool:
+    return bool(bits & _PERMISSION_BITS.get(permission_name, 0))
+
+
+def decode_permissions(payload: dict) -> Optional[FrozenSet[str]]:
+    bits = decode_permission_bits(payload)
+    if bits is None:
+        return None
+    return frozenset(name for name, bit in _PERMISSION_BITS.items() if bits & bit)
@@ -0,0 +1,181 @@
+# app/core/permission_index.py
+"""
+Rol -> izin bitmask'i indeksi.
+
+Her izin, id'sine karşılık gelen bit ile temsil edilir (izin id=i -> bit i); her rol için
+izinlerinin OR'u tutulur. Kullanıcının izinleri rollerinin maskelerinin OR'udur, böylece
+`User.permissions` `Role.permissions` ilişkisini lazy load etmez. Aynı rol kombinasyonu için
+izin kümesi bir kez hesaplanır ve indeks yeniden kurulana kadar saklanır (ör. 200 kullanıcılık
+bir listede genellikle birkaç hesaplama).
+
+İndeks ilk kullanımda iki sorguyla (permissions, role_permissions) kurulur ve rol-izin
+değişikliklerinde yeniden kurulur. Yeniden kurulum `REDIS_PERMISSION_INDEX_CHANNEL` üzerinden
+yayınlanır; diğer worker ve replikalar `run_permission_index_sync` ile indekslerini yeniden
+kurar ve principal cache'lerini temizler. Yayın kaçırılırsa (Redis kesintisi, abonelik kopukken
+yapılan değişiklik) indeks `PERMISSION_INDEX_MAX_AGE_SECONDS` dolunca bir sonraki kullanımda yeniden
+kurulur; bir replikanın eski izinleri görebileceği süre en fazla bu süre + principal cache TTL'idir.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import redis.asyncio as redis
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Kendi yayınladığımız mesajları ayırt etmek için; her process (worker) için ayrı
+PROCESS_ID = uuid.uuid4().hex
+
+# İndeks yaşının ölçüldüğü saat; testler bu modül özniteliğini değiştirir
+_now = time.monotonic
+
+
+class PermissionIndex:
+    def __init__(self):
+        # (role_id -> mask, bit -> permission name, permission name -> bit,
+        #  rol id kümesi -> izin adları); bütün olarak değiştirilir
+        self._snapshot: Optional[Tuple[
+            Dict[int, int], Dict[int, str], Dict[str, int], Dict[FrozenSet[int], FrozenSet[str]]
+        ]] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    @property
+    def loaded(self) -> bool:
+        """Süresi dolmuş snapshot yüklü sayılmaz; `ensure_loaded` onu yeniden kurar."""
+        if self._snapshot is None:
+            return False
+        return _now() - self._built_at < settings.PERMISSION_INDEX_MAX_AGE_SECONDS
+
+    def rebuild(self, db: Session) -> None:
+        # Modeller bu modülü import ettiği için burada import edilir
+        from app.db.models.permission import Permission
+        from app.db.models.user import role_permissions_table
+
+        permission_names = {perm_id: name for perm_id, name in db.query(Permission.id, Permission.name)}
+        role_masks: Dict[int, int] = {}
+        rows = db.execute(select(role_permissions_table.c.role_id, role_permissions_table.c.permission_id))
+        for role_id, permission_id in rows:
+            role_masks[role_id] = role_masks.get(role_id, 0) | (1 << permission_id)
+        permission_bits = {name: perm_id for perm_id, name in permission_names.items()}
+
+        with self._lock:
+            self._snapshot = (role_masks, permission_names, permission_bits, {})
+            self._built_at = _now()
+            self.generation += 1
+        logger.debug("Permission index rebuilt: %s role(s), %s permission(s).", len(role_masks), len(permission_names))
+
+    def invalidate(self) -> None:
+        """Bir sonraki kullanımda yeniden kurulur."""
+        self._snapshot = None
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self.loaded:
+            self.rebuild(db)
+
+    def permission_names_for_roles(self, role_ids: Iterable[int]) -> Optional[FrozenSet[str]]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        role_masks, names_by_bit, _, names_by_roles = snapshot
+        role_key = frozenset(role_ids)
+        names = names_by_roles.get(role_key)
+        if names is not None:
+            return names
+        mask = 0
+        for role_id in role_key:
+            mask |= role_masks.get(role_id, 0)
+        found = set()
+        while mask:
+            lowest = mask & -mask
+            name = names_by_bit.get(lowest.bit_length() - 1)
+            if name is not None:
+                found.add(name)
+            mask ^= lowest
+        # Eşzamanlı iki hesaplama aynı sonucu yazar; kilide gerek yok
+        names = names_by_roles[role_key] = frozenset(found)
+        return names
+
+    def roles_have_permission(self, role_ids: Iterable[int], permission_name: str) -> Optional[bool]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        role_masks, _, permission_bits, _ = snapshot
+        bit = permission_bits.get(permission_name)
+        if bit is None:
+            return False
+        return any(role_masks.get(role_id, 0) >> bit & 1 for role_id in role_ids)
+
+
+permission_index = PermissionIndex()
+
+
+def _rebuild_from_new_session() -> None:
+    from app.core.principal import clear_principal_cache
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        permission_index.rebuild(db)
+    finally:
+        db.close()
+    clear_principal_cache()
+
+
+def handle_permission_index_message(data: str) -> bool:
+    """Başka bir process'in yayınıysa True döner (yeniden kurulum gerekir)."""
+    try:
+        origin = json.loads(data).get("origin")
+    except (TypeError, ValueError, AttributeError):
+        logger.warning("Ignoring malformed permission index message: %r", data)
+        return False
+    return origin != PROCESS_ID
+
+
+async def _sync_once() -> None:
+    # Paylaşılan havuzun kısa socket_timeout'u bloklayan pub/sub okumalarına uygun değil
+    client = redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_BLACKLIST_DB,
+        decode_responses=True,
+    )
+    try:
+        async with client.pubsub() as pubsub:
+            await pubsub.subscribe(settings.REDIS_PERMISSION_INDEX_CHANNEL)
+            # Bağlantı yokken kaçırılmış olabilecek değişiklikler için
+            await asyncio.to_thread(_rebuild_from_new_session)
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None and message["type"] == "message":
+                    if handle_permission_index_message(message["data"]):
+                        await asyncio.to_thread(_rebuild_from_new_session)
+                        logger.info("Permission index rebuilt after a change on another worker.")
+    finally:
+        await client.aclose()
+
+
+async def run_permission_index_sync() -> None:
+    """Lifespan'de arka plan task'ı olarak çalışır; bağlantı hatalarında artan bekleme ile yeniden dener."""
+    delay = 1.0
+    while True:
+        started = time.monotonic()
+        try:
+            await _sync_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if time.monotonic() - started > 60.0:
+                delay = 1.0
+            logger.warning("Permission index sync interrupted, retrying in %.0fs: %s", delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
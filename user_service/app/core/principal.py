@@ -0,0 +1,73 @@
+# app/core/principal.py
+"""
+Kimliği doğrulanmış kullanıcının değişmez (immutable) özeti ve process içi cache'i.
+
+Yetki kontrolü yapan endpoint'ler ORM nesnesi yerine `Principal` kullanır; cache'te
+bulunduğunda istek veritabanına hiç gitmez. Kayıtlar `PRINCIPAL_CACHE_TTL_SECONDS` sonra
+düşer; kullanıcı, rol ve rol-izin değişikliklerinde ilgili servisler cache'i hemen temizler
+(diğer replikalar değişikliği en geç TTL sonunda görür).
+"""
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    is_active: bool
+    role_names: FrozenSet[str]
+    permission_names: FrozenSet[str]
+    tokens_valid_after: Optional[float] = None
+
+    @property
+    def is_admin(self) -> bool:
+        return self.has_role("ADMIN")
+
+    @property
+    def permissions(self) -> FrozenSet[str]:
+        return self.permission_names
+
+    def has_role(self, role_name: str) -> bool:
+        return any(name.upper() == role_name.upper() for name in self.role_names)
+
+    def has_permission(self, permission_name: str) -> bool:
+        return permission_name in self.permission_names
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_active=bool(user.is_active),
+            role_names=frozenset(role.name for role in user.roles),
+            permission_names=frozenset(user.permissions),
+            tokens_valid_after=user.tokens_valid_after.timestamp() if user.tokens_valid_after else None,
+        )
+
+
+# username -> Principal
+_principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES, ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def get_cached_principal(username: str) -> Optional[Principal]:
+    return _principal_cache.get(username)
+
+
+def cache_principal(principal: Principal) -> None:
+    _principal_cache.set(principal.username, principal)
+
+
+def invalidate_principal(*usernames: str) -> None:
+    for username in usernames:
+        _principal_cache.discard(username)
+
+
+def clear_principal_cache() -> None:
+    """Rol ya da rol-izin değişikliklerinde: etkilenen kullanıcı sayısı belirsiz olduğu için tümü."""
+    _principal_cache.clear()
@@ -0,0 +1,116 @@
+# app/core/rate_limit.py
+"""
+Kimlik doğrulamasız ve bcrypt çalıştıran endpoint'ler (login, kayıt) için token bucket rate limit.
+
+Her istek bir ya da birden fazla bucket'tan (IP, kullanıcı adı) birer token harcar. Kontrol tek
+bir Lua script'iyle Redis'te atomik yapılır: tüm bucket'larda token varsa hepsinden düşülür,
+yoksa hiçbirinden düşülmez ve en uzun bekleme süresi Retry-After olarak döner. Redis'e
+ulaşılamıyorsa (ya da circuit breaker açıksa) aynı algoritma process içi bucket'larla çalışır;
+bu durumda limitler replika başınadır.
+
+Dependency'ler route seviyesinde tanımlanır, böylece veritabanı sorgusundan ve şifre
+hash'lemesinden önce çalışır.
+"""
+import logging
+import math
+import threading
+import time
+from typing import List, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis_client import get_redis_client_or_none, run_token_bucket_script
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit:"
+
+# (bucket key, kapasite, saniyede eklenen token)
+Bucket = Tuple[str, int, float]
+
+# bucket key -> [tokens, son güncelleme (monotonic)]
+_local_buckets = TTLCache(maxsize=settings.RATE_LIMIT_LOCAL_MAX_BUCKETS)
+_local_lock = threading.Lock()
+# Yerel bucket'ların saati; testler bu modül özniteliğini değiştirir
+_now = time.monotonic
+
+
+def _consume_local(buckets: List[Bucket]) -> Tuple[bool, float]:
+    now = _now()
+    with _local_lock:
+        states = []
+        retry_after = 0.0
+        for key, capacity, rate in buckets:
+            tokens, updated = _local_buckets.get(key) or (float(capacity), now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            states.append((key, capacity, rate, tokens))
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / rate)
+        allowed = retry_after == 0.0
+        for key, capacity, rate, tokens in states:
+            if allowed:
+                tokens -= 1
+            _local_buckets.set(key, (tokens, now), ttl_seconds=math.ceil(capacity / rate) + 1)
+    return allowed, retry_after
+
+
+def reset_local_buckets() -> None:
+    _local_buckets.clear()
+
+
+async def consume(buckets: List[Bucket]) -> Tuple[bool, float]:
+    """(izin verildi mi, Retry-After saniye) döner."""
+    redis_client = get_redis_client_or_none()
+    if redis_client is not None:
+        result = await run_token_bucket_script(redis_client, buckets)
+        if result is not None:
+            return result
+    return _consume_local(buckets)
+
+
+def _client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _enforce(buckets: List[Bucket], scope: str, subject: str) -> None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    allowed, retry_after = await consume(buckets)
+    if not allowed:
+        logger.warning("Rate limit exceeded for %s (%s).", scope, subject)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+async def limit_login_attempts(request: Request, form_data: OAuth2PasswordRequestForm = Depends()) -> None:
+    """Login: IP başına ve kullanıcı adı başına bucket (form, endpoint'le aynı istek içinde paylaşılır)."""
+    ip = _client_ip(request)
+    username = form_data.username.strip().lower()
+    await _enforce(
+        [
+            (f"{RATE_LIMIT_KEY_PREFIX}login:ip:{ip}", settings.RATE_LIMIT_LOGIN_IP_BURST,
+             settings.RATE_LIMIT_LOGIN_IP_PER_MINUTE / 60),
+            (f"{RATE_LIMIT_KEY_PREFIX}login:user:{username}", settings.RATE_LIMIT_LOGIN_USERNAME_BURST,
+             settings.RATE_LIMIT_LOGIN_USERNAME_PER_MINUTE / 60),
+        ],
+        "login", f"ip={ip}, username={username}",
+    )
+
+
+async def limit_registrations(request: Request) -> None:
+    ip = _client_ip(request)
+    await _enforce(
+        [(f"{RATE_LIMIT_KEY_PREFIX}register:ip:{ip}", settings.RATE_LIMIT_REGISTER_IP_BURST,
+          settings.RATE_LIMIT_REGISTER_IP_PER_MINUTE / 60)],
+        "registration", f"ip={ip}",
+    )
@@ -1,102 +1,385 @@
 # app/core/redis_client.py (user_service - Temizlenmiş)
+"""
+Token blacklist için uzun ömürlü Redis client'ı.
+
+- Client ve bağlantı havuzu process başına bir kez oluşturulur; istek başına PING yapılmaz.
+  Bağlantı sağlığı lifespan'de çalışan `redis_health_check_loop` tarafından kontrol edilir.
+- Havuz `BlockingConnectionPool`: `REDIS_MAX_CONNECTIONS` doluysa istek hata almak yerine
+  `REDIS_POOL_TIMEOUT_SECONDS` kadar bekler. Kullanım sayıları `get_redis_pool_stats` ile okunur.
+- Circuit breaker: art arda `REDIS_BREAKER_FAILURE_THRESHOLD` hata sonrası devre açılır ve
+  `REDIS_BREAKER_RESET_SECONDS` boyunca Redis'e gidilmeden 503 dönülür. Süre dolunca tek bir
+  deneme isteğine izin verilir (half-open); health check başarılı olursa devre hemen kapanır.
+"""
+import asyncio
+import json
 import logging
-from typing import Optional
+import time
+from typing import List, Optional, Tuple
 
 import redis.asyncio as redis
-from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 from fastapi import HTTPException, status
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-_blacklist_redis_pool: Optional[redis.ConnectionPool] = None
+# Circuit breaker'ın saati; testler bu modül özniteliğini değiştirir
+_now = time.monotonic
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and _now() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Redis circuit breaker closed.")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Deneme isteği Redis'in durumu hakkında bilgi vermeden bittiğinde (ör. havuz dolu)."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.error("Redis circuit breaker opened after %s consecutive failure(s).", self.consecutive_failures)
+            self.state = self.OPEN
+            self.opened_at = _now()
 
-def get_redis_pool() -> redis.ConnectionPool:
+
+redis_breaker = CircuitBreaker(
+    failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=settings.REDIS_BREAKER_RESET_SECONDS,
+)
+
+_blacklist_redis_pool: Optional[redis.BlockingConnectionPool] = None
+_blacklist_redis_client: Optional[redis.Redis] = None
+_pool_wait_timeouts = 0
+
+def get_redis_pool() -> redis.BlockingConnectionPool:
     """Initializes and returns the Redis connection pool."""
     global _blacklist_redis_pool
     if _blacklist_redis_pool is None:
-        logger.info(f"Initializing Redis connection pool: {settings.REDIS_HOST}:{settings.REDIS_PORT} DB: {settings.REDIS_BLACKLIST_DB}")
+        logger.info("Initializing Redis connection pool: %s:%s DB: %s", settings.REDIS_HOST, settings.REDIS_PORT, settings.REDIS_BLACKLIST_DB)
         try:
-             _blacklist_redis_pool = redis.ConnectionPool(
+             _blacklist_redis_pool = redis.BlockingConnectionPool(
                 host=settings.REDIS_HOST,
                 port=settings.REDIS_PORT,
                 db=settings.REDIS_BLACKLIST_DB,
-                decode_responses=True, 
-                max_connections=10 
+                decode_responses=True,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
             )
         except Exception as e:
-            logger.critical(f"Failed to initialize Redis connection pool: {e}", exc_info=True)
-            raise 
+            logger.critical("Failed to initialize Redis connection pool: %s", e, exc_info=True)
+            raise
     return _blacklist_redis_pool
 
+def _get_client() -> redis.Redis:
+    global _blacklist_redis_client
+    if _blacklist_redis_client is None:
+        _blacklist_redis_client = redis.Redis(connection_pool=get_redis_pool())
+    return _blacklist_redis_client
+
+def _record_redis_error(error: Exception) -> None:
+    global _pool_wait_timeouts
+    if isinstance(error, RedisConnectionError) and "No connection available" in str(error):
+        # Havuz dolu: Redis sağlıklı olabilir, devreyi açma sebebi sayılmaz.
+        _pool_wait_timeouts += 1
+        redis_breaker.release_trial()
+        return
+    redis_breaker.record_failure()
+
 async def get_redis_blacklist_client() -> redis.Redis:
-    """FastAPI dependency to get an async Redis client from the pool."""
-    pool = get_redis_pool()
-    try:
-        client = redis.Redis(connection_pool=pool)
-        await client.ping()
-        logger.debug("Redis connection successful (ping).")
-        return client
-    except RedisConnectionError as conn_err:
-        logger.error(f"Could not connect to Redis: {conn_err}")
+    """FastAPI dependency: paylaşılan client'ı döner; devre açıkken Redis'e gitmeden 503 verir."""
+    if not redis_breaker.allow():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Could not connect to backend services (Redis)."
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error getting Redis client: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An internal error occurred with backend services."
+            detail="Could not connect to backend services (Redis).",
+            headers={"Retry-After": str(int(settings.REDIS_BREAKER_RESET_SECONDS))},
         )
+    return _get_client()
+
+def get_redis_client_or_none() -> Optional[redis.Redis]:
+    """Redis'e gidilmeden yerel bir yedeğe düşebilen çağıranlar için: devre açıksa None."""
+    if not redis_breaker.allow():
+        return None
+    return _get_client()
+
+
+def get_redis_pool_stats() -> dict:
+    pool = _blacklist_redis_pool
+    return {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        # redis-py havuzunun iç listeleri; yalnızca gözlem amaçlı okunur
+        "in_use_connections": len(pool._in_use_connections) if pool is not None else 0,
+        "idle_connections": len(pool._available_connections) if pool is not None else 0,
+        "pool_wait_timeouts": _pool_wait_timeouts,
+        "breaker_state": redis_breaker.state,
+        "breaker_consecutive_failures": redis_breaker.consecutive_failures,
+        "breaker_times_opened": redis_breaker.times_opened,
+        "breaker_rejected_calls": redis_breaker.rejected_calls,
+    }
+
+
+async def redis_health_check_loop() -> None:
+    """Lifespan'de arka plan task'ı olarak çalışır; PING sonucuna göre devreyi açar/kapatır."""
+    while True:
+        try:
+            await asyncio.wait_for(_get_client().ping(), timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS * 2)
+            redis_breaker.record_success()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Redis health check failed: %s", e)
+            _record_redis_error(e)
+        await asyncio.sleep(settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS)
 
 
 async def add_token_to_blacklist(redis_client: redis.Redis, jti: str, expires_in: int):
     """
-    Adds a token JTI to the Redis blacklist with an expiration time (in seconds).
+    Adds a token JTI to the Redis blacklist with an expiration time (in seconds) and publishes
+    it on `REDIS_REVOCATION_CHANNEL` so other services can update their local revocation set.
     `expires_in` should be the remaining validity time of the token.
     """
     if expires_in <= 0:
-        logger.debug(f"Token JTI {jti} already expired, not adding to blacklist.")
+        logger.debug("Token JTI %s already expired, not adding to blacklist.", jti)
         return
 
     redis_key = f"blacklist:{jti}"
+    revocation = json.dumps({"jti": jti, "exp": int(time.time()) + expires_in})
     try:
-        await redis_client.set(redis_key, "blacklisted", ex=expires_in)
-        logger.info(f"Token JTI {jti} added to blacklist, expires in {expires_in} seconds.")
-    except RedisConnectionError as conn_err:
-        logger.error(f"Redis connection error adding JTI {jti} to blacklist: {conn_err}")
+        # Anahtar ve yayın aynı MULTI içinde; abone servisler anahtarı görmeden mesajı almaz.
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(redis_key, "blacklisted", ex=expires_in)
+            pipe.publish(settings.REDIS_REVOCATION_CHANNEL, revocation)
+            await pipe.execute()
+        redis_breaker.record_success()
+        logger.info("Token JTI %s added to blacklist, expires in %s seconds.", jti, expires_in)
+    except (RedisConnectionError, RedisTimeoutError) as conn_err:
+        _record_redis_error(conn_err)
+        logger.error("Redis connection error adding JTI %s to blacklist: %s", jti, conn_err)
     except Exception as e:
-        logger.error(f"Error adding token JTI {jti} to blacklist: {e}", exc_info=True)
+        logger.error("Error adding token JTI %s to blacklist: %s", jti, e, exc_info=True)
 
 
-async def is_token_blacklisted(redis_client: redis.Redis, jti: str) -> bool:
-    """Checks if a token JTI exists in the Redis blacklist."""
-    redis_key = f"blacklist:{jti}"
+USER_EPOCH_KEY_PREFIX = "tokens_valid_after:"
+
+# username -> tokens_valid_after (epoch saniye, yoksa 0.0)
+_user_epoch_cache = TTLCache(
+    maxsize=settings.USER_EPOCH_CACHE_MAX_ENTRIES, ttl_seconds=settings.USER_EPOCH_CACHE_TTL_SECONDS
+)
+
+def _user_epoch_ttl_seconds() -> int:
+    # Bu süreden sonra epoch'tan önce verilmiş token'ların hepsinin süresi dolmuştur.
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 60
+
+def clear_user_epoch_cache() -> None:
+    _user_epoch_cache.clear()
+
+
+async def set_user_tokens_valid_after(redis_client: redis.Redis, username: str, valid_after: float) -> None:
+    """
+    Kullanıcının `valid_after`'dan önce verilmiş tüm token'larını geçersiz kılar. Kalıcı kaynak
+    users.tokens_valid_after kolonudur; Redis'teki kopya token ömrü kadar tutulur ve diğer
+    servislere `REDIS_REVOCATION_CHANNEL` üzerinden yayınlanır.
+    """
+    _user_epoch_cache.set(username, valid_after)
+    ttl = _user_epoch_ttl_seconds()
+    revocation = json.dumps({"sub": username, "valid_after": valid_after, "exp": int(time.time()) + ttl})
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(f"{USER_EPOCH_KEY_PREFIX}{username}", repr(valid_after), ex=ttl)
+            pipe.publish(settings.REDIS_REVOCATION_CHANNEL, revocation)
+            await pipe.execute()
+        redis_breaker.record_success()
+        logger.info("Tokens of user %s issued before %s revoked.", username, valid_after)
+    except (RedisConnectionError, RedisTimeoutError) as conn_err:
+        _record_redis_error(conn_err)
+        logger.error("Redis connection error revoking tokens of user %s: %s", username, conn_err)
+    except Exception as e:
+        logger.error("Error revoking tokens of user %s: %s", username, e, exc_info=True)
+
+
+async def is_token_revoked(redis_client: redis.Redis, jti: str, username: str, issued_at: Optional[float]) -> bool:
+    """
+    Token'ın JTI blacklist'inde olup olmadığını ve kullanıcının tokens_valid_after değerinden
+    önce verilip verilmediğini kontrol eder. Epoch cache'te yoksa iki kontrol tek round trip'te yapılır.
+    """
+    valid_after = _user_epoch_cache.get(username)
     try:
-        result = await redis_client.exists(redis_key)
-        is_blacklisted = result > 0
-        if is_blacklisted:
-            logger.debug(f"Token JTI {jti} found in blacklist.")
-        return is_blacklisted
-    except RedisConnectionError as conn_err:
-        logger.error(f"Redis connection error checking blacklist for JTI {jti}: {conn_err}")
+        if valid_after is None:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.exists(f"blacklist:{jti}")
+                pipe.get(f"{USER_EPOCH_KEY_PREFIX}{username}")
+                blacklisted, raw_valid_after = await pipe.execute()
+            valid_after = float(raw_valid_after) if raw_valid_after else 0.0
+            _user_epoch_cache.set(username, valid_after)
+        else:
+            blacklisted = await redis_client.exists(f"blacklist:{jti}")
+        redis_breaker.record_success()
+    except (RedisConnectionError, RedisTimeoutError) as conn_err:
+        _record_redis_error(conn_err)
+        logger.error("Redis connection error checking revocation for JTI %s: %s", jti, conn_err)
         return True
     except Exception as e:
-        logger.error(f"Error checking blacklist for JTI {jti}: {e}", exc_info=True)
+        logger.error("Error checking revocation for JTI %s: %s", jti, e, exc_info=True)
+        return True
+
+    if blacklisted:
+        logger.debug("Token JTI %s found in blacklist.", jti)
+        return True
+    if valid_after and (issued_at is None or issued_at < valid_after):
+        logger.debug("Token JTI %s of user %s was issued before tokens_valid_after.", jti, username)
         return True
+    return False
+
+
+async def check_tokens_revoked(
+    redis_client: redis.Redis, tokens: List[Tuple[str, str, Optional[float]]]
+) -> Optional[List[bool]]:
+    """
+    `is_token_revoked`'un toplu hali: (jti, username, iat) listesi için tüm blacklist EXISTS'leri ve
+    cache'te olmayan kullanıcı epoch'larının tek MGET'i aynı pipeline'da, tek round trip'te yapılır.
+    Redis hatasında None döner.
+    """
+    epochs = {username: _user_epoch_cache.get(username) for _, username, _ in tokens}
+    missing = [username for username, valid_after in epochs.items() if valid_after is None]
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for jti, _, _ in tokens:
+                pipe.exists(f"blacklist:{jti}")
+            if missing:
+                pipe.mget([f"{USER_EPOCH_KEY_PREFIX}{username}" for username in missing])
+            results = await pipe.execute()
+        redis_breaker.record_success()
+    except (RedisConnectionError, RedisTimeoutError) as conn_err:
+        _record_redis_error(conn_err)
+        logger.error("Redis connection error checking revocation for %s token(s): %s", len(tokens), conn_err)
+        return None
+    except Exception as e:
+        logger.error("Error checking revocation for %s token(s): %s", len(tokens), e, exc_info=True)
+        return None
+
+    if missing:
+        for username, raw_valid_after in zip(missing, results[len(tokens)]):
+            epochs[username] = float(raw_valid_after) if raw_valid_after else 0.0
+            _user_epoch_cache.set(username, epochs[username])
+
+    revoked = []
+    for (jti, username, issued_at), blacklisted in zip(tokens, results):
+        valid_after = epochs[username]
+        revoked.append(bool(blacklisted) or bool(valid_after and (issued_at is None or issued_at < valid_after)))
+    return revoked
+
+
+async def publish_permission_index_rebuild(redis_client: redis.Redis, origin: str, generation: int) -> None:
+    """Rol-izin indeksinin yeniden kurulduğunu diğer worker/replikalara duyurur (bkz. app/core/permission_index.py)."""
+    message = json.dumps({"origin": origin, "generation": generation})
+    try:
+        await redis_client.publish(settings.REDIS_PERMISSION_INDEX_CHANNEL, message)
+        redis_breaker.record_success()
+    except (RedisConnectionError, RedisTimeoutError) as conn_err:
+        _record_redis_error(conn_err)
+        logger.error("Redis connection error publishing permission index rebuild: %s", conn_err)
+    except Exception as e:
+        logger.error("Error publishing permission index rebuild: %s", e, exc_info=True)
+
+
+# Birden fazla token bucket'ı atomik olarak kontrol eder: hepsinde token varsa hepsinden birer
+# token düşer, yoksa hiçbirinden düşmez. ARGV: her key için kapasite ve saniyede eklenen token.
+# Dönüş: {izin (1/0), en uzun bekleme süresi (saniye, string)}
+_TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local states = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        retry_after = math.max(retry_after, (1 - tokens) / rate)
+    end
+    states[i] = {tokens, math.ceil(capacity / rate) + 1}
+end
+local allowed = retry_after == 0 and 1 or 0
+for i, key in ipairs(KEYS) do
+    local tokens = states[i][1] - allowed
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', key, states[i][2])
+end
+return {allowed, tostring(retry_after)}
+"""
+
+async def run_token_bucket_script(redis_client: redis.Redis, buckets) -> Optional[tuple]:
+    """
+    `buckets`: (key, kapasite, saniyede eklenen token) listesi. (izin, Retry-After saniye) döner;
+    Redis hatasında None (çağıran yerel bucket'lara düşer).
+    """
+    args = []
+    for _, capacity, rate in buckets:
+        args.extend((capacity, rate))
+    try:
+        # redis-py script'i EVALSHA ile çalıştırır, sunucuda yoksa bir kez yükler
+        allowed, retry_after = await redis_client.register_script(_TOKEN_BUCKET_LUA)(
+            keys=[key for key, _, _ in buckets], args=args
+        )
+        redis_breaker.record_success()
+        return bool(int(allowed)), float(retry_after)
+    except (RedisConnectionError, RedisTimeoutError) as conn_err:
+        _record_redis_error(conn_err)
+        logger.error("Redis connection error checking rate limit: %s", conn_err)
+    except Exception as e:
+        logger.error("Error checking rate limit: %s", e, exc_info=True)
+    return None
 
 
 async def close_redis_pool():
     """Closes the Redis connection pool gracefully."""
-    global _blacklist_redis_pool
+    global _blacklist_redis_pool, _blacklist_redis_client
     if _blacklist_redis_pool:
         logger.info("Closing Redis connection pool...")
         try:
             await _blacklist_redis_pool.disconnect(inuse_connections=True)
             logger.info("Redis connection pool closed.")
         except Exception as e:
-            logger.error(f"Error closing Redis connection pool: {e}", exc_info=True)
+            logger.error("Error closing Redis connection pool: %s", e, exc_info=True)
         finally:
-             _blacklist_redis_pool = None 
\ No newline at end of file
+             _blacklist_redis_pool = None
+             _blacklist_redis_client = None
@@ -1,4 +1,5 @@
 # app/core/security.py
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
@@ -7,9 +8,17 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.keys import get_key_ring
 
-# Şifreleme context'i (bcrypt kullanılıyor)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Şifreleme context'i (bcrypt kullanılıyor). Maliyeti PASSWORD_BCRYPT_ROUNDS'tan farklı hash'ler
+# needs_update sayılır ve login'de yeniden hash'lenir (bkz. app/core/hashing.py).
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -30,10 +39,34 @@ def create_access_token(payload_data: Dict[str, Any], expires_delta: Optional[ti
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode.update({"exp": expire})
+    # Milisaniye hassasiyetli iat: aynı saniye içinde tokens_valid_after güncellemesinden sonra
+    # alınan token'ın reddedilmemesi için (RFC 7519 NumericDate tam sayı olmak zorunda değil)
+    to_encode.update({"iat": round(time.time(), 3)})
 
     to_encode.update({"jti": str(uuid.uuid4())})
 
+    key_ring = get_key_ring()
+    if key_ring is not None:
+        return jwt.encode(
+            to_encode, key_ring.signing_pem, algorithm=key_ring.algorithm,
+            headers={"kid": key_ring.signing_kid}
+        )
+
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+
+def decode_access_token(token: str, verify_exp: bool = True) -> Dict[str, Any]:
+    """İmzayı doğrulayıp payload'ı döner; asimetrik modda anahtar header'daki `kid` ile seçilir."""
+    options = {"verify_exp": verify_exp}
+    key_ring = get_key_ring()
+    if key_ring is None:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM], options=options)
+
+    kid = jwt.get_unverified_header(token).get("kid")
+    public_key = key_ring.public_keys.get(kid)
+    if public_key is None:
+        raise JWTError(f"Unknown signing key id: {kid}")
+    return jwt.decode(token, public_key, algorithms=[key_ring.algorithm], options=options)
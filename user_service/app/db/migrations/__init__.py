@@ -0,0 +1,8 @@
+# app/db/migrations/__init__.py
+"""
+Uygulama açılışında çalıştırılmayan, elle (bir kez) çalıştırılan veritabanı adımları.
+
+Her modül `python -m app.db.migrations.<modül>` ile çalışır ve tekrar çalıştırılabilir. Büyük
+tablolarda yazmaları bloklamaması gereken işlemler (ör. `CREATE INDEX CONCURRENTLY`) buradadır;
+her replikanın açılışında çalışan `app/db/schema_upgrades.py`'ye konmaz.
+"""
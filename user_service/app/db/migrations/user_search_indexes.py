@@ -0,0 +1,66 @@
+# app/db/migrations/user_search_indexes.py
+"""
+Admin kullanıcı araması (user_service.get_users, q=) için pg_trgm GIN index'leri.
+
+ILIKE '%q%' aramaları bu index'ler olmadan da doğru sonuç verir, yalnızca tabloyu tarar. Index'ler
+`CREATE INDEX CONCURRENTLY` ile oluşturulur; users tablosuna yazmalar build süresince bloklanmaz.
+CONCURRENTLY transaction içinde çalışamadığından bağlantı AUTOCOMMIT'tir. Yarıda kalmış bir build
+geçersiz (INVALID) bir index bırakır; bir sonraki çalıştırmada o index silinip yeniden oluşturulur.
+
+Çalıştırma: docker-compose exec user_service_app python -m app.db.migrations.user_search_indexes
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# index adı -> kolon
+SEARCH_INDEXES = {
+    "ix_users_username_trgm": "username",
+    "ix_users_email_trgm": "email",
+    "ix_users_first_name_trgm": "first_name",
+    "ix_users_last_name_trgm": "last_name",
+}
+
+
+def create_user_search_indexes(engine: Engine) -> int:
+    """Eksik index'leri oluşturur, oluşturulan index sayısını döner. Eklenti kurulamazsa hiçbirini oluşturmaz."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except Exception as e:
+            # Eklenti yetkisi olmayan roller: arama index'siz çalışmaya devam eder
+            logger.warning("pg_trgm extension unavailable, user search indexes skipped: %s", e)
+            return 0
+
+        created = 0
+        for index_name, column in SEARCH_INDEXES.items():
+            valid = conn.execute(
+                text(
+                    "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name"
+                ),
+                {"name": index_name},
+            ).scalar()
+            if valid:
+                continue
+            if valid is False:
+                logger.warning("Dropping invalid index %s left by an interrupted build.", index_name)
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY {index_name} ON users USING gin ({column} gin_trgm_ops)"))
+            created += 1
+            logger.info("Created index %s.", index_name)
+    return created
+
+
+if __name__ == "__main__":
+    from app.core.logging_config import setup_logging_from_settings, shutdown_logging
+    from app.db.database import engine
+
+    setup_logging_from_settings()
+    try:
+        create_user_search_indexes(engine)
+    finally:
+        shutdown_logging()
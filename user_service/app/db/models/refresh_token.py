@@ -0,0 +1,27 @@
+# app/db/models/refresh_token.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy.orm import relationship
+
+from app.db.database import Base
+
+class RefreshToken(Base):
+    """
+    Opak refresh token'ların kaydı; token'ın kendisi değil SHA-256 hash'i saklanır.
+    Aynı login'den rotasyonla türeyen token'lar aynı `family_id`'yi paylaşır: kullanılmış bir
+    token tekrar gelirse (reuse) tüm aile iptal edilir.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    family_id = Column(String(32), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True) # Rotasyonda yenisiyle değiştirildiği an
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family_id='{self.family_id}')>"
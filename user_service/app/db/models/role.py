@@ -12,7 +12,8 @@ class Role(Base):
     permissions = relationship(
         "Permission",
         secondary="role_permissions", 
-        back_populates="roles"
+        back_populates="roles",
+        order_by="Permission.id"
     )
     users = relationship(
         "User",
@@ -1,9 +1,10 @@
 # app/db/models/user.py
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, func, Table, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, object_session
 
 
 from app.db.database import Base 
+from app.core.permission_index import permission_index
 
 user_roles_table = Table(
     "user_roles",
@@ -31,37 +32,57 @@ class User(Base):
     is_active = Column(Boolean, default=True) 
     created_at = Column(DateTime(timezone=True), server_default=func.now()) 
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now()) 
+    # Bu zamandan önce (iat) verilmiş tüm token'lar geçersiz; logout-all, şifre değişikliği ve pasife almada güncellenir
+    tokens_valid_after = Column(DateTime(timezone=True), nullable=True)
+    # Kullanıcı satırına yansımayan profil değişikliklerinde (adres, iletişim, roller) artırılır;
+    # /users/me/profile ETag'i bu değer ve updated_at'ten türetilir (bkz. user_service.touch_user_profiles)
+    profile_version = Column(Integer, nullable=False, default=0, server_default="0")
 
+    # Sabit sıralama: yanıtlar (ve /users/me/profile ETag'i) sorgu planından bağımsız olur
     addresses = relationship(
         "Address",
         back_populates="owner",
         cascade="all, delete-orphan",
-        lazy="select" 
+        lazy="select",
+        order_by="Address.id"
     )
 
     contacts = relationship(
         "Contact",
         back_populates="owner",
         cascade="all, delete-orphan",
-        lazy="select"
+        lazy="select",
+        order_by="Contact.id"
     )
 
     roles = relationship(
         "Role",
         secondary=user_roles_table, 
         back_populates="users",
-        lazy="selectin" 
+        lazy="selectin",
+        order_by="Role.id"
     )
 
+    def _load_permission_index(self) -> None:
+        if not permission_index.loaded:
+            session = object_session(self)
+            if session is not None:
+                permission_index.ensure_loaded(session)
+
     @property
-    def permissions(self) -> set[str]:
-        all_perms = set()
-        for role in self.roles:
-            for perm in role.permissions:
-                all_perms.add(perm.name)
-        return all_perms
+    def permissions(self) -> frozenset[str]:
+        # Rol maskelerinin OR'u (bkz. app/core/permission_index.py); Role.permissions yüklenmez
+        self._load_permission_index()
+        names = permission_index.permission_names_for_roles(role.id for role in self.roles)
+        if names is not None:
+            return names
+        return frozenset(perm.name for role in self.roles for perm in role.permissions)
 
     def has_permission(self, permission_name: str) -> bool:
+        self._load_permission_index()
+        allowed = permission_index.roles_have_permission((role.id for role in self.roles), permission_name)
+        if allowed is not None:
+            return allowed
         return permission_name in self.permissions
 
     def __repr__(self):
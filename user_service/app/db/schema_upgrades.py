@@ -0,0 +1,33 @@
+# app/db/schema_upgrades.py
+"""
+create_all mevcut tablolara sonradan eklenen kolonları eklemez. Var olan veritabanlarını
+güncel modele getiren, tekrar çalıştırılabilir (idempotent) ve hızlı DDL adımları burada tutulur ve
+uygulama açılışında create_all'dan sonra çalıştırılır.
+
+Her adım kendi transaction'ında çalışır; biri başarısız olursa diğerleri yine uygulanır. Tabloyu
+uzun süre kilitleyen işlemler (ör. büyük tablolarda index oluşturma) buraya değil
+`app/db/migrations` altına, elle çalıştırılan adımlara konur.
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_UPGRADES = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS tokens_valid_after TIMESTAMP WITH TIME ZONE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_version INTEGER NOT NULL DEFAULT 0",
+]
+
+
+def apply_schema_upgrades(engine: Engine) -> None:
+    failed = 0
+    for statement in SCHEMA_UPGRADES:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(statement))
+        except Exception as e:
+            failed += 1
+            logger.error("Schema upgrade failed: %s (%s)", statement, e)
+    logger.info("Schema upgrades applied (%s statement(s), %s failed).", len(SCHEMA_UPGRADES) - failed, failed)
@@ -66,11 +66,11 @@ def get_or_create_permission(db: Session, name: str, description: Optional[str])
         instance = Permission(name=name, description=description)
         db.add(instance)
         db.flush() 
-        logger.info(f"Permission '{name}' created.")
+        logger.info("Permission '%s' created.", name)
     elif description and instance.description != description:
          instance.description = description
          db.add(instance)
-         logger.info(f"Permission '{name}' description updated.")
+         logger.info("Permission '%s' description updated.", name)
     return instance
 
 def get_or_create_role(db: Session, name: str, description: Optional[str], permission_objs: List[Permission]) -> Role:
@@ -79,7 +79,7 @@ def get_or_create_role(db: Session, name: str, description: Optional[str], permi
         instance = Role(name=name, description=description)
         db.add(instance)
         db.flush() 
-        logger.info(f"Role '{name}' created.")
+        logger.info("Role '%s' created.", name)
 
     if description and instance.description != description:
         instance.description = description
@@ -88,7 +88,7 @@ def get_or_create_role(db: Session, name: str, description: Optional[str], permi
     new_perm_ids = {p.id for p in permission_objs}
     if current_perm_ids != new_perm_ids:
         instance.permissions = permission_objs 
-        logger.info(f"Permissions updated for role '{name}'.")
+        logger.info("Permissions updated for role '%s'.", name)
 
     db.add(instance) 
     return instance
@@ -103,7 +103,7 @@ def create_or_get_superuser(db: Session) -> User:
     user = get_user_by_email(db, email=settings.FIRST_SUPERUSER_EMAIL)
 
     if not user:
-        logger.info(f"Creating superuser '{settings.FIRST_SUPERUSER_USERNAME}' with email '{settings.FIRST_SUPERUSER_EMAIL}'.")
+        logger.info("Creating superuser '%s' with email '%s'.", settings.FIRST_SUPERUSER_USERNAME, settings.FIRST_SUPERUSER_EMAIL)
         user_in = UserCreate(
             username=settings.FIRST_SUPERUSER_USERNAME,
             email=settings.FIRST_SUPERUSER_EMAIL,
@@ -114,13 +114,13 @@ def create_or_get_superuser(db: Session) -> User:
 
         db_user = User(**user_data, hashed_password=hashed_password, roles=[admin_role], is_active=True)
         db.add(db_user)
-        logger.info(f"Superuser '{db_user.username}' will be created with role 'ADMIN'.")
+        logger.info("Superuser '%s' will be created with role 'ADMIN'.", db_user.username)
         return db_user 
     else:
-        logger.info(f"Superuser '{user.username}' already exists.")
+        logger.info("Superuser '%s' already exists.", user.username)
         user_has_admin_role = any(role.name == "ADMIN" for role in user.roles)
         if not user_has_admin_role:
-            logger.warning(f"Assigning ADMIN role to existing superuser '{user.username}'.")
+            logger.warning("Assigning ADMIN role to existing superuser '%s'.", user.username)
             user.roles.append(admin_role)
             db.add(user)
         return user
@@ -154,6 +154,6 @@ def init_db(db: Session) -> None:
         logger.info("Initial data setup finished successfully.")
 
     except Exception as e:
-         logger.error(f"CRITICAL: Error during initial data setup: {e}", exc_info=True)
+         logger.error("CRITICAL: Error during initial data setup: %s", e, exc_info=True)
          logger.warning("Rolling back initial data changes...")
          db.rollback() 
@@ -1,17 +1,22 @@
 # app/main.py 
+import asyncio
 import logging
 from fastapi import FastAPI
 from sqlalchemy.orm import Session
 from contextlib import asynccontextmanager
 from typing import Optional 
 
-from app.api.endpoints import users, auth, addresses, contacts, roles, permissions, authorization
+from app.api.endpoints import users, auth, addresses, contacts, roles, permissions, authorization, jwks
 from app.db.database import engine, Base, SessionLocal
-from app.db.models import user, address, contact, role, permission 
+from app.db.schema_upgrades import apply_schema_upgrades
+from app.db.models import user, address, contact, role, permission, refresh_token 
 from app.initial_data import init_db 
-from app.core.redis_client import close_redis_pool 
+from app.core.redis_client import close_redis_pool, get_redis_pool_stats, redis_health_check_loop
+from app.core.permission_index import run_permission_index_sync
+from app.core.hashing import get_hashing_stats, shutdown_hashing_executor, start_hashing_executor
+from app.core.logging_config import setup_logging_from_settings
 
-logging.basicConfig(level=logging.INFO)
+setup_logging_from_settings()
 logger = logging.getLogger(__name__) 
 
 @asynccontextmanager
@@ -21,9 +26,10 @@ async def lifespan(app: FastAPI):
     logger.info("Step 1: Checking/Creating database tables...")
     try:
         Base.metadata.create_all(bind=engine)
+        apply_schema_upgrades(engine)
         logger.info("Database tables check/creation complete.")
     except Exception as e:
-        logger.error(f"CRITICAL: Error creating database tables: {e}", exc_info=True)
+        logger.error("CRITICAL: Error creating database tables: %s", e, exc_info=True)
 
     logger.info("Step 2: Initializing initial data (roles, permissions, superuser)...")
     db: Optional[Session] = None 
@@ -32,7 +38,7 @@ async def lifespan(app: FastAPI):
         init_db(db)         
         logger.info("Initial data initialization process finished successfully.")
     except Exception as e:
-        logger.error(f"CRITICAL: An error occurred during initial data initialization: {e}", exc_info=True)
+        logger.error("CRITICAL: An error occurred during initial data initialization: %s", e, exc_info=True)
         if db and db.is_active: 
              db.rollback()
     finally:
@@ -40,11 +46,22 @@ async def lifespan(app: FastAPI):
             db.close()
             logger.info("Database session for initial data closed.")
 
+    try:
+        await asyncio.to_thread(start_hashing_executor)
+    except Exception as e:
+        logger.error("Could not start password hashing pool, it will be started on first use: %s", e, exc_info=True)
+
+    redis_health_task = asyncio.create_task(redis_health_check_loop())
+    # Rol-izin indeksini kurar ve diğer worker'lardaki değişiklikleri dinler
+    permission_index_task = asyncio.create_task(run_permission_index_sync())
     logger.info("Application startup complete. Ready to accept requests.")
     yield 
 
     logger.info("Application shutdown sequence initiated...")
+    redis_health_task.cancel()
+    permission_index_task.cancel()
     await close_redis_pool() 
+    await asyncio.to_thread(shutdown_hashing_executor)
     logger.info("Application shutdown complete.")
 
 
@@ -60,6 +77,14 @@ app = FastAPI(
 async def read_root():
     return {"message": "User Service is running!"}
 
+@app.get("/health/redis", tags=["Root"], summary="Redis blacklist client pool and circuit breaker metrics")
+async def read_redis_health():
+    return get_redis_pool_stats()
+
+@app.get("/health/hashing", tags=["Root"], summary="Password hashing pool metrics")
+async def read_hashing_health():
+    return get_hashing_stats()
+
 # --- Router'ları Dahil Etme ---
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(auth.router, prefix="/auth", tags=["Authentication & Authorization"]) 
@@ -67,4 +92,5 @@ app.include_router(addresses.router, prefix="/addresses", tags=["User Addresses"
 app.include_router(contacts.router, prefix="/contacts", tags=["User Contacts"])        
 app.include_router(roles.router, prefix="/roles", tags=["Roles Management (Admin)"])     
 app.include_router(permissions.router, prefix="/permissions", tags=["Permissions Management (Admin)"]) 
-app.include_router(authorization.router, prefix="/authz", tags=["Authorization Checks"]) 
+app.include_router(authorization.router, prefix="/authz", tags=["Authorization Checks"])
+app.include_router(jwks.router, tags=["Authentication & Authorization"]) 
@@ -1,6 +1,20 @@
 # app/schemas/auth.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
 
 class CheckLoginResponse(BaseModel):
     message: str = "Token is valid"
     username: str
+
+class IntrospectionRequest(BaseModel):
+    tokens: List[str] = Field(..., min_length=1, max_length=settings.INTROSPECTION_MAX_TOKENS)
+
+class IntrospectionResult(BaseModel):
+    active: bool
+    # Yalnızca aktif token'lar için doldurulur (RFC 7662'deki gibi)
+    claims: Optional[Dict[str, Any]] = None
+
+class IntrospectionResponse(BaseModel):
+    results: List[IntrospectionResult] # İstekteki token sırasıyla
@@ -5,8 +5,14 @@ from typing import Union, Optional
 class Token(BaseModel):
     access_token: str
     token_type: str
+    expires_in: Optional[int] = None # access token ömrü (saniye)
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     username: Union[str, None] = None 
     jti: Optional[str] = None 
-    role: Optional[str] = None 
\ No newline at end of file
+    role: Optional[str] = None
+    iat: Optional[float] = None 
\ No newline at end of file
@@ -1,9 +1,12 @@
 # app/schemas/user.py
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Set
+from pydantic import BaseModel, EmailStr, Field, field_serializer
+from typing import Literal, Optional, List, Set
 from datetime import datetime
+from app.core.config import settings
 from .role import Role
 from .permission import Permission
+from .address import Address
+from .contact import Contact
 
 
 class UserBase(BaseModel):
@@ -49,6 +52,11 @@ class User(UserInDBBase):
     roles: List[Role] = []
     permissions: Set[str] = set() 
 
+    @field_serializer("permissions")
+    def _sorted_permissions(self, permissions: Set[str]) -> List[str]:
+        # Set sırası process'e göre değişir; yanıtlar ve ETag'ler replikalar arasında aynı olsun
+        return sorted(permissions)
+
     class Config:
         from_attributes = True
 
@@ -65,3 +73,25 @@ class UserPasswordUpdate(BaseModel):
     current_password: str = Field(..., description="User's current password")
     new_password: str = Field(..., min_length=8, description="New password (min 8 chars)")
 
+class UserProfile(BaseModel):
+    user: User
+    addresses: List[Address] = []
+    contacts: List[Contact] = []
+
+class UserBulkCreateItem(UserCreate):
+    role_ids: List[int] = Field(default_factory=list, description="Role IDs to assign to the new user")
+
+class UserBulkCreateRequest(BaseModel):
+    users: List[UserBulkCreateItem] = Field(..., min_length=1, max_length=settings.BULK_USER_CREATE_MAX_USERS)
+
+class UserBulkCreateResult(BaseModel):
+    index: int = Field(..., description="Position of the user in the request")
+    username: str
+    status: Literal["created", "conflict", "invalid_role"]
+    id: Optional[int] = Field(None, description="ID of the created user")
+    detail: Optional[str] = None
+
+class UserBulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[UserBulkCreateResult] # İstekteki sırayla
@@ -4,11 +4,13 @@ from typing import List, Optional
 
 from app.db.models.address import Address as AddressModel
 from app.schemas.address import AddressCreate, AddressUpdate
+from app.services.user_service import touch_user_profiles
 
 def create_user_address(db: Session, address_in: AddressCreate, owner_id: int) -> AddressModel:
     address_data = address_in.model_dump()
     db_address = AddressModel(**address_data, owner_id=owner_id)
     db.add(db_address)
+    touch_user_profiles(db, [owner_id])
     db.commit()
     db.refresh(db_address)
     return db_address
@@ -29,6 +31,7 @@ def update_address(db: Session, address_id: int, address_in: AddressUpdate) -> O
         setattr(db_address, field, value)
 
     db.add(db_address)
+    touch_user_profiles(db, [db_address.owner_id])
     db.commit()
     db.refresh(db_address)
     return db_address
@@ -39,5 +42,6 @@ def delete_address(db: Session, address_id: int) -> Optional[AddressModel]:
         return None
 
     db.delete(db_address) 
+    touch_user_profiles(db, [db_address.owner_id])
     db.commit()
     return db_address 
\ No newline at end of file
@@ -1,16 +1,20 @@
 # app/services/auth_service.py
 from sqlalchemy.orm import Session
-from typing import Optional
-from jose import jwt, JWTError
+from typing import List, Optional
+from jose import JWTError
 from datetime import datetime, timezone
+import anyio
 from fastapi import HTTPException, status
 import redis.asyncio as redis 
 import logging 
 
 from app.db.models.user import User as UserModel
-from app.services import user_service 
-from app.core.security import verify_password 
-from app.core.redis_client import add_token_to_blacklist, get_redis_blacklist_client
+from app.services import refresh_token_service, user_service 
+from app.core.security import decode_access_token
+from app.core.hashing import verify_and_update_password
+from app.core.redis_client import (
+    add_token_to_blacklist, check_tokens_revoked, get_redis_blacklist_client, set_user_tokens_valid_after
+)
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -21,17 +25,21 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
         return None
     if not user.is_active:
         return None
-    if not verify_password(password, user.hashed_password):
+    is_valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not is_valid:
         return None
+    if new_hash:
+        # bcrypt maliyeti değişmiş: şifre elimizdeyken yeni maliyetle yeniden hash'le
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
+        logger.info("Password hash of user %s upgraded to the current cost factor.", user.username)
     return user
 
 async def blacklist_token(token: str):
     redis_client: Optional[redis.Redis] = None 
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM],
-            options={"verify_exp": False}
-        )
+        payload = decode_access_token(token, verify_exp=False)
         jti = payload.get("jti")
         exp = payload.get("exp")
 
@@ -43,7 +51,7 @@ async def blacklist_token(token: str):
         expires_in = int(exp - now)
 
         if expires_in <= 0:
-             logger.info(f"Token JTI {jti} already expired. Not adding to blacklist.")
+             logger.info("Token JTI %s already expired. Not adding to blacklist.", jti)
              return
 
         try:
@@ -56,11 +64,71 @@ async def blacklist_token(token: str):
             pass
 
     except JWTError as e:
-        logger.warning(f"JWT Error decoding token during logout: {e}")
+        logger.warning("JWT Error decoding token during logout: %s", e)
         pass 
     except ConnectionError as e:
-         logger.error(f"Redis connection error during logout: {e}")
+         logger.error("Redis connection error during logout: %s", e)
          raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Logout service unavailable")
     except Exception as e:
-        logger.error(f"Unexpected error during logout: {e}", exc_info=True) 
+        logger.error("Unexpected error during logout: %s", e, exc_info=True) 
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not process logout")
+
+
+async def introspect_tokens(tokens: List[str]) -> List[dict]:
+    """
+    Token'ları yerel olarak doğrular, imzası/süresi geçerli olanların iptal durumunu tek Redis
+    round trip'inde kontrol eder. Sonuçlar istek sırasıyla döner.
+    """
+    decoded = []
+    for token in tokens:
+        try:
+            payload = decode_access_token(token)
+        except JWTError:
+            payload = None
+        if payload is not None and (not payload.get("sub") or not payload.get("jti")):
+            payload = None
+        decoded.append(payload)
+
+    to_check = [(payload["jti"], payload["sub"], payload.get("iat")) for payload in decoded if payload is not None]
+    revoked = iter(())
+    if to_check:
+        redis_client = await get_redis_blacklist_client()
+        flags = await check_tokens_revoked(redis_client, to_check)
+        if flags is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Could not check token revocation")
+        revoked = iter(flags)
+
+    results = []
+    for payload in decoded:
+        if payload is None or next(revoked):
+            results.append({"active": False})
+        else:
+            results.append({"active": True, "claims": payload})
+    return results
+
+def revoke_session(db: Session, token: str) -> None:
+    """Access token'ın `sid` claim'indeki refresh token ailesini iptal eder (logout)."""
+    try:
+        session_id = decode_access_token(token, verify_exp=False).get("sid")
+    except JWTError:
+        return
+    if session_id:
+        revoked = refresh_token_service.revoke_refresh_token_family(db, session_id)
+        logger.info("Logout revoked %s refresh token(s) of session %s.", revoked, session_id)
+
+async def publish_tokens_valid_after(username: str, valid_after: Optional[datetime]) -> None:
+    """
+    users.tokens_valid_after değişikliğini Redis'e yazar ve diğer servislere yayınlar. Redis'e
+    ulaşılamazsa yalnızca loglanır: değer veritabanına yazılmıştır ve user_service onu yine uygular.
+    """
+    if valid_after is None:
+        return
+    try:
+        redis_client = await get_redis_blacklist_client()
+        await set_user_tokens_valid_after(redis_client, username, valid_after.timestamp())
+    except HTTPException as e:
+        logger.error("Could not publish token revocation for user %s: %s", username, e.detail)
+
+def publish_tokens_valid_after_from_thread(username: str, valid_after: Optional[datetime]) -> None:
+    """Sync endpoint'lerden (threadpool) çağrılır; yayını uygulamanın event loop'unda yapar."""
+    anyio.from_thread.run(publish_tokens_valid_after, username, valid_after)
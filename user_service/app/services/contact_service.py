@@ -6,11 +6,13 @@ import re
 
 from app.db.models.contact import Contact as ContactModel, ContactType
 from app.schemas.contact import ContactCreate, ContactUpdate
+from app.services.user_service import touch_user_profiles
 
 def create_user_contact(db: Session, contact_in: ContactCreate, owner_id: int) -> ContactModel:
     contact_data = contact_in.model_dump()
     db_contact = ContactModel(**contact_data, owner_id=owner_id)
     db.add(db_contact)
+    touch_user_profiles(db, [owner_id])
     db.commit()
     db.refresh(db_contact)
     return db_contact
@@ -41,6 +43,11 @@ def update_contact(db: Session, contact_id: int, contact_in: ContactUpdate) -> O
 
     for field, value in update_data.items():
         setattr(db_contact, field, value)
+
+    db.add(db_contact)
+    touch_user_profiles(db, [db_contact.owner_id])
+    db.commit()
+    db.refresh(db_contact)
     return db_contact
 
 def delete_contact(db: Session, contact_id: int) -> Optional[ContactModel]:
@@ -49,5 +56,6 @@ def delete_contact(db: Session, contact_id: int) -> Optional[ContactModel]:
         return None
 
     db.delete(db_contact) 
+    touch_user_profiles(db, [db_contact.owner_id])
     db.commit()
     return db_contact
\ No newline at end of file
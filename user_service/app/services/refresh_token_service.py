@@ -0,0 +1,93 @@
+# app/services/refresh_token_service.py
+import hashlib
+import logging
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.refresh_token import RefreshToken as RefreshTokenModel
+from app.db.models.user import User as UserModel
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def issue_refresh_token(db: Session, user: UserModel, family_id: Optional[str] = None) -> Tuple[str, str]:
+    """Yeni bir refresh token üretir; (token, family_id) döner. family_id verilmezse yeni oturum ailesi açılır."""
+    now = datetime.now(timezone.utc)
+    token = secrets.token_urlsafe(32)
+    family_id = family_id or uuid.uuid4().hex
+    # Süresi dolmuş kayıtlar kullanıcının bir sonraki login/refresh'inde temizlenir
+    db.query(RefreshTokenModel).filter(
+        RefreshTokenModel.user_id == user.id, RefreshTokenModel.expires_at < now
+    ).delete(synchronize_session=False)
+    db.add(RefreshTokenModel(
+        user_id=user.id,
+        token_hash=_hash_token(token),
+        family_id=family_id,
+        created_at=now,
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    db.commit()
+    return token, family_id
+
+def revoke_refresh_token_family(db: Session, family_id: str) -> int:
+    revoked = db.query(RefreshTokenModel).filter(
+        RefreshTokenModel.family_id == family_id, RefreshTokenModel.revoked_at.is_(None)
+    ).update({RefreshTokenModel.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+    db.commit()
+    return revoked
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[UserModel, str, str]:
+    """
+    Refresh token'ı kullanılmış olarak işaretleyip aynı aileden yenisini verir; (kullanıcı, yeni
+    token, family_id) döner. Daha önce kullanılmış ya da iptal edilmiş bir token gelirse token
+    çalınmış sayılır ve ailenin tamamı iptal edilir.
+    """
+    now = datetime.now(timezone.utc)
+    record = db.query(RefreshTokenModel).filter(RefreshTokenModel.token_hash == _hash_token(token)).first()
+    if record is None:
+        raise _invalid_refresh_token()
+
+    if record.used_at is not None or record.revoked_at is not None:
+        revoke_refresh_token_family(db, record.family_id)
+        logger.warning("Refresh token reuse detected for user id %s; session family %s revoked.", record.user_id, record.family_id)
+        raise _invalid_refresh_token()
+
+    if record.expires_at <= now:
+        raise _invalid_refresh_token()
+
+    user = record.user
+    # logout-all, şifre değişikliği ve pasife alma refresh token'ları da geçersiz kılar
+    if not user.is_active or (user.tokens_valid_after is not None and record.created_at < user.tokens_valid_after):
+        revoke_refresh_token_family(db, record.family_id)
+        raise _invalid_refresh_token()
+
+    # Aynı token'la eşzamanlı iki istekten yalnızca biri kazanır; diğeri reuse sayılır
+    claimed = db.query(RefreshTokenModel).filter(
+        RefreshTokenModel.id == record.id,
+        RefreshTokenModel.used_at.is_(None),
+        RefreshTokenModel.revoked_at.is_(None),
+    ).update({RefreshTokenModel.used_at: now}, synchronize_session=False)
+    if claimed != 1:
+        db.rollback()
+        revoke_refresh_token_family(db, record.family_id)
+        logger.warning("Concurrent refresh token reuse for user id %s; session family %s revoked.", record.user_id, record.family_id)
+        raise _invalid_refresh_token()
+
+    new_token, family_id = issue_refresh_token(db, user, family_id=record.family_id)
+    return user, new_token, family_id
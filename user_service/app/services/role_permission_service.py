@@ -2,11 +2,19 @@
 from sqlalchemy.orm import Session, selectinload 
 from typing import List, Optional, Union, Set
 from fastapi import HTTPException, status
+import anyio
+import logging
 
 from app.db.models.role import Role as RoleModel
 from app.db.models.permission import Permission as PermissionModel
 from app.db.models.user import User as UserModel
 from app.schemas.role import RoleCreate, RoleUpdate 
+from app.services.user_service import touch_role_member_profiles
+from app.core.principal import clear_principal_cache
+from app.core.permission_index import PROCESS_ID, permission_index
+from app.core.redis_client import get_redis_blacklist_client, publish_permission_index_rebuild
+
+logger = logging.getLogger(__name__)
 
 def get_roles(db: Session) -> List[RoleModel]:
     return db.query(RoleModel).options(selectinload(RoleModel.permissions)).all()
@@ -40,22 +48,21 @@ def update_role_permissions(db: Session, role_id: int, permission_ids: List[int]
             )
 
     db_role.permissions = valid_permissions 
+    touch_role_member_profiles(db, role_id)
 
     db.add(db_role)
     db.commit()
     db.refresh(db_role) 
+    permission_index.rebuild(db)
+    clear_principal_cache()
 
     return db_role
 
 def get_user_permission_names(user: UserModel) -> Set[str]:
      """Gets a set of permission names for a given user model."""
-     all_perms = set()
-     if user and user.roles: 
-         for role in user.roles:
-             if role.permissions: 
-                 for perm in role.permissions:
-                     all_perms.add(perm.name)
-     return all_perms
+     if not user:
+         return set()
+     return user.permissions
 
 def create_role(db: Session, role_in: RoleCreate) -> RoleModel:
     existing_role = db.query(RoleModel).filter(RoleModel.name == role_in.name).first()
@@ -68,6 +75,7 @@ def create_role(db: Session, role_in: RoleCreate) -> RoleModel:
     db.add(db_role)
     db.commit()
     db.refresh(db_role)
+    permission_index.rebuild(db)
     return db_role
 
 def update_role_details(db: Session, role_id: int, role_in: RoleUpdate) -> Optional[RoleModel]:
@@ -87,11 +95,31 @@ def update_role_details(db: Session, role_id: int, role_in: RoleUpdate) -> Optio
 
     for field, value in update_data.items():
         setattr(db_role, field, value)
+    touch_role_member_profiles(db, role_id)
 
     db.add(db_role)
     db.commit()
     db.refresh(db_role)
+    clear_principal_cache()
     return db_role
 
 def get_role_by_id(db: Session, role_id: int) -> Optional[RoleModel]:
-    return db.query(RoleModel).filter(RoleModel.id == role_id).first()
\ No newline at end of file
+    return db.query(RoleModel).filter(RoleModel.id == role_id).first()
+
+
+async def broadcast_permission_index_rebuild() -> None:
+    """
+    Diğer worker/replikalara rol-izin indekslerini yeniden kurmalarını ve principal cache'lerini
+    temizlemelerini duyurur. Redis'e ulaşılamazsa yalnızca loglanır; diğer process'ler değişikliği
+    bir sonraki yeniden abonelikte ya da indeksleri `PERMISSION_INDEX_MAX_AGE_SECONDS` dolup yeniden
+    kurulduğunda görür (principal cache TTL'i tek başına yetmez, principal'lar eski indeksten kurulur).
+    """
+    try:
+        redis_client = await get_redis_blacklist_client()
+        await publish_permission_index_rebuild(redis_client, PROCESS_ID, permission_index.generation)
+    except HTTPException as e:
+        logger.error("Could not broadcast permission index rebuild: %s", e.detail)
+
+def broadcast_permission_index_rebuild_from_thread() -> None:
+    """Sync endpoint'lerden (threadpool) çağrılır; yayını uygulamanın event loop'unda yapar."""
+    anyio.from_thread.run(broadcast_permission_index_rebuild)
@@ -1,15 +1,64 @@
 # app/services/user_service.py
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException, status
-from typing import Optional, Any
+from typing import Optional, Any, List, Tuple
+import logging
+from datetime import datetime, timezone
 
-from app.db.models.user import User as UserModel
+from app.db.models.user import User as UserModel, user_roles_table
 from app.db.models.role import Role as RoleModel 
-from app.schemas.user import UserCreate, UserUpdate, UserPasswordReset, UserRoleUpdate, UserPasswordUpdate 
-from app.core.security import get_password_hash, verify_password 
+from app.schemas.user import (
+    UserCreate, UserUpdate, UserPasswordReset, UserRoleUpdate, UserPasswordUpdate,
+    UserBulkCreateItem, UserBulkCreateResult,
+)
+from app.core.hashing import hash_password, hash_passwords, verify_and_update_password
+from app.core.principal import invalidate_principal
+
+logger = logging.getLogger(__name__)
+
+def _invalidate_tokens(db_user: UserModel) -> None:
+    # Bu andan önce verilmiş token'lar (iat) reddedilir; Redis'e yayını endpoint katmanı yapar.
+    db_user.tokens_valid_after = datetime.now(timezone.utc)
+
+# `User` yanıt şeması rolleri izinleriyle birlikte döndürür; roller ve izinler kullanıcı sayısından
+# bağımsız olarak birer selectin sorgusuyla yüklenir (aksi halde her rolün izinleri ayrı lazy load olur)
+def _roles_with_permissions():
+    return selectinload(UserModel.roles).selectinload(RoleModel.permissions)
 
 def get_user(db: Session, user_id: int) -> Optional[UserModel]:
-    return db.query(UserModel).filter(UserModel.id == user_id).first()
+    return db.query(UserModel).options(_roles_with_permissions()).filter(UserModel.id == user_id).first()
+
+def get_user_profile(db: Session, user_id: int) -> Optional[UserModel]:
+    """GET /users/me/profile: kullanıcı, rolleri/izinleri, adresleri ve iletişim bilgileri tek oturumda."""
+    return (
+        db.query(UserModel)
+        .options(_roles_with_permissions(), selectinload(UserModel.addresses), selectinload(UserModel.contacts))
+        .filter(UserModel.id == user_id)
+        .first()
+    )
+
+def get_profile_version(db: Session, user_id: int) -> Optional[Tuple[int, Optional[datetime]]]:
+    """(profile_version, updated_at); profil yüklenmeden ETag karşılaştırması için tek PK sorgusu."""
+    return db.query(UserModel.profile_version, UserModel.updated_at).filter(UserModel.id == user_id).first()
+
+def touch_user_profiles(db: Session, user_ids: Any) -> None:
+    """
+    Kullanıcı satırını değiştirmeyen profil değişikliklerinde (adres, iletişim, rol atamaları ve
+    rol tanımları) `profile_version`'ı artırır. `user_ids` id listesi ya da id döndüren bir select
+    olabilir. updated_at olduğu gibi bırakılır; yalnızca kullanıcının kendi alanları değişince ilerler.
+    Commit çağırana aittir.
+    """
+    db.execute(
+        update(UserModel)
+        .where(UserModel.id.in_(user_ids))
+        .values(profile_version=UserModel.profile_version + 1, updated_at=UserModel.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+def touch_role_member_profiles(db: Session, role_id: int) -> None:
+    touch_user_profiles(db, select(user_roles_table.c.user_id).where(user_roles_table.c.role_id == role_id))
 
 def get_user_by_email(db: Session, email: str) -> Optional[UserModel]:
     return db.query(UserModel).filter(UserModel.email == email).first()
@@ -17,8 +66,44 @@ def get_user_by_email(db: Session, email: str) -> Optional[UserModel]:
 def get_user_by_username(db: Session, username: str) -> Optional[UserModel]:
     return db.query(UserModel).filter(UserModel.username == username).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> list[UserModel]:
-    return db.query(UserModel).offset(skip).limit(limit).all()
+def get_user_with_permissions(db: Session, username: str) -> Optional[UserModel]:
+    """Principal özeti için: roller selectin ile yüklenir, izinler rol-izin indeksinden okunur."""
+    return (
+        db.query(UserModel)
+        .options(selectinload(UserModel.roles))
+        .filter(UserModel.username == username)
+        .first()
+    )
+
+USER_SEARCH_MIN_LENGTH = 3 # pg_trgm index'leri 3 karakterden kısa aramalarda kullanılamaz
+
+def _escape_like(value: str) -> str:
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+def get_users(
+    db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, q: Optional[str] = None
+) -> list[UserModel]:
+    """
+    Kullanıcıları id sırasıyla listeler. `after_id` verilirse keyset pagination (id > after_id)
+    kullanılır ve `skip` yok sayılır; büyük tablolarda OFFSET'in aksine sayfa derinliğinden
+    bağımsızdır. `q`, username/email/ad/soyad üzerinde büyük-küçük harf duyarsız içerir
+    aramasıdır (trigram GIN index'leri, bkz. app/db/schema_upgrades.py).
+    """
+    query = db.query(UserModel).options(_roles_with_permissions())
+    if q:
+        pattern = f"%{_escape_like(q)}%"
+        query = query.filter(or_(
+            UserModel.username.ilike(pattern, escape="!"),
+            UserModel.email.ilike(pattern, escape="!"),
+            UserModel.first_name.ilike(pattern, escape="!"),
+            UserModel.last_name.ilike(pattern, escape="!"),
+        ))
+    query = query.order_by(UserModel.id)
+    if after_id is not None:
+        query = query.filter(UserModel.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
 
 def create_user(db: Session, user_in: UserCreate) -> UserModel:
     existing_user_username = get_user_by_username(db, username=user_in.username)
@@ -34,7 +119,7 @@ def create_user(db: Session, user_in: UserCreate) -> UserModel:
             detail="Email already registered."
         )
 
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = hash_password(user_in.password)
 
     user_data = user_in.model_dump(exclude={"password"})
 
@@ -45,16 +130,102 @@ def create_user(db: Session, user_in: UserCreate) -> UserModel:
     db.refresh(db_user) 
     return db_user
 
+def bulk_create_users(db: Session, users_in: List[UserBulkCreateItem]) -> List[UserBulkCreateResult]:
+    """
+    Toplu kullanıcı oluşturma. Çakışmalar ve rol id'leri birer sorguyla kontrol edilir, şifreler
+    process havuzunda paralel hash'lenir, kullanıcılar ve rol bağlantıları çok satırlı INSERT'lerle
+    tek transaction'da eklenir. Sonuçlar istekteki sırayla, satır başına döner; bir satırın
+    reddedilmesi diğerlerini etkilemez.
+    """
+    results: List[Optional[UserBulkCreateResult]] = [None] * len(users_in)
+
+    taken_usernames, taken_emails = set(), set()
+    existing = db.query(UserModel.username, UserModel.email).filter(or_(
+        UserModel.username.in_({user_in.username for user_in in users_in}),
+        UserModel.email.in_({user_in.email for user_in in users_in}),
+    ))
+    for username, email in existing:
+        taken_usernames.add(username)
+        taken_emails.add(email)
+
+    requested_role_ids = {role_id for user_in in users_in for role_id in user_in.role_ids}
+    known_role_ids = set()
+    if requested_role_ids:
+        known_role_ids = {role_id for (role_id,) in db.query(RoleModel.id).filter(RoleModel.id.in_(requested_role_ids))}
+
+    accepted: List[tuple[int, UserBulkCreateItem]] = []
+    for index, user_in in enumerate(users_in):
+        missing_role_ids = set(user_in.role_ids) - known_role_ids
+        if user_in.username in taken_usernames:
+            results[index] = UserBulkCreateResult(
+                index=index, username=user_in.username, status="conflict", detail="Username already registered."
+            )
+        elif user_in.email in taken_emails:
+            results[index] = UserBulkCreateResult(
+                index=index, username=user_in.username, status="conflict", detail="Email already registered."
+            )
+        elif missing_role_ids:
+            results[index] = UserBulkCreateResult(
+                index=index, username=user_in.username, status="invalid_role",
+                detail=f"One or more roles not found: {missing_role_ids}"
+            )
+        else:
+            # İstek içindeki tekrarlar da çakışma sayılır; ilk geçen kazanır
+            taken_usernames.add(user_in.username)
+            taken_emails.add(user_in.email)
+            accepted.append((index, user_in))
+
+    if accepted:
+        hashed_passwords = hash_passwords([user_in.password for _, user_in in accepted])
+        rows = [
+            {**user_in.model_dump(exclude={"password", "role_ids"}), "hashed_password": hashed_password}
+            for (_, user_in), hashed_password in zip(accepted, hashed_passwords)
+        ]
+        # Kontrolden sonra eşzamanlı eklenen kayıtlar hata yerine atlanır ve çakışma olarak raporlanır
+        insert_users = (
+            pg_insert(UserModel.__table__)
+            .on_conflict_do_nothing()
+            .returning(UserModel.__table__.c.id, UserModel.__table__.c.username)
+        )
+        inserted_ids = {username: user_id for user_id, username in db.execute(insert_users, rows)}
+
+        role_links = [
+            {"user_id": inserted_ids[user_in.username], "role_id": role_id}
+            for _, user_in in accepted if user_in.username in inserted_ids
+            for role_id in set(user_in.role_ids)
+        ]
+        if role_links:
+            db.execute(insert(user_roles_table), role_links)
+        db.commit()
+
+        for index, user_in in accepted:
+            user_id = inserted_ids.get(user_in.username)
+            if user_id is None:
+                results[index] = UserBulkCreateResult(
+                    index=index, username=user_in.username, status="conflict",
+                    detail="Username or email already registered."
+                )
+            else:
+                results[index] = UserBulkCreateResult(index=index, username=user_in.username, status="created", id=user_id)
+
+    logger.info(
+        "Bulk user create: %s of %s user(s) created.",
+        sum(result.status == "created" for result in results), len(users_in)
+    )
+    return results
+
 def update_user(db: Session, user_id: int, user_in: UserUpdate) -> Optional[UserModel]:
     db_user = get_user(db, user_id=user_id)
     if not db_user:
         return None
 
     update_data = user_in.model_dump(exclude_unset=True)
+    previous_username = db_user.username
 
     if "password" in update_data:
-        hashed_password = get_password_hash(update_data["password"])
+        hashed_password = hash_password(update_data["password"])
         db_user.hashed_password = hashed_password
+        _invalidate_tokens(db_user)
         del update_data["password"] 
 
     if "username" in update_data and update_data["username"] != db_user.username:
@@ -67,12 +238,16 @@ def update_user(db: Session, user_id: int, user_in: UserUpdate) -> Optional[User
         if existing_user and existing_user.id != user_id:
              raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
 
+    if update_data.get("is_active") is False and db_user.is_active:
+        _invalidate_tokens(db_user)
+
     for field, value in update_data.items():
         setattr(db_user, field, value)
 
     db.add(db_user) 
     db.commit()   
     db.refresh(db_user) 
+    invalidate_principal(previous_username, db_user.username)
     return db_user
 
 def delete_user(db: Session, user_id: int) -> Optional[UserModel]:
@@ -81,9 +256,11 @@ def delete_user(db: Session, user_id: int) -> Optional[UserModel]:
         return None
 
     db_user.is_active = False
+    _invalidate_tokens(db_user)
 
     db.add(db_user)
     db.commit()
+    invalidate_principal(db_user.username)
     return db_user
 
 def reset_user_password(db: Session, user_id: int, password_in: UserPasswordReset) -> Optional[UserModel]:
@@ -91,12 +268,14 @@ def reset_user_password(db: Session, user_id: int, password_in: UserPasswordRese
     if not db_user:
         return None 
 
-    hashed_password = get_password_hash(password_in.new_password)
+    hashed_password = hash_password(password_in.new_password)
 
     db_user.hashed_password = hashed_password
+    _invalidate_tokens(db_user)
 
     db.add(db_user)
     db.commit()
+    invalidate_principal(db_user.username)
 
     return db_user
 
@@ -117,20 +296,34 @@ def update_user_roles(db: Session, user_id: int, role_update_in: UserRoleUpdate)
              )
 
     db_user.roles = valid_roles 
+    touch_user_profiles(db, [db_user.id])
 
     db.add(db_user)
     db.commit()
     db.refresh(db_user) 
+    invalidate_principal(db_user.username)
 
     return db_user
 
 def update_user_password(db: Session, user: UserModel, password_update: UserPasswordUpdate) -> bool:
-    if not verify_password(password_update.current_password, user.hashed_password):
+    is_valid, _ = verify_and_update_password(password_update.current_password, user.hashed_password)
+    if not is_valid:
         return False 
 
-    new_hashed_password = get_password_hash(password_update.new_password)
+    new_hashed_password = hash_password(password_update.new_password)
 
     user.hashed_password = new_hashed_password
+    _invalidate_tokens(user)
     db.add(user)
     db.commit()
+    invalidate_principal(user.username)
     return True 
+
+def invalidate_user_tokens(db: Session, user: UserModel) -> UserModel:
+    """Kullanıcının tüm oturumlarını kapatır (logout-all)."""
+    _invalidate_tokens(user)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    invalidate_principal(user.username)
+    return user
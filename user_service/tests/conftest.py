@@ -1,10 +1,11 @@
 # tests/conftest.py 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy_utils import database_exists, create_database, drop_database
 from typing import Generator, Any
+from contextlib import contextmanager
 import sys
 import os
 import logging
@@ -22,6 +23,8 @@ from app.core.security import create_access_token, get_password_hash
 from app.db.models.user import User as UserModel
 from app.db.models.role import Role as RoleModel
 from app.services import user_service # 
+from app.core.principal import clear_principal_cache
+from app.core.permission_index import permission_index
 
 logger = logging.getLogger("pytest_conftest")
 logging.basicConfig(level=logging.INFO) 
@@ -93,6 +96,44 @@ def override_get_db(db_session: Session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def clear_authorization_caches():
+    # Test transaction'ları geri alındığından önceki testlerde cache'lenmiş principal'lar ve
+    # rol-izin indeksi geçersiz olabilir.
+    clear_principal_cache()
+    permission_index.invalidate()
+    yield
+    clear_principal_cache()
+    permission_index.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def disable_rate_limits(monkeypatch):
+    # Testler aynı istemci IP'sinden çok sayıda login/kayıt yapar; rate limit testleri tekrar açar.
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+
+@pytest.fixture(scope="function")
+def count_queries(db_session: Session):
+    """`with count_queries() as statements:` bloğunda test veritabanına gönderilen SQL ifadelerini toplar."""
+    engine = db_session.get_bind().engine
+
+    @contextmanager
+    def _count_queries() -> Generator[list, None, None]:
+        statements = []
+
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+
+    return _count_queries
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
     logger.info("Creating TestClient for the module.")
@@ -4,10 +4,16 @@ from fastapi.testclient import TestClient
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 import time
+import os
+import threading
+from passlib.context import CryptContext
 
 from app.core.config import settings
 from app.schemas.token import TokenData
 from app.core.security import create_access_token 
+from app.core import hashing, keys
+from app.db.models.user import User as UserModel
+from app.core.permission_claims import PERMISSION_REGISTRY, decode_permissions
 
 
 def test_login_success_admin(client: TestClient):
@@ -177,6 +183,39 @@ async def test_logout_invalidates_token(client: TestClient, normal_user_token_he
     assert "Could not validate credentials" in response_after.json()["detail"]
 
 
+def test_login_embeds_permission_claim(client: TestClient, normal_user_token_headers: tuple):
+    """A13: Login token'ı kullanıcının izinlerini registry'ye göre bitset olarak taşır"""
+    headers, username = normal_user_token_headers
+    token = client.post("/auth/login", data={"username": username, "password": "password123"}).json()["access_token"]
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    my_permissions = set(client.get("/authz/", headers=headers).json())
+    assert decode_permissions(payload) == my_permissions
+
+    registry = client.get("/.well-known/permission-registry.json").json()
+    assert registry["version"] == payload["pv"]
+    assert registry["permissions"] == list(PERMISSION_REGISTRY)
+
+def test_logout_all_revokes_every_session(client: TestClient, normal_user_token_headers: tuple):
+    """A14: logout-all kullanıcının önceden verilmiş tüm token'larını geçersiz kılar, yeni login çalışır"""
+    headers, username = normal_user_token_headers
+    login_data = {"username": username, "password": "password123"}
+    second_token = client.post("/auth/login", data=login_data).json()["access_token"]
+    second_headers = {"Authorization": f"Bearer {second_token}"}
+    assert client.get("/auth/checkLogin", headers=second_headers).status_code == 200
+
+    response_logout_all = client.post("/auth/logout-all", headers=headers)
+    assert response_logout_all.status_code == 204
+
+    for old_headers in (headers, second_headers):
+        assert client.get("/auth/checkLogin", headers=old_headers).status_code == 401
+        assert client.get("/users/me", headers=old_headers).status_code == 401
+
+    new_token = client.post("/auth/login", data=login_data).json()["access_token"]
+    new_headers = {"Authorization": f"Bearer {new_token}"}
+    assert client.get("/users/me", headers=new_headers).status_code == 200
+
+
 def test_user_update_own_password_success(client: TestClient, normal_user_token_headers: tuple):
     """U3: Kullanıcı kendi şifresini doğru eski şifre ile değiştirir -> 204 OK"""
     headers, username = normal_user_token_headers
@@ -210,4 +249,135 @@ def test_user_deactivate_self(client: TestClient, normal_user_token_headers: tup
 
     login_data = {"username": username, "password": "password123"}
     response_login = client.post("/auth/login", data=login_data)
-    assert response_login.status_code == 401 
\ No newline at end of file
+    assert response_login.status_code == 401 
+
+
+@pytest.fixture
+def rs256_signing(monkeypatch):
+    monkeypatch.setattr(settings, "ALGORITHM", "RS256")
+    keys.get_key_ring.cache_clear()
+    yield
+    keys.get_key_ring.cache_clear()
+
+def test_jwks_publishes_key_for_rs256_tokens(client: TestClient, rs256_signing):
+    """RS256 modunda token header'ındaki kid JWKS'te yayınlanır ve token o anahtarla doğrulanır"""
+    login_data = {
+        "username": settings.FIRST_SUPERUSER_USERNAME,
+        "password": settings.FIRST_SUPERUSER_PASSWORD
+    }
+    token = client.post("/auth/login", data=login_data).json()["access_token"]
+    header = jwt.get_unverified_header(token)
+    assert header["alg"] == "RS256"
+
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+    published = {key["kid"]: key for key in response.json()["keys"]}
+    assert header["kid"] in published
+    assert "d" not in published[header["kid"]] # yalnızca public kısım
+
+    payload = jwt.decode(token, published[header["kid"]], algorithms=["RS256"])
+    assert payload["sub"] == settings.FIRST_SUPERUSER_USERNAME
+
+    response_check = client.get("/auth/checkLogin", headers={"Authorization": f"Bearer {token}"})
+    assert response_check.status_code == 200
+
+
+def test_login_rehashes_password_with_outdated_cost(client: TestClient, db_session):
+    """A8: Eski bcrypt maliyetiyle saklanan şifre login sırasında güncel maliyetle yeniden hash'lenir"""
+    username = f"rehash_{os.urandom(4).hex()}"
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("password123")
+    db_session.add(UserModel(username=username, email=f"{username}@example.com", hashed_password=old_hash, is_active=True))
+    db_session.commit()
+
+    response = client.post("/auth/login", data={"username": username, "password": "password123"})
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    new_hash = db_session.query(UserModel).filter(UserModel.username == username).one().hashed_password
+    assert new_hash != old_hash
+    assert new_hash.startswith(f"$2b${settings.PASSWORD_BCRYPT_ROUNDS:02d}$")
+    assert client.post("/auth/login", data={"username": username, "password": "password123"}).status_code == 200
+
+
+def test_saturated_hashing_pool_fails_fast(client: TestClient, monkeypatch):
+    """A9: Bekleyen hash işi sınırı doluysa kayıt beklemeden 503 döner"""
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(hashing, "_pending_slots", slots)
+
+    suffix = os.urandom(4).hex()
+    response = client.post("/users/", json={"username": f"busy_{suffix}", "email": f"busy_{suffix}@example.com", "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/health/hashing").json()["rejected_calls"] >= 1
+
+
+def test_hashing_pool_recovers_after_worker_dies():
+    """A15: Ölen bir worker havuzu bozar; hash çağrıları havuzu yeniden kurup devam eder"""
+    executor = hashing.get_hashing_executor()
+    executor.submit(hashing._noop).result()
+    worker = next(iter(executor._processes.values()))
+    worker.kill()
+    worker.join(timeout=10)
+
+    hashed = hashing.hash_password("password123")
+    assert hashing.verify_and_update_password("password123", hashed)[0] is True
+    assert hashing.get_hashing_executor() is not executor
+
+    worker = next(iter(hashing.get_hashing_executor()._processes.values()))
+    worker.kill()
+    worker.join(timeout=10)
+    assert len(hashing.hash_passwords(["a" * 8, "b" * 8, "c" * 8])) == 3
+
+
+def test_refresh_token_rotation_and_reuse_detection(client: TestClient, normal_user_token_headers: tuple):
+    """A10: Refresh token tek kullanımlıktır; kullanılmış token tekrar gelirse oturumun tamamı iptal edilir"""
+    _, username = normal_user_token_headers
+    login = client.post("/auth/login", data={"username": username, "password": "password123"}).json()
+    assert login["expires_in"] == settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    rotated = client.post("/auth/refresh", json={"refresh_token": login["refresh_token"]})
+    assert rotated.status_code == 200, rotated.text
+    rotated = rotated.json()
+    assert rotated["refresh_token"] != login["refresh_token"]
+    assert client.get("/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}).status_code == 200
+
+    assert client.post("/auth/refresh", json={"refresh_token": login["refresh_token"]}).status_code == 401
+    # Reuse sonrası aileden türeyen token da geçersiz
+    assert client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 401
+
+
+def test_logout_and_logout_all_revoke_refresh_tokens(client: TestClient, normal_user_token_headers: tuple):
+    """A11: Logout oturumun, logout-all kullanıcının tüm refresh token'larını geçersiz kılar"""
+    headers, username = normal_user_token_headers
+    login_data = {"username": username, "password": "password123"}
+
+    first = client.post("/auth/login", data=login_data).json()
+    second = client.post("/auth/login", data=login_data).json()
+    assert client.post("/auth/logout", headers={"Authorization": f"Bearer {first['access_token']}"}).status_code == 204
+    assert client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]}).status_code == 401
+
+    assert client.post("/auth/logout-all", headers=headers).status_code == 204
+    assert client.post("/auth/refresh", json={"refresh_token": second["refresh_token"]}).status_code == 401
+
+
+def test_introspect_reports_each_token(client: TestClient, normal_user_token_headers: tuple, monkeypatch):
+    """A12: Toplu introspection her token için aktiflik ve claim'leri istek sırasıyla döner"""
+    headers, username = normal_user_token_headers
+    active_token = headers["Authorization"].split(" ", 1)[1]
+    logged_out = client.post("/auth/login", data={"username": username, "password": "password123"}).json()["access_token"]
+    assert client.post("/auth/logout", headers={"Authorization": f"Bearer {logged_out}"}).status_code == 204
+
+    body = {"tokens": [active_token, logged_out, "not-a-jwt"]}
+    assert client.post("/auth/introspect", json=body).status_code == 403
+
+    monkeypatch.setattr(settings, "INTROSPECTION_API_KEY", "internal-key")
+    assert client.post("/auth/introspect", json=body, headers={"X-Introspection-Key": "wrong"}).status_code == 401
+
+    response = client.post("/auth/introspect", json=body, headers={"X-Introspection-Key": "internal-key"})
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["active"] for result in results] == [True, False, False]
+    assert results[0]["claims"]["sub"] == username
+    assert results[1]["claims"] is None
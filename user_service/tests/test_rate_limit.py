@@ -0,0 +1,65 @@
+# tests/test_rate_limit.py
+import os
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.services import auth_service
+
+
+@pytest.fixture
+def rate_limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN_IP_BURST", 1000)
+    rate_limit.reset_local_buckets()
+    yield monkeypatch
+    rate_limit.reset_local_buckets()
+
+
+def test_local_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit, "_now", lambda: now[0])
+    rate_limit.reset_local_buckets()
+    buckets = [("test:ip", 2, 1.0), ("test:user", 5, 1.0)]
+
+    assert rate_limit._consume_local(buckets) == (True, 0.0)
+    assert rate_limit._consume_local(buckets) == (True, 0.0)
+    allowed, retry_after = rate_limit._consume_local(buckets)
+    assert not allowed and retry_after == pytest.approx(1.0)
+
+    now[0] += 1.0
+    assert rate_limit._consume_local(buckets)[0]
+    rate_limit.reset_local_buckets()
+
+
+def test_login_over_limit_is_rejected_before_authentication(client: TestClient, rate_limits):
+    rate_limits.setattr(settings, "RATE_LIMIT_LOGIN_USERNAME_BURST", 2)
+    calls = []
+    real_authenticate = auth_service.authenticate_user
+
+    def counting_authenticate(*args, **kwargs):
+        calls.append(1)
+        return real_authenticate(*args, **kwargs)
+
+    rate_limits.setattr(auth_service, "authenticate_user", counting_authenticate)
+    login_data = {"username": f"stuffing_{os.urandom(4).hex()}", "password": "wrong-password"}
+
+    assert client.post("/auth/login", data=login_data).status_code == 401
+    assert client.post("/auth/login", data=login_data).status_code == 401
+    response = client.post("/auth/login", data=login_data)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert len(calls) == 2
+
+
+def test_registration_limit_falls_back_to_local_buckets_without_redis(client: TestClient, rate_limits):
+    rate_limits.setattr(settings, "RATE_LIMIT_REGISTER_IP_BURST", 1)
+    rate_limits.setattr(rate_limit, "get_redis_client_or_none", lambda: None)
+
+    def new_user():
+        suffix = os.urandom(4).hex()
+        return {"username": f"ratelimited_{suffix}", "email": f"ratelimited_{suffix}@example.com", "password": "password123"}
+
+    assert client.post("/users/", json=new_user()).status_code == 201
+    assert client.post("/users/", json=new_user()).status_code == 429
@@ -0,0 +1,48 @@
+# tests/test_redis_client.py
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import redis_client
+from app.core.redis_client import CircuitBreaker
+
+
+def test_circuit_breaker_opens_and_allows_single_trial(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(redis_client, "_now", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    now[0] += 10
+    assert breaker.allow() # half-open: tek deneme
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    assert breaker.rejected_calls == 2
+
+
+def test_open_breaker_fails_fast_with_503(client: TestClient, admin_token_headers: dict, monkeypatch):
+    response = client.get("/auth/checkLogin", headers=admin_token_headers)
+    assert response.status_code == 200
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    monkeypatch.setattr(redis_client, "redis_breaker", breaker)
+
+    response = client.get("/auth/checkLogin", headers=admin_token_headers)
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+    stats = client.get("/health/redis").json()
+    assert stats["breaker_state"] == "open"
+    assert stats["breaker_rejected_calls"] == 1
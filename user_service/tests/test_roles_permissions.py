@@ -2,8 +2,12 @@
 import pytest
 from fastapi.testclient import TestClient
 import os
+from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.schemas.user import UserRoleUpdate
+from app.db.models.user import User as UserModel
+from app.core.permission_index import PROCESS_ID, handle_permission_index_message, permission_index
 from app.schemas.role import RolePermissionUpdate, RoleCreate, RoleUpdate 
 
 
@@ -145,4 +149,79 @@ def test_admin_assign_permission_to_role(client: TestClient, admin_token_headers
     updated_role = response.json()
     assert "permissions" in updated_role, "Response JSON should contain 'permissions' key"
     assigned_perm_names = {p["name"] for p in updated_role["permissions"]}
-    assert assigned_perm_names == {"users:read_self", "users:update_self"}
\ No newline at end of file
+    assert assigned_perm_names == {"users:read_self", "users:update_self"}
+
+
+def test_authz_check_uses_cached_principal(client: TestClient, normal_user_token_headers: tuple, count_queries):
+    """R6: Principal cache'te ise yetki kontrolü veritabanına sorgu atmaz"""
+    headers, _ = normal_user_token_headers
+    with count_queries() as statements:
+        response = client.get("/authz/has-permission/addresses:create_own", headers=headers)
+        assert response.status_code == 200
+        assert statements, "first request should load the principal from the database"
+
+        statements.clear()
+        response = client.get("/authz/has-permission/addresses:create_own", headers=headers)
+        assert response.status_code == 200
+        assert response.json() is True
+        assert statements == []
+
+
+def test_role_permission_change_invalidates_principal(client: TestClient, admin_token_headers: dict, normal_user_token_headers: tuple):
+    """R7: Rol izinleri değişince cache'teki principal hemen güncellenir"""
+    headers, _ = normal_user_token_headers
+    assert client.get("/authz/has-permission/addresses:create_own", headers=headers).json() is True
+
+    user_role_id = get_role_id(client, admin_token_headers, "USER")
+    perm_read_self_id = get_permission_id(client, admin_token_headers, "users:read_self")
+    response = client.put(
+        f"/roles/{user_role_id}/permissions",
+        headers=admin_token_headers,
+        json=RolePermissionUpdate(permission_ids=[perm_read_self_id]).model_dump()
+    )
+    assert response.status_code == 200, response.text
+
+    assert client.get("/authz/has-permission/addresses:create_own", headers=headers).json() is False
+    assert client.get("/authz/has-permission/users:read_self", headers=headers).json() is True
+
+
+def test_user_permissions_come_from_compiled_index(
+    client: TestClient, normal_user_token_headers: tuple, db_session: Session, count_queries
+):
+    """R8: İndeks kuruluyken kullanıcının izinleri Role.permissions yüklenmeden hesaplanır"""
+    _, username = normal_user_token_headers
+    permission_index.rebuild(db_session)
+    user = db_session.query(UserModel).filter(UserModel.username == username).one()
+    _ = user.roles
+
+    with count_queries() as statements:
+        permissions = user.permissions
+        assert user.has_permission("addresses:create_own")
+        assert not user.has_permission("users:read_all")
+
+    assert "users:read_self" in permissions
+    assert "users:manage_roles" not in permissions
+    assert statements == []
+
+
+def test_permission_index_is_rebuilt_after_max_age(db_session: Session, monkeypatch):
+    """Yayın kaçırılsa bile süresi dolan indeks bir sonraki kullanımda yeniden kurulur"""
+    from app.core import permission_index as permission_index_module
+
+    permission_index.rebuild(db_session)
+    generation = permission_index.generation
+    permission_index.ensure_loaded(db_session)
+    assert permission_index.generation == generation
+
+    now = permission_index_module._now()
+    monkeypatch.setattr(permission_index_module, "_now", lambda: now + settings.PERMISSION_INDEX_MAX_AGE_SECONDS + 1)
+    assert not permission_index.loaded
+    permission_index.ensure_loaded(db_session)
+    assert permission_index.generation == generation + 1
+    assert permission_index.loaded
+
+
+def test_permission_index_messages_from_own_process_are_ignored():
+    assert handle_permission_index_message(f'{{"origin": "{PROCESS_ID}", "generation": 3}}') is False
+    assert handle_permission_index_message('{"origin": "another-worker", "generation": 1}') is True
+    assert handle_permission_index_message("not json") is False
@@ -2,9 +2,11 @@
 import os
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.schemas.user import UserCreate, UserUpdate, UserPasswordReset, UserRoleUpdate
 from app.db.models.user import User as UserModel
+from app.db.models.role import Role as RoleModel
 
 def test_admin_create_user_success(client: TestClient, admin_token_headers: dict):
     """U1: Admin kullanıcı yeni kullanıcı oluşturur -> 201 Created"""
@@ -74,6 +76,132 @@ def test_admin_get_user_by_id_not_found(client: TestClient, admin_token_headers:
     assert response.status_code == 404
     assert "User not found" in response.json()["detail"]
 
+def test_admin_list_users_search_and_cursor(client: TestClient, admin_token_headers: dict):
+    """Admin listesi: q= araması ve after_id cursor'ı ile sayfalama"""
+    marker = f"srch{os.urandom(4).hex()}"
+    created_ids = []
+    for i in range(3):
+        user_data = {"username": f"{marker}_{i}", "email": f"user_{i}_{os.urandom(4).hex()}@example.com", "password": "password123"}
+        response = client.post("/users/", headers=admin_token_headers, json=user_data)
+        assert response.status_code == 201, response.text
+        created_ids.append(response.json()["id"])
+
+    response = client.get("/users/", headers=admin_token_headers, params={"q": marker.upper(), "limit": 2})
+    assert response.status_code == 200, response.text
+    first_page = response.json()
+    assert [u["id"] for u in first_page] == created_ids[:2]
+    next_cursor = response.headers.get("X-Next-Cursor")
+    assert next_cursor == str(created_ids[1])
+
+    response = client.get("/users/", headers=admin_token_headers, params={"q": marker, "limit": 2, "after_id": next_cursor})
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == created_ids[2:]
+    assert "X-Next-Cursor" not in response.headers
+
+    # LIKE joker karakterleri literal aranır; trigram index'i kullanılamayacak kısa aramalar reddedilir
+    response = client.get("/users/", headers=admin_token_headers, params={"q": "%%%"})
+    assert response.status_code == 200
+    assert response.json() == []
+    response = client.get("/users/", headers=admin_token_headers, params={"q": "ab"})
+    assert response.status_code == 422
+
+
+
+def test_admin_bulk_create_users(client: TestClient, admin_token_headers: dict, normal_user_for_admin_test: dict):
+    """Toplu oluşturma: satır başına sonuç; çakışan ve bilinmeyen rollü satırlar atlanır"""
+    suffix = os.urandom(4).hex()
+    users = [
+        {"username": f"bulk_a_{suffix}", "email": f"bulk_a_{suffix}@example.com", "password": "password123"},
+        {"username": normal_user_for_admin_test["username"], "email": f"bulk_b_{suffix}@example.com", "password": "password123"},
+        {"username": f"bulk_a_{suffix}", "email": f"bulk_c_{suffix}@example.com", "password": "password123"},
+        {"username": f"bulk_d_{suffix}", "email": f"bulk_d_{suffix}@example.com", "password": "password123", "role_ids": [99999]},
+        {"username": f"bulk_e_{suffix}", "email": f"bulk_e_{suffix}@example.com", "password": "password123"},
+    ]
+    response = client.post("/users/bulk", headers=admin_token_headers, json={"users": users})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert (data["created"], data["failed"]) == (2, 3)
+    assert [r["status"] for r in data["results"]] == ["created", "conflict", "conflict", "invalid_role", "created"]
+    assert data["results"][0]["id"] is not None
+
+    response_login = client.post("/auth/login", data={"username": f"bulk_e_{suffix}", "password": "password123"})
+    assert response_login.status_code == 200, response_login.text
+
+def test_normal_user_cannot_bulk_create_users(client: TestClient, normal_user_token_headers: tuple):
+    headers, _ = normal_user_token_headers
+    users = [{"username": f"bulk_{os.urandom(4).hex()}", "email": f"bulk_{os.urandom(4).hex()}@example.com", "password": "password123"}]
+    response = client.post("/users/bulk", headers=headers, json={"users": users})
+    assert response.status_code in [403, 401]
+
+
+def test_admin_list_users_constant_query_count(
+    client: TestClient, admin_token_headers: dict, db_session: Session, count_queries
+):
+    """200 kullanıcılık sayfa, roller ve izinleriyle sabit sayıda sorguda döner"""
+    marker = f"qc{os.urandom(4).hex()}"
+    roles = db_session.query(RoleModel).filter(RoleModel.name.in_(["USER", "ADMIN"])).order_by(RoleModel.id).all()
+    # Liste sorgusu ölçülüyor; kullanıcılar bcrypt'e girmeden doğrudan test transaction'ına eklenir
+    db_session.add_all([
+        UserModel(
+            username=f"{marker}_{i}", email=f"{marker}_{i}@example.com", hashed_password="not-a-real-hash",
+            roles=roles[:1] if i % 2 else roles
+        )
+        for i in range(200)
+    ])
+    db_session.flush()
+
+    # Principal cache'i ve izin indeksi ısınsın; ölçülen istekte yalnızca liste sorguları kalır
+    assert client.get("/users/", headers=admin_token_headers, params={"limit": 1}).status_code == 200
+    db_session.expunge_all() # Önceki isteklerde yüklenmiş rol/izin nesneleri sayımı gizlemesin
+
+    with count_queries() as statements:
+        response = client.get("/users/", headers=admin_token_headers, params={"q": marker, "limit": 200})
+
+    assert response.status_code == 200, response.text
+    page = response.json()
+    assert len(page) == 200
+    assert all(user["roles"] and all("permissions" in role for role in user["roles"]) for user in page)
+    # users + roles (selectin) + permissions (selectin)
+    assert len(statements) == 3, statements
+
+
+def test_read_my_profile_with_etag(client: TestClient, normal_user_token_headers: tuple, count_queries):
+    """/users/me/profile: kullanıcı, adresler ve iletişim bilgileri tek yanıtta; ETag ile 304"""
+    headers, username = normal_user_token_headers
+    address_data = {"street": "Profil Sokak 1", "city": "TestŞehir", "postal_code": "12345", "address_type": "HOME"}
+    response = client.post("/addresses/", headers=headers, json=address_data)
+    assert response.status_code == 201
+    address_id = response.json()["id"]
+
+    response = client.get("/users/me/profile", headers=headers)
+    assert response.status_code == 200, response.text
+    profile = response.json()
+    assert profile["user"]["username"] == username
+    assert [a["street"] for a in profile["addresses"]] == ["Profil Sokak 1"]
+    assert profile["contacts"] == []
+    etag = response.headers["ETag"]
+
+    with count_queries() as statements:
+        response = client.get("/users/me/profile", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    # 304 profili (adresler, iletişim, roller) yüklemeden verilir
+    assert not [st for st in statements if "addresses" in st or "contacts" in st or "roles" in st], statements
+
+    response = client.put(f"/addresses/{address_id}", headers=headers, json={"city": "YeniŞehir"})
+    assert response.status_code == 200, response.text
+    response = client.get("/users/me/profile", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["addresses"][0]["city"] == "YeniŞehir"
+    etag = response.headers["ETag"]
+
+    contact_data = {"contact_type": "MOBILE", "value": "+905551112233"}
+    assert client.post("/contacts/", headers=headers, json=contact_data).status_code == 201
+    response = client.get("/users/me/profile", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()["contacts"]) == 1
 
 
 def test_normal_user_cannot_list_all_users(client: TestClient, normal_user_token_headers: tuple):